@@ -0,0 +1,22 @@
+"""
+helpers of the benchmarks, they run from a checkout without installing mmm:
+
+    python benchmarks/<name>.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+os.environ.setdefault('MMM_SETTINGS_MODULE', 'mmm.config.default_config')
+
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    """
+    @return: seconds per call of func, the best of `repeat` rounds of `number` calls
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def us(seconds: float) -> str:
+    return f'{seconds * 1e6:.2f} us'
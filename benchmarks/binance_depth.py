@@ -0,0 +1,88 @@
+"""
+replay of diff depth messages, 5 bid and 5 ask levels each, on a binance DepthCache of 1000 levels a side, against
+the dict keyed by price that the cache used before, which sorted the whole side on every read.
+"""
+import random
+import time
+
+import _bench  # noqa: F401, puts src on the path
+
+from mmm.third_party.binance.depthcache import DepthCache
+
+
+class DictDepthCache:
+    """the former DepthCache"""
+
+    def __init__(self, conv_type=float):
+        self._bids, self._asks = {}, {}
+        self.conv_type = conv_type
+
+    def add_bid(self, bid):
+        self._bids[bid[0]] = self.conv_type(bid[1])
+        if bid[1] == '0.00000000':
+            del self._bids[bid[0]]
+
+    def add_ask(self, ask):
+        self._asks[ask[0]] = self.conv_type(ask[1])
+        if ask[1] == '0.00000000':
+            del self._asks[ask[0]]
+
+    def _sorted(self, side, reverse):
+        return sorted(([self.conv_type(price), quantity] for price, quantity in side.items()),
+                      key=lambda level: level[0], reverse=reverse)
+
+    def get_bids(self):
+        return self._sorted(self._bids, True)
+
+    def get_asks(self):
+        return self._sorted(self._asks, False)
+
+
+def messages(n: int, levels: int = 1000, seed: int = 7):
+    rnd = random.Random(seed)
+
+    def level(price):
+        return [f'{price:.2f}', '0.00000000' if rnd.random() < 0.3 else f'{rnd.uniform(0.001, 5):.8f}']
+    return [([level(10000 - rnd.randrange(levels) / 100) for _ in range(5)],
+             [level(10000.01 + rnd.randrange(levels) / 100) for _ in range(5)]) for _ in range(n)]
+
+
+def replay(cache, updates, read=None):
+    begin = time.perf_counter()
+    for bids, asks in updates:
+        for each in bids:
+            cache.add_bid(each)
+        for each in asks:
+            cache.add_ask(each)
+        if read is not None:
+            read(cache)
+    return len(updates) / (time.perf_counter() - begin)
+
+
+def main():
+    book = ([[f'{10000 - i / 100:.2f}', '1.00000000'] for i in range(1000)],
+            [[f'{10000.01 + i / 100:.2f}', '1.00000000'] for i in range(1000)])
+    updates = messages(20000)
+    reads = {
+        'apply only': None,
+        'apply + get_bids()/get_asks() top 5': lambda c: (c.get_bids()[:5], c.get_asks()[:5]),
+        'apply + get_top_bids/asks(5)': lambda c: (c.get_top_bids(5)[:], c.get_top_asks(5)[:]),
+    }
+    for name, read in reads.items():
+        rates = []
+        for cls in (DictDepthCache, DepthCache):
+            if cls is DictDepthCache and name.startswith('apply + get_top'):
+                rates.append(None)
+                continue
+            cache = cls() if cls is DictDepthCache else cls('BTCUSDT')
+            for bid, ask in zip(*book):
+                cache.add_bid(bid)
+                cache.add_ask(ask)
+            # sorting the dict on every read is slow, it replays a tenth of the messages
+            rates.append(replay(cache, updates if read is None or cls is DepthCache else updates[:2000], read))
+        before = '-' if rates[0] is None else f'{rates[0] / 1000:.1f}k'
+        print(f'{name:<40} dict {before:>8} msg/s, sorted prices {rates[1] / 1000:.1f}k msg/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+messages per second through ThreadedWebsocketManager.start_multiplex_socket from a local websocket server, and the
+time stop() and join() take, with the callback inline, on a worker and queued for drain(). it runs offline, the
+REST ping of AsyncClient.create is skipped.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import _bench  # noqa: F401, puts src on the path
+import websockets
+
+from mmm.third_party.binance.client import AsyncClient
+from mmm.third_party.binance.streams import BinanceSocketManager, ThreadedWebsocketManager
+
+
+MESSAGES = 100000
+FRAME = json.dumps({'stream': 'btcusdt@trade', 'data': {
+    'e': 'trade', 'E': 1700000000000, 's': 'BTCUSDT', 't': 12345, 'p': '42000.10', 'q': '0.001', 'b': 88, 'a': 50,
+    'T': 1700000000000, 'm': True, 'M': True}})
+
+
+def serve() -> int:
+    """start the server on a thread, every connection is sent MESSAGES frames, @return: port"""
+    started = threading.Event()
+    port = []
+
+    async def send(ws, path):
+        for _ in range(MESSAGES):
+            await ws.send(FRAME)
+        await ws.wait_closed()
+
+    async def main():
+        async with websockets.serve(send, '127.0.0.1', 0) as server:
+            port.append(server.sockets[0].getsockname()[1])
+            started.set()
+            await asyncio.Future()
+
+    threading.Thread(target=asyncio.run, args=(main(),), daemon=True).start()
+    started.wait()
+    return port[0]
+
+
+async def _offline(*args, **kwargs):
+    return {'serverTime': int(time.time() * 1000)}
+
+
+def run(mode: str) -> str:
+    done = threading.Event()
+    received = [0]
+
+    def callback(msg):
+        received[0] += 1
+        if received[0] == MESSAGES:
+            done.set()
+
+    twm = ThreadedWebsocketManager(workers=1 if mode == 'workers=1' else 0)
+    twm.start()
+    begin = time.perf_counter()
+    twm.start_multiplex_socket(None if mode == 'drain()' else callback, ['btcusdt@trade'])
+    if mode == 'drain()':
+        while received[0] < MESSAGES:
+            received[0] += len(twm.drain(timeout=5))
+    else:
+        done.wait()
+    elapsed = time.perf_counter() - begin
+    begin = time.perf_counter()
+    twm.stop()
+    twm.join()
+    stopping = time.perf_counter() - begin
+    return f'{mode:<16} {MESSAGES / elapsed / 1000:>6.1f}k msg/s, stop + join {stopping * 1000:.1f}ms'
+
+
+def main():
+    AsyncClient.ping = AsyncClient.get_server_time = _offline
+    BinanceSocketManager.STREAM_URL = f'ws://127.0.0.1:{serve()}/'
+    for mode in ('inline callback', 'workers=1', 'drain()'):
+        print(run(mode))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+encode and decode time and size of hub messages with the codec and with pickle, which the hubs used before. pickle
+runs on the current slotted classes, the events used to carry a deep copy of their locals which pickle had to copy too.
+"""
+import pickle
+
+import _bench
+
+from mmm.core.datasource.okex.subscription import OKEXTradesResp
+from mmm.core.hub.codec import codec
+from mmm.core.hub.inner_event_hub.event import OrderCreationEvent
+from mmm.credential import Credential
+from mmm.project_types import Exchange
+
+
+def main():
+    credential = Credential('KEY', 'SECRET', account='benchmark')
+    params = {'instId': 'BTC-USDT-SWAP', 'side': 'buy', 'px': '42000.1'}
+
+    def order_event():
+        return OrderCreationEvent('1700000000000-1', 'grid', 'bot-1', Exchange.OKEX, credential, params)
+
+    print(f'OrderCreationEvent construct {_bench.us(_bench.best_of(order_event, 20000))}')
+    messages = {
+        'OKEXTradesResp': OKEXTradesResp('BTC-USDT-SWAP', '42000.1', '0.5', 'buy', '1700000000000', trade_id='123456'),
+        'OrderCreationEvent': order_event(),
+    }
+    print(f'{"message":<20} {"format":<7} {"bytes":>6} {"encode":>10} {"decode":>10}')
+    for name, msg in messages.items():
+        for fmt, encode, decode in (('codec', codec.encode, codec.decode),
+                                    ('pickle', lambda m: pickle.dumps(m, pickle.HIGHEST_PROTOCOL), pickle.loads)):
+            data = encode(msg)
+            encoding = _bench.best_of(lambda: encode(msg), 20000)
+            decoding = _bench.best_of(lambda: decode(data), 20000)
+            print(f'{name:<20} {fmt:<7} {len(data):>6} {_bench.us(encoding):>10} {_bench.us(decoding):>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""
+cost of AsyncioQueueDsMsgHub.publish with one consumer queue per subscription, against the scan over every
+subscription that the hub did before responses were routed by their routing key.
+"""
+import _bench  # noqa: F401, puts src on the path
+
+from mmm.core.datasource.okex.subscription import OKEXTrades, OKEXTradesResp
+from mmm.core.hub.datasource_msg_hub.hub import AsyncioQueueDsMsgHub
+
+
+def scan(subscriptions, msg):
+    for sub, queue in subscriptions:
+        if msg.response_for(sub):
+            queue.put_nowait(msg)
+
+
+def main():
+    print(f'{"subs":>6} {"scan":>12} {"routed":>12}')
+    for n in (10, 100, 1000, 5000):
+        hub = AsyncioQueueDsMsgHub()
+        subscriptions = [(sub, hub.subscribe(sub)) for sub in (OKEXTrades(f'INST-{i}') for i in range(n))]
+        msg = OKEXTradesResp(f'INST-{n // 2}', '1.5', '2', 'buy', '1700000000000')
+        scanned = _bench.best_of(lambda: scan(subscriptions, msg), 200)
+        routed = _bench.best_of(lambda: hub.publish(msg), 200)
+        print(f'{n:>6} {_bench.us(scanned):>12} {_bench.us(routed):>12}')
+
+
+if __name__ == '__main__':
+    main()
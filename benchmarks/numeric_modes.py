@@ -0,0 +1,56 @@
+"""
+per trade cost of the usual tick math, value, volume and running high, in NumericMode.DECIMAL and NumericMode.FIXED
+on prices and sizes that are already decoded, and of decoding the raw strings. the value is summed with the
+operators, scaled by the price and size decimals in FIXED, and with notional(), which rounds every product to
+VALUE_DECIMALS in FIXED.
+"""
+import _bench
+
+from mmm.numeric import notional, parse_price, parse_size, set_mode, set_precision
+from mmm.project_types import NumericMode
+
+
+INST_ID = 'BTC-USDT-SWAP'
+RAW = [(f'42219.{i % 10}', f'0.{1206 + i:08d}') for i in range(100)]
+
+
+def tick_math(trades):
+    value = volume = 0
+    high = None
+    for price, size in trades:
+        value += price * size
+        volume += size
+        if high is None or price > high:
+            high = price
+    return value, volume, high
+
+
+def tick_math_notional(trades):
+    value = volume = 0
+    high = None
+    for price, size in trades:
+        value += notional(price, size, INST_ID)
+        volume += size
+        if high is None or price > high:
+            high = price
+    return value, volume, high
+
+
+def main():
+    set_precision(INST_ID, 1, 8)
+    for mode in (NumericMode.DECIMAL, NumericMode.FIXED):
+        set_mode(mode)
+
+        def decode():
+            return [(parse_price(px, INST_ID), parse_size(sz, INST_ID)) for px, sz in RAW]
+
+        trades = decode()
+        math = _bench.best_of(lambda: tick_math(trades), 2000) / len(RAW)
+        with_notional = _bench.best_of(lambda: tick_math_notional(trades), 2000) / len(RAW)
+        decoding = _bench.best_of(decode, 2000) / len(RAW)
+        print(f'{mode.name:<8} tick math {_bench.us(math)}/trade, with notional() {_bench.us(with_notional)}/trade, '
+              f'decode {_bench.us(decoding)}/trade')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+frames per second through decode, dispatch and parse of okex trade frames, the path of OkexWsDatasource for a data
+frame. the orjson decoder is only measured if orjson is installed.
+"""
+import json
+
+import _bench
+
+from mmm.core.datasource.decoder import OrjsonDecoder, StdJsonDecoder, orjson
+from mmm.core.datasource.okex.parser import parser_factory
+
+
+def frame(trades: int) -> str:
+    return json.dumps({
+        'arg': {'channel': 'trades', 'instId': 'BTC-USDT-SWAP'},
+        'data': [{'instId': 'BTC-USDT-SWAP', 'tradeId': str(130639474 + i), 'px': '42219.9', 'sz': '0.12060306',
+                  'side': 'buy', 'ts': '1630048897897'} for i in range(trades)],
+    }, separators=(',', ':'))
+
+
+def main():
+    parsers = {'trades': parser_factory.get('trades')}  # resolved once when the datasource subscribes
+    decoders = {'stdlib': StdJsonDecoder()}
+    if orjson is not None:
+        decoders['orjson'] = OrjsonDecoder()
+    prefix = '{"event"'
+    for trades in (1, 10):
+        text = frame(trades)
+        for name, decoder in decoders.items():
+            def handle():
+                if text.startswith(prefix):
+                    return
+                data = decoder.loads(text)
+                parsers[data['arg']['channel']].parse(data)
+            seconds = _bench.best_of(handle, 20000)
+            print(f'{trades:>2} trades/frame {name:<7} {1 / seconds / 1000:>8.1f}k frames/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+parse time and memory of buffered OKEXTradesResp, the responses keep the raw strings and decode price, volume and
+ts on first access.
+"""
+import json
+import tracemalloc
+
+import _bench
+
+from mmm.core.datasource.okex.parser import TradesParser
+
+
+def frame(trades: int) -> dict:
+    return json.loads(json.dumps({
+        'arg': {'channel': 'trades', 'instId': 'BTC-USDT-SWAP'},
+        'data': [{'instId': 'BTC-USDT-SWAP', 'tradeId': str(130639474 + i), 'px': f'42219.{i}',
+                  'sz': '0.12060306', 'side': 'buy', 'ts': str(1630048897897 + i)} for i in range(trades)],
+    }))
+
+
+def main():
+    trades = 100
+    data = frame(trades)
+    parser = TradesParser()
+
+    def parse_and_read():
+        for each in parser.parse(data):
+            each.price
+
+    print(f'parse per trade               {_bench.us(_bench.best_of(lambda: parser.parse(data), 2000) / trades)}')
+    print(f'parse + read price per trade  {_bench.us(_bench.best_of(parse_and_read, 2000) / trades)}')
+
+    frames = [frame(trades) for _ in range(100)]  # allocated before tracing, only the responses are counted
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    buffered = [resp for each in frames for resp in parser.parse(each)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'memory per buffered trade     {(after - before) / len(buffered):.0f} B')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+a Sweep of 8 backtests, 4 bands x 2 sizes, over one day of synthetic trades recorded with zlib level 1 and without
+compression, by number of workers. the runs are independent, so on a box with enough cores the time falls with the
+workers until memory bandwidth runs out:
+
+    python benchmarks/sweep.py [--trades 2000000] [--workers 1,2,4]
+"""
+import argparse
+import itertools
+import os
+import tempfile
+
+import _bench  # noqa: F401, puts src on the path
+import numpy as np
+
+from mmm.core.backtest import Sweep
+from mmm.core.datasource.okex.subscription import OKEXTrades
+from mmm.core.recorder.segment import SegmentStore, SegmentWriter, key_to_parts
+from mmm.core.strategy.decorators import sub, timer
+from mmm.core.strategy.strategy import Strategy
+from mmm.project_types import Exchange
+
+
+INST_ID = 'BTC-USDT-SWAP'
+DAY = 86400 * 1000
+START = 1700006400000  # a multiple of the day
+
+
+class BandStrategy(Strategy):
+    """every minute a buy below and a sell above the last price, `band` apart"""
+    band = 0.001
+    size = 0.01
+
+    def __init__(self, bot_id, credential):
+        super().__init__(bot_id, credential)
+        self.last = None
+        self.ids = itertools.count()
+
+    @sub(OKEXTrades(INST_ID), batch=True)
+    def on_trades(self, batch):
+        self.last = float(batch.px[-1])
+
+    @timer(60)
+    def quote(self):
+        if self.last is None:
+            return
+        for side, px in (('buy', self.last * (1 - self.band)), ('sell', self.last * (1 + self.band))):
+            self.create_order(str(next(self.ids)), Exchange.OKEX, {
+                'instId': INST_ID, 'side': side, 'ordType': 'limit', 'px': f'{px:.1f}', 'sz': str(self.size)})
+
+
+def record(root: str, trades: int, compress_level: int):
+    """a random walk of trades over one day, one segment per hour"""
+    rnd = np.random.default_rng(7)
+    ts = np.sort(rnd.integers(START, START + DAY, trades)).astype(np.int64)
+    px = np.round(40000 * np.exp(np.cumsum(rnd.normal(0, 0.00005, trades))), 1)
+    columns = {'px': px, 'sz': np.round(rnd.uniform(0.001, 1, trades), 3), 'side': rnd.choice([-1, 1], trades),
+               'ts': ts}
+    store, key = SegmentStore(root), OKEXTrades(INST_ID).get_routing_key()
+    hours = ts // (store.partition * 1000)
+    bounds = np.flatnonzero(np.diff(hours)) + 1
+    for lo, hi in zip([0, *bounds], [*bounds, trades]):
+        start = store.partition_of(int(ts[lo]))
+        header = {'kind': 'TradeBatch', 'inst_id': INST_ID, 'key': key_to_parts(key), 'start': start,
+                  'partition': store.partition, 'numeric_mode': 'DECIMAL', 'precision': None,
+                  'columns': [[name, column.dtype.str, []] for name, column in columns.items()]}
+        writer = SegmentWriter(store.path_of(key, start), header, compress_level)
+        for b in range(lo, hi, 65536):
+            writer.append({name: column[b:min(b + 65536, hi)] for name, column in columns.items()})
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trades', type=int, default=2000000)
+    parser.add_argument('--workers', default='1,2,4')
+    args = parser.parse_args()
+    grid = {'band': [0.0005, 0.001, 0.002, 0.004], 'size': [0.01, 0.1]}
+    print(f'{os.cpu_count()} cpus, {args.trades} trades')
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for compress_level, name in ((1, 'zlib level 1'), (0, 'uncompressed, mapped')):
+            root = os.path.join(tmp, str(compress_level))
+            record(root, args.trades, compress_level)
+            for workers in [int(each) for each in args.workers.split(',')]:
+                result = Sweep(BandStrategy, grid, root, workers=workers).run()
+                per_run = sum(row['elapsed'] for row in result.rows) / len(result.rows)
+                print(f'{name:<22} workers={workers} {result.elapsed:.2f}s, {per_run:.2f}s per run')
+                results.setdefault(compress_level, []).append(
+                    sorted((tuple(row['params'].values()), row['pnl'], row['fills']) for row in result.rows))
+        assert all(each == results[1][0] for rows in results.values() for each in rows), 'results differ'
+
+
+if __name__ == '__main__':
+    main()
@@ -17,7 +17,11 @@ setup(
         "click==8.1.3",
         "prettytable==3.3.0",
         "SQLAlchemy-Utils==0.38.2",
-        "Flask==2.1.2"
+        "Flask==2.1.2",
+        "aio-pika==8.2.3",
+        "aiohttp==3.8.1",
+        "dateparser==1.1.1",
+        "pytz==2022.1"
     ],
     entry_points={
         'console_scripts': [
@@ -0,0 +1,3 @@
+from .engine import Backtest, BacktestResult
+from .handler import SimulatedOrderHandler, SimulatedOrderManager
+from .sweep import Sweep, SweepResult
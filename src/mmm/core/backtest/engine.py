@@ -0,0 +1,293 @@
+import heapq
+import inspect
+import itertools
+import logging
+import math
+
+from typing import Dict, List, Optional, Union
+
+from mmm.core.backtest.handler import PricePath, SimulatedOrderHandler, SimulatedOrderManager
+from mmm.core.clock import SimulatedClock, get_clock, set_clock
+from mmm.core.datasource.batch import BookBatch, CandleBatch, TradeBatch, np
+from mmm.core.datasource.replay import ReplayDatasource
+from mmm.core.recorder.segment import SegmentStore
+from mmm.core.strategy.scheduler import first_deadline
+from mmm.core.strategy.strategy import Strategy
+from mmm.exceptions import ConfigureError
+from mmm.project_types import OrderResult
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_TYPES = {each.__name__: each for each in (TradeBatch, CandleBatch, BookBatch)}
+
+
+class BacktestResult:
+    """orders of a backtest and its equity curve, sampled every equity_interval seconds."""
+
+    def __init__(self, orders: List["OrderResult"], fills: List[tuple], ts: "np.ndarray", cash: "np.ndarray",
+                 positions: Dict[str, "np.ndarray"], equity: "np.ndarray"):
+        """
+        @param fills: (ts, inst_id, signed size, price, fee) of every fill
+        @param ts: milliseconds of the samples
+        @param positions: inst_id -> position at every sample
+        """
+        self.orders = orders
+        self.fills = fills
+        self.ts = ts
+        self.cash = cash
+        self.positions = positions
+        self.equity = equity
+
+    @property
+    def pnl(self) -> float:
+        return float(self.equity[-1] - self.equity[0]) if len(self.equity) else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        """largest fall of the equity from a previous peak"""
+        return float((np.maximum.accumulate(self.equity) - self.equity).max()) if len(self.equity) else 0.0
+
+
+class _Feed:
+    """a subscription of the strategy and the columns of it in the loaded window."""
+
+    def __init__(self, sub, method, header: Dict):
+        self.sub = sub
+        self.method = method
+        self.is_async = inspect.iscoroutinefunction(method)
+        self.batch = getattr(method, '__batch__', False)
+        self.as_list = getattr(method, '__as_list__', False)
+        self.header = header
+        self.builder = ReplayDatasource.__builders__.get(type(sub))
+        self.columns: Dict[str, "np.ndarray"] = {}
+        self.make = None
+
+    def load(self, columns: Dict[str, "np.ndarray"]):
+        ts = columns.get('ts')
+        if ts is not None and len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+            order = np.argsort(ts, kind='stable')
+            columns = {name: column[order] for name, column in columns.items()}
+        self.columns = columns
+        self.make = self.builder(self.sub, self.header, columns) if not self.batch and len(self) else None
+
+    def __len__(self):
+        return len(self.columns.get('ts', ()))
+
+    def batch_of(self, lo: int, hi: int):
+        batch_type = BATCH_TYPES[self.header['kind']]
+        batch = batch_type.__new__(batch_type)
+        batch.inst_id = self.header['inst_id']
+        for name, column in self.columns.items():
+            setattr(batch, name, column[lo:hi])
+        return batch
+
+    def price_path(self) -> Optional["PricePath"]:
+        """prices in real units, scaled ints of NumericMode.FIXED are divided by the recorded precision"""
+        kind, columns = self.header['kind'], self.columns
+        scale = 10.0 ** self.header['precision'][0] if self.header['numeric_mode'] == 'FIXED' else 1.0
+        if kind == 'TradeBatch':
+            px = columns['px'] / scale
+            return PricePath(columns['ts'], px, px, px)
+        if kind == 'CandleBatch':
+            return PricePath(columns['ts'], columns['low'] / scale, columns['high'] / scale, columns['close'] / scale)
+        return None
+
+
+class Backtest:
+    """
+    runs an unchanged Strategy on recorded market data with a simulated clock. the data is loaded window by window
+    as columns, the subscriptions are merged in ts order and the timers fire at their simulated deadlines between
+    the rows. handlers of sub(..., batch=True) receive the rows up to the next deadline, at most batch_rows at a time,
+    as slices of the columns, other handlers receive one response per row like from the live datasources, as a list
+    of one response for sub(..., as_list=True).
+
+    orders of Strategy.create_order go to a SimulatedOrderHandler, see it for the fill model, the equity is the cash
+    plus the positions marked to the last price of their instrument. while it runs the clock of the process is a
+    SimulatedClock that follows the simulated time.
+    """
+
+    def __init__(self, strategy: "Strategy", root: Union[str, "SegmentStore"], start: Optional[int] = None,
+                 end: Optional[int] = None, handler: Optional["SimulatedOrderHandler"] = None,
+                 initial_cash: float = 0.0, window: int = 3600, batch_rows: int = 4096, equity_interval: int = 60):
+        """
+        @param root: root of the SegmentStore the data is recorded to, or the store
+        @param start: first ts in milliseconds, the first recorded ts if None
+        @param end: last ts in milliseconds, excluded, after the last recorded ts if None
+        @param window: seconds of data loaded at a time
+        @param batch_rows: most rows handed to a batch handler at a time
+        @param equity_interval: seconds between the samples of the equity curve
+        """
+        if np is None:
+            raise ConfigureError('numpy is required by Backtest.')
+        self.strategy = strategy
+        self.store = root if isinstance(root, SegmentStore) else SegmentStore(root)
+        self.handler = handler or SimulatedOrderHandler()
+        self.start = start
+        self.end = end
+        self.initial_cash = initial_cash
+        self.window = window
+        self.batch_rows = batch_rows
+        self.equity_interval = equity_interval
+        self.now = 0
+        self.clock = SimulatedClock()
+        self.rows = 0  # rows delivered to the strategy
+        self._timers: List[tuple] = []  # heap of (deadline, seq, first deadline, tick, interval, method)
+        self._seq = itertools.count()
+
+    def _feeds(self) -> List["_Feed"]:
+        feeds = []
+        for sub, method_name in self.strategy.get_sub_registry().items():
+            header = self.store.header(sub.get_routing_key())
+            feed = _Feed(sub, getattr(self.strategy, method_name), header)
+            if header is None:
+                logger.warning(f'nothing is recorded for {sub.__class__.__name__} {sub.get_routing_key()}.')
+            elif not feed.batch and feed.builder is None:
+                logger.warning(f'{sub.__class__.__name__} can not be replayed.')
+            else:
+                feeds.append(feed)
+        return feeds
+
+    def _span(self, feeds: List["_Feed"]):
+        spans = [self.store.span(each.sub.get_routing_key()) for each in feeds]
+        firsts = [first for first, _ in spans if first is not None]
+        lasts = [last for _, last in spans if last is not None]
+        start = self.start if self.start is not None else min(firsts, default=0)
+        end = self.end if self.end is not None else max(lasts, default=start - 1) + 1
+        return start, end
+
+    def _advance(self, now: int):
+        self.now = self.handler.now = now
+        self.handler.settle(now)
+        self.clock.set_time(now / 1000)
+
+    async def run(self) -> "BacktestResult":
+        previous = get_clock()
+        set_clock(self.clock)
+        try:
+            return await self._run()
+        finally:
+            set_clock(previous)
+
+    async def _run(self) -> "BacktestResult":
+        feeds = self._feeds()
+        start, end = self._span(feeds)
+        self.clock.set_time(start / 1000)
+        self.strategy.order_manager = SimulatedOrderManager(self.handler)
+        for interval, method_name in self.strategy.get_timer_registry().items():
+            method = getattr(self.strategy, method_name)
+            base = math.ceil(first_deadline(start / 1000, interval, getattr(method, '__timer_align__', False),
+                                            getattr(method, '__timer_offset__', 0)) * 1000)
+            heapq.heappush(self._timers, (base, next(self._seq), base, 0, interval, method))
+        samples = np.arange(start, end, self.equity_interval * 1000, dtype=np.int64)
+        marks: Dict[str, "np.ndarray"] = {}
+        step = self.window * 1000
+        for w0 in range(start, end, step):
+            w1 = min(w0 + step, end)
+            for feed in feeds:
+                feed.load(self.store.read(feed.sub.get_routing_key(), w0, w1))
+            paths = {}
+            for feed in feeds:
+                inst_id = feed.header['inst_id']
+                if len(feed) and (inst_id not in paths or feed.header['kind'] == 'TradeBatch'):
+                    path = feed.price_path()
+                    if path is not None:
+                        paths[inst_id] = path
+            self.handler.set_paths(paths)
+            self._mark(marks, paths, samples, w0, w1)
+            await self._run_window(feeds, w1)
+            self._advance(w1 - 1)
+        self._advance(end)
+        return self._result(samples, marks)
+
+    async def _run_window(self, feeds: List["_Feed"], w1: int):
+        loaded = [(k, each) for k, each in enumerate(feeds) if len(each)]
+        if loaded:
+            ts = np.concatenate([each.columns['ts'] for _, each in loaded])
+            ids = np.concatenate([np.full(len(each), k) for k, each in loaded])
+            rows = np.concatenate([np.arange(len(each)) for _, each in loaded])
+            order = np.lexsort((ids, ts))
+            ts, ids, rows = ts[order], ids[order], rows[order]
+        else:
+            ts = ids = rows = np.empty(0, np.int64)
+        has_batch = any(each.batch for each in feeds)
+        timers = self._timers
+        pos, n = 0, len(ts)
+        while True:
+            deadline = timers[0][0] if timers else None
+            stop = n if deadline is None else int(np.searchsorted(ts, deadline, 'left'))
+            if has_batch:
+                stop = min(stop, pos + self.batch_rows)
+            if stop > pos:
+                await self._deliver(feeds, ts, ids, rows, pos, stop)
+                pos = stop
+            elif deadline is not None and deadline < w1:
+                _, _, base, tick, interval, method = heapq.heappop(timers)
+                self._advance(deadline)
+                tick += 1
+                heapq.heappush(timers, (base + round(tick * interval * 1000), next(self._seq), base, tick, interval,
+                                        method))
+                rv = method()
+                if inspect.isawaitable(rv):
+                    await rv
+            else:
+                break
+
+    async def _deliver(self, feeds: List["_Feed"], ts, ids, rows, lo: int, hi: int):
+        self.rows += hi - lo
+        part_ids = ids[lo:hi]
+        singles = [k for k, each in enumerate(feeds) if not each.batch]
+        if singles:
+            mask = np.isin(part_ids, singles) if len(singles) < len(feeds) else slice(None)
+            for t, k, i in zip(ts[lo:hi][mask].tolist(), part_ids[mask].tolist(), rows[lo:hi][mask].tolist()):
+                self._advance(t)
+                feed = feeds[k]
+                rv = feed.method([feed.make(i)] if feed.as_list else feed.make(i))
+                if feed.is_async:
+                    await rv
+        for k, feed in enumerate(feeds):
+            if not feed.batch:
+                continue
+            mine = np.flatnonzero(part_ids == k)
+            if not len(mine):
+                continue
+            first, last = int(rows[lo + mine[0]]), int(rows[lo + mine[-1]])
+            self._advance(int(ts[lo + mine[-1]]))
+            rv = feed.method(feed.batch_of(first, last + 1))
+            if feed.is_async:
+                await rv
+
+    @staticmethod
+    def _mark(marks: Dict[str, "np.ndarray"], paths: Dict[str, "PricePath"], samples: "np.ndarray", w0: int, w1: int):
+        """last price of every instrument at the samples in the window, carried over from the window before."""
+        lo, hi = np.searchsorted(samples, [w0, w1])
+        for inst_id, path in paths.items():
+            if inst_id not in marks:
+                marks[inst_id] = np.full(len(samples), np.nan)
+            i = np.searchsorted(path.ts, samples[lo:hi], 'right') - 1
+            marks[inst_id][lo:hi] = np.where(i >= 0, path.last[np.maximum(i, 0)], np.nan)
+        for column in marks.values():
+            for j in range(max(lo, 1), hi):
+                if np.isnan(column[j]):
+                    column[j] = column[j - 1]
+
+    def _result(self, samples: "np.ndarray", marks: Dict[str, "np.ndarray"]) -> "BacktestResult":
+        fills = self.handler.fills
+        cash = np.full(len(samples), self.initial_cash)
+        positions = {}
+        equity = cash.copy()
+        if fills:
+            f_ts = np.array([each[0] for each in fills])
+            f_size = np.array([each[2] for each in fills])
+            f_cash = -f_size * np.array([each[3] for each in fills]) - np.array([each[4] for each in fills])
+            f_inst = np.array([each[1] for each in fills])
+            at = np.searchsorted(f_ts, samples, 'right')
+            cash = self.initial_cash + np.concatenate([[0.0], np.cumsum(f_cash)])[at]
+            equity = cash.copy()
+            for inst_id in dict.fromkeys(f_inst.tolist()):
+                size = np.where(f_inst == inst_id, f_size, 0.0)
+                position = np.concatenate([[0.0], np.cumsum(size)])[at]
+                positions[inst_id] = position
+                mark = np.nan_to_num(marks.get(inst_id, np.zeros(len(samples))))
+                equity += position * mark
+        return BacktestResult(list(self.handler.results.values()), list(fills), samples, cash, positions, equity)
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+
+from typing import Dict, List, Optional
+
+from mmm.core.datasource.batch import np
+from mmm.core.hub.inner_event_hub.event import OrderCreationEvent
+from mmm.core.order.handler import OrderHandler
+from mmm.core.order.manager import OrderManager
+from mmm.credential import Credential
+from mmm.project_types import OrderResult, OrderStatus
+
+
+TAKER_TYPES = ('market', 'ioc', 'fok')
+
+
+class PricePath:
+    """
+    prices of one instrument in a window of the backtest, a trade is a row whose low, high and last are its price,
+    a candle update is a row of its low, high and close.
+    """
+    __slots__ = ('ts', 'low', 'high', 'last')
+
+    def __init__(self, ts: "np.ndarray", low: "np.ndarray", high: "np.ndarray", last: "np.ndarray"):
+        self.ts = ts
+        self.low = low
+        self.high = high
+        self.last = last
+
+    def __len__(self):
+        return len(self.ts)
+
+    def first_cross(self, lo: int, is_buy: bool, price: float) -> int:
+        """index of the first row from lo that trades at or through price, len(self) if there is none."""
+        side = self.low if is_buy else self.high
+        n, step = len(side), 1024
+        while lo < n:
+            chunk = side[lo:lo + step]
+            hit = chunk <= price if is_buy else chunk >= price
+            i = int(hit.argmax())
+            if hit[i]:
+                return lo + i
+            lo, step = lo + len(chunk), step * 4
+        return n
+
+
+class SimOrder:
+    __slots__ = ('result', 'inst_id', 'is_buy', 'ord_type', 'px', 'sz', 'arrival', 'arrived')
+
+    def __init__(self, result: "OrderResult", inst_id: str, is_buy: bool, ord_type: str, px: Optional[float],
+                 sz: float, arrival: float):
+        self.result = result
+        self.inst_id = inst_id
+        self.is_buy = is_buy
+        self.ord_type = ord_type
+        self.px = px
+        self.sz = sz
+        self.arrival = arrival
+        self.arrived = False
+
+
+class SimulatedOrderHandler(OrderHandler):
+    """
+    fills orders against recorded trades or candles instead of sending them, okex and binance style params are
+    accepted. an order reaches the simulated exchange `latency` milliseconds after it is created, then
+
+    - market, ioc and fok orders take the first price at or after the arrival, moved by `slippage` against them.
+    - limit and post_only orders that are marketable on arrival are filled the same way but never beyond their price,
+      post_only ones are rejected instead. other orders rest and are filled at their price by the first trade at or
+      through it.
+    - ioc and fok orders that are not marketable on arrival are canceled.
+
+    orders are filled completely, there is no queue position or partial fill. a fill is visible to query_order and
+    the equity only from its ts. prices and sizes are floats, sizes are in the base currency.
+    """
+
+    def __init__(self, credential: Optional["Credential"] = None, latency: float = 0.0, maker_fee: float = 0.0002,
+                 taker_fee: float = 0.0005, slippage: float = 0.0):
+        """
+        @param latency: milliseconds between the creation of an order and its arrival
+        @param maker_fee: fee rate of resting orders, negative for rebates
+        @param taker_fee: fee rate of orders that take liquidity
+        @param slippage: basis points a taker fill is moved against the order
+        """
+        super().__init__(credential)
+        self.latency = latency
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage = slippage
+        self.now = 0.0  # milliseconds of the simulated clock, set by the backtest
+        self.results: Dict[str, "OrderResult"] = {}
+        self.fills: List[tuple] = []  # (ts, inst_id, signed size, price, fee) of the settled fills
+        self._paths: Dict[str, "PricePath"] = {}
+        self._waiting: List["SimOrder"] = []  # orders that are not filled in the loaded window yet
+        self._settling: List[tuple] = []  # heap of (ts, seq, order, price, fee rate, exec type or reject reason)
+        self._seq = itertools.count()
+
+    async def create_order(self, event: "OrderCreationEvent") -> "OrderResult":
+        return self.submit(event)
+
+    def query_order(self, uniq_id: str) -> Optional["OrderResult"]:
+        return self.results.get(uniq_id)
+
+    def submit(self, event: "OrderCreationEvent") -> "OrderResult":
+        params = event.params
+        seq = next(self._seq)
+        result = OrderResult(
+            uniq_id=event.uniq_id,
+            exchange=event.exchange,
+            strategy_name=event.strategy_name,
+            strategy_bot_id=event.bot_id,
+            client_order_id=params.get('clOrdId') or params.get('newClientOrderId') or '',
+            order_params=params,
+            status=OrderStatus.CREATED,
+            order_id=str(seq)
+        )
+        self.results[event.uniq_id] = result
+        try:
+            inst_id = params.get('instId') or params['symbol']
+            side = params['side'].lower()
+            ord_type = (params.get('ordType') or params['type']).lower()
+            sz = float(params.get('sz') or params['quantity'])
+            px = params.get('px') or params.get('price')
+            px = None if px is None or ord_type == 'market' else float(px)
+        except (KeyError, TypeError, ValueError) as e:
+            return self._reject(result, f'invalid params, {e!r}')
+        if ord_type not in TAKER_TYPES + ('limit', 'post_only') or side not in ('buy', 'sell'):
+            return self._reject(result, f'{ord_type} {side} orders are not simulated')
+        if px is None and ord_type != 'market':
+            return self._reject(result, f'{ord_type} orders require a price')
+        order = SimOrder(result, inst_id, side == 'buy', ord_type, px, sz, self.now + self.latency)
+        if not self._match(order):
+            self._waiting.append(order)
+        return result
+
+    def set_paths(self, paths: Dict[str, "PricePath"]):
+        """prices of the next window, orders that are still waiting are matched against them."""
+        self._paths = paths
+        waiting, self._waiting = self._waiting, []
+        for order in waiting:
+            if not self._match(order):
+                self._waiting.append(order)
+
+    def _match(self, order: "SimOrder") -> bool:
+        """find the fill of the order in the loaded window, False if it has to wait for the next one."""
+        path = self._paths.get(order.inst_id)
+        if path is None or not len(path):
+            return False
+        lo = int(np.searchsorted(path.ts, order.arrival, 'left'))
+        if lo == len(path):
+            return False
+        if not order.arrived:
+            order.arrived = True
+            ref = float(path.last[lo])
+            marketable = order.px is None or (ref <= order.px if order.is_buy else ref >= order.px)
+            if marketable:
+                if order.ord_type == 'post_only':
+                    self._schedule(float(path.ts[lo]), order, None, 0.0, 'post_only order would take liquidity')
+                    return True
+                price = ref * (1 + self.slippage / 10000) if order.is_buy else ref * (1 - self.slippage / 10000)
+                if order.px is not None:
+                    price = min(price, order.px) if order.is_buy else max(price, order.px)
+                self._schedule(float(path.ts[lo]), order, price, self.taker_fee, 'T')
+                return True
+            if order.ord_type in TAKER_TYPES:
+                self._schedule(float(path.ts[lo]), order, None, 0.0, f'{order.ord_type} order is not marketable')
+                return True
+        i = path.first_cross(lo, order.is_buy, order.px)
+        if i == len(path):
+            return False
+        self._schedule(float(path.ts[i]), order, order.px, self.maker_fee, 'M')
+        return True
+
+    def _schedule(self, ts: float, order: "SimOrder", price: Optional[float], fee_rate: float, exec_type: str):
+        """the order is filled at ts, or rejected with exec_type as the reason if price is None."""
+        heapq.heappush(self._settling, (ts, next(self._seq), order, price, fee_rate, exec_type))
+
+    @staticmethod
+    def _reject(result: "OrderResult", msg: str) -> "OrderResult":
+        result.status = OrderStatus.FAILED
+        result.msg = msg
+        return result
+
+    def next_fill_at(self) -> Optional[float]:
+        return self._settling[0][0] if self._settling else None
+
+    def settle(self, now: float):
+        """apply the fills up to now."""
+        settling = self._settling
+        while settling and settling[0][0] <= now:
+            ts, _, order, price, fee_rate, exec_type = heapq.heappop(settling)
+            if price is None:
+                self._reject(order.result, exec_type)
+                continue
+            fee = price * order.sz * fee_rate
+            result = order.result
+            result.status = OrderStatus.SUCCESS
+            result.exchange_resp = {'fillPx': price, 'fillSz': order.sz, 'fee': fee, 'fillTime': int(ts),
+                                    'execType': exec_type, 'state': 'filled'}
+            self.fills.append((ts, order.inst_id, order.sz if order.is_buy else -order.sz, price, fee))
+
+
+class SimulatedOrderManager(OrderManager):
+    """order manager of a strategy under backtest, orders go to the simulated handler instead of the executor."""
+
+    def __init__(self, handler: "SimulatedOrderHandler"):
+        super().__init__()
+        self.handler = handler
+
+    def create_order(self, order_event: "OrderCreationEvent"):
+        self.handler.submit(order_event)
+
+    def query_order(self, uniq_id) -> Optional["OrderResult"]:
+        return self.handler.query_order(uniq_id)
+
+    async def query_order_async(self, uniq_id, timeout):
+        return self.handler.query_order(uniq_id)
@@ -0,0 +1,103 @@
+import asyncio
+import itertools
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Type
+
+from mmm.core.backtest.engine import Backtest
+from mmm.core.backtest.handler import SimulatedOrderHandler
+from mmm.core.recorder.segment import SegmentStore
+from mmm.core.strategy.strategy import Strategy
+from mmm.credential import Credential
+
+
+_store: Optional["SegmentStore"] = None  # mapped store of a worker process, shared by its runs
+
+
+def _init_worker(root: str):
+    global _store
+    _store = SegmentStore(root, mapped=True)
+
+
+def _run(strategy_cls: Type["Strategy"], params: Dict, start: Optional[int], end: Optional[int], handler_kwargs: Dict,
+         backtest_kwargs: Dict, bot_id: str, credential: "Credential") -> Dict:
+    begin = time.perf_counter()
+    strategy = strategy_cls(bot_id, credential)
+    for name, value in params.items():
+        setattr(strategy, name, value)
+    bt = Backtest(strategy, _store, start, end, SimulatedOrderHandler(**handler_kwargs), **backtest_kwargs)
+    result = asyncio.run(bt.run())
+    return {
+        'params': params,
+        'pnl': result.pnl,
+        'max_drawdown': result.max_drawdown,
+        'orders': len(result.orders),
+        'fills': len(result.fills),
+        'fees': sum(each[4] for each in result.fills),
+        'rows': bt.rows,
+        'elapsed': time.perf_counter() - begin,
+    }
+
+
+class SweepResult:
+    """one row per combination of the grid, sorted by pnl, the best first."""
+
+    def __init__(self, names: List[str], rows: List[Dict], elapsed: float):
+        """
+        @param names: names of the params in the order of the grid
+        @param elapsed: seconds of the whole sweep
+        """
+        self.names = names
+        self.rows = sorted(rows, key=lambda each: each['pnl'], reverse=True)
+        self.elapsed = elapsed
+
+    @property
+    def best(self) -> Optional[Dict]:
+        return self.rows[0] if self.rows else None
+
+
+class Sweep:
+    """
+    backtests a Strategy class once for every combination of a grid of params, the runs are spread over a pool of
+    processes. every worker keeps the segments mapped for all of its runs, so the workers share the pages of the
+    recorded data through the page cache instead of reading their own copies, segments recorded with
+    compress_level=0 are also never decoded.
+
+    the params are set as attributes of the strategy before it runs, the class and the values must be picklable.
+    """
+
+    def __init__(self, strategy_cls: Type["Strategy"], grid: Dict[str, Sequence], root: str,
+                 start: Optional[int] = None, end: Optional[int] = None, handler_kwargs: Optional[Dict] = None,
+                 credential: Optional["Credential"] = None, workers: Optional[int] = None, **backtest_kwargs):
+        """
+        @param grid: name of a param -> values it takes
+        @param handler_kwargs: kwargs of the SimulatedOrderHandler of every run
+        @param workers: processes of the pool, os.cpu_count() if None
+        @param backtest_kwargs: other kwargs of Backtest, such as initial_cash or window
+        """
+        self.strategy_cls = strategy_cls
+        self.grid = grid
+        self.root = root
+        self.start = start
+        self.end = end
+        self.handler_kwargs = handler_kwargs or {}
+        self.credential = credential or Credential('', '', account='sweep')
+        self.workers = workers or os.cpu_count() or 1
+        self.backtest_kwargs = backtest_kwargs
+
+    def combinations(self) -> List[Dict]:
+        names = list(self.grid)
+        return [dict(zip(names, values)) for values in itertools.product(*self.grid.values())]
+
+    def run(self) -> "SweepResult":
+        begin = time.perf_counter()
+        combinations = self.combinations()
+        with ProcessPoolExecutor(min(self.workers, len(combinations) or 1), initializer=_init_worker,
+                                 initargs=(self.root,)) as executor:
+            futures = [executor.submit(_run, self.strategy_cls, params, self.start, self.end, self.handler_kwargs,
+                                       self.backtest_kwargs, f'sweep.{i}', self.credential)
+                       for i, params in enumerate(combinations)]
+            rows = [each.result() for each in futures]
+        return SweepResult(list(self.grid), rows, time.perf_counter() - begin)
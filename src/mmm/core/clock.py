@@ -0,0 +1,149 @@
+"""
+clocks of the bots, timers, watchdogs and order id generators.
+
+time() is the wall clock in seconds since the epoch, monotonic() only moves forward and is what deadlines are
+measured with, sleep() waits on the clock. RealClock reads the system, AcceleratedClock runs `speed` times as fast
+and SimulatedClock only moves when it is advanced, so hours of timer driven logic run in milliseconds.
+"""
+import asyncio
+import heapq
+import itertools
+import time as _time
+
+from abc import ABCMeta, abstractmethod
+from typing import List, Optional
+
+
+class Clock(metaclass=ABCMeta):
+
+    @abstractmethod
+    def time(self) -> float:
+        """seconds since the epoch"""
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        """seconds of a clock that never goes back"""
+
+    @abstractmethod
+    async def sleep(self, seconds: float): ...
+
+    async def sleep_until(self, deadline: float):
+        """
+        @param deadline: monotonic() to wake up at
+        """
+        await self.sleep(deadline - self.monotonic())
+
+
+class RealClock(Clock):
+    time = staticmethod(_time.time)
+    monotonic = staticmethod(_time.monotonic)  # the clock of the asyncio loop
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class AcceleratedClock(Clock):
+    """the system clock sped up by speed from the moment the clock is created."""
+
+    def __init__(self, speed: float, origin: Optional[float] = None):
+        """
+        @param speed: simulated seconds per real second
+        @param origin: time() at the creation, the system time if None
+        """
+        if speed <= 0:
+            raise ValueError('speed must be positive.')
+        self.speed = speed
+        self._real_time = _time.time()
+        self._real_monotonic = _time.monotonic()
+        self._origin = self._real_time if origin is None else origin
+
+    def time(self) -> float:
+        return self._origin + (_time.time() - self._real_time) * self.speed
+
+    def monotonic(self) -> float:
+        return self._real_monotonic + (_time.monotonic() - self._real_monotonic) * self.speed
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.speed)
+
+
+class SimulatedClock(Clock):
+    """
+    a clock that stands still until it is advanced, sleepers are woken in the order of their deadlines with the clock
+    set to their deadline. time() and monotonic() are the same value.
+    """
+
+    def __init__(self, start: float = 0.0):
+        """
+        @param start: time() of the clock at the creation
+        """
+        self.now = start
+        self._sleepers: List[tuple] = []  # heap of (deadline, seq, future)
+        self._seq = itertools.count()
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + seconds, next(self._seq), future))
+        try:
+            await future
+        finally:
+            future.cancel()  # a cancelled sleeper is skipped when it is due
+
+    def next_deadline(self) -> Optional[float]:
+        return self._sleepers[0][0] if self._sleepers else None
+
+    def set_time(self, now: float):
+        """move the clock forward to now and wake the sleepers that are due, they run once the caller yields."""
+        sleepers = self._sleepers
+        while sleepers and sleepers[0][0] <= now:
+            deadline, _, future = heapq.heappop(sleepers)
+            if not future.done():
+                future.set_result(None)
+        if now > self.now:
+            self.now = now
+
+    async def advance(self, seconds: float):
+        """
+        move the clock forward by seconds, stopping at the deadline of every sleeper so that it runs, and the
+        sleeps it starts, before the clock moves on. woken tasks must only wait on the clock or on things that are
+        ready, anything else is not waited for.
+        """
+        await self.advance_to(self.now + seconds)
+
+    async def advance_to(self, now: float):
+        sleepers = self._sleepers
+        while sleepers and sleepers[0][0] <= now:
+            deadline, _, future = heapq.heappop(sleepers)
+            if future.done():
+                continue
+            self.now = max(self.now, deadline)
+            future.set_result(None)
+            # once for the woken task to run up to its next await and once for the tasks it woke
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        self.now = max(self.now, now)
+
+
+_clock: Optional["Clock"] = None
+
+
+def get_clock() -> "Clock":
+    global _clock
+    if _clock is None:
+        _clock = RealClock()
+    return _clock
+
+
+def set_clock(clock: "Clock"):
+    """clock of the process, set it before the bots and connections are created."""
+    global _clock
+    _clock = clock
@@ -0,0 +1,118 @@
+from typing import List, Sequence
+
+from mmm.numeric import get_mode
+from mmm.project_types import NumericMode
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+SIDES = {'buy': 1, 'sell': -1}
+
+
+def _numbers(values, n):
+    """prices and sizes are int64 in NumericMode.FIXED, float64 otherwise."""
+    if get_mode() is NumericMode.FIXED:
+        return np.fromiter(values, np.int64, n)
+    return np.fromiter((float(each) for each in values), np.float64, n)
+
+
+class TradeBatch:
+    """columns of the trades that were pending for one subscription, side is 1 for buy and -1 for sell."""
+    __slots__ = ('inst_id', 'px', 'sz', 'side', 'ts')
+
+    def __init__(self, inst_id: str, px: "np.ndarray", sz: "np.ndarray", side: "np.ndarray", ts: "np.ndarray"):
+        self.inst_id = inst_id
+        self.px = px
+        self.sz = sz
+        self.side = side
+        self.ts = ts
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_responses(cls, responses: Sequence) -> "TradeBatch":
+        n = len(responses)
+        return cls(
+            inst_id=responses[0].inst_id,
+            px=_numbers((each.price for each in responses), n),
+            sz=_numbers((each.volume for each in responses), n),
+            side=np.fromiter((SIDES[each.side] for each in responses), np.int8, n),
+            ts=np.fromiter((each.ts_ms for each in responses), np.int64, n),
+        )
+
+
+class CandleBatch:
+    """columns of the candle updates that were pending for one subscription."""
+    __slots__ = ('inst_id', 'ts', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, inst_id: str, ts: "np.ndarray", open_: "np.ndarray", high: "np.ndarray",
+                 low: "np.ndarray", close: "np.ndarray", volume: "np.ndarray"):
+        self.inst_id = inst_id
+        self.ts = ts
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_responses(cls, responses: Sequence) -> "CandleBatch":
+        n = len(responses)
+        return cls(
+            inst_id=responses[0].inst_id,
+            ts=np.fromiter((each.ts_ms for each in responses), np.int64, n),
+            open_=_numbers((each.open_price for each in responses), n),
+            high=_numbers((each.high_price for each in responses), n),
+            low=_numbers((each.low_price for each in responses), n),
+            close=_numbers((each.close_price for each in responses), n),
+            volume=_numbers((each.volume for each in responses), n),
+        )
+
+
+class BookBatch:
+    """
+    the top `depth` levels of a book, a batch holds one row, the book of the last response, since every response
+    carries the whole top of the book. missing levels are 0, seq_id is -1 while the book waits for a snapshot.
+    """
+    __slots__ = ('inst_id', 'ts', 'seq_id', 'bid_px', 'bid_sz', 'ask_px', 'ask_sz')
+
+    def __init__(self, inst_id: str, ts: "np.ndarray", seq_id: "np.ndarray", bid_px: "np.ndarray",
+                 bid_sz: "np.ndarray", ask_px: "np.ndarray", ask_sz: "np.ndarray"):
+        self.inst_id = inst_id
+        self.ts = ts
+        self.seq_id = seq_id
+        self.bid_px = bid_px
+        self.bid_sz = bid_sz
+        self.ask_px = ask_px
+        self.ask_sz = ask_sz
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def from_responses(cls, responses: Sequence, depth: int = 5) -> "BookBatch":
+        book = responses[-1].book
+        bids, asks = book.top(depth)
+        columns = []
+        for levels in (bids, asks):
+            levels = levels + [(0, 0)] * (depth - len(levels))
+            columns.append(_numbers((px for px, _ in levels), depth).reshape(1, depth))
+            columns.append(_numbers((sz for _, sz in levels), depth).reshape(1, depth))
+        return cls(
+            book.inst_id,
+            np.array([int(book.ts or 0)], np.int64),
+            np.array([book.seq_id], np.int64),
+            *columns
+        )
+
+
+def make_batch(responses: List):
+    """columnar batch of responses of one subscription, the response type names its batch type."""
+    return type(responses[0]).__batch_type__.from_responses(responses)
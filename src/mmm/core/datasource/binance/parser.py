@@ -0,0 +1,41 @@
+from typing import Dict, List
+
+from mmm.core.datasource.binance.subscription import BinanceKlineResp, BinanceTradesResp
+from mmm.core.datasource.parser import Parser, ParserFactory
+
+
+class TradeParser(Parser):
+
+    def __init__(self, keep_raw: bool = False):
+        """
+        :param keep_raw: whether responses keep a reference to the raw frame
+        """
+        self.keep_raw = keep_raw
+
+    def parse(self, data: Dict) -> List["BinanceTradesResp"]:
+        """
+        :param data: event of the combined stream, {"stream": "btcusdt@trade", "data": {...}}
+        """
+        each = data['data']
+        # m is whether the buyer is the maker, the taker sold then
+        return [BinanceTradesResp(each['s'], each['p'], each['q'], 'sell' if each['m'] else 'buy', each['T'],
+                                  data if self.keep_raw else None, str(each['t']))]
+
+
+class KlineParser(Parser):
+
+    def __init__(self, keep_raw: bool = False):
+        """
+        :param keep_raw: whether responses keep a reference to the raw frame
+        """
+        self.keep_raw = keep_raw
+
+    def parse(self, data: Dict) -> List["BinanceKlineResp"]:
+        k = data['data']['k']
+        return [BinanceKlineResp(k['s'], k['i'], k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['q'],
+                                 data if self.keep_raw else None)]
+
+
+parser_factory = ParserFactory()
+parser_factory.register('trade', TradeParser())
+parser_factory.register('kline', KlineParser())
@@ -0,0 +1,159 @@
+from abc import abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Union
+
+from mmm.core.datasource.batch import CandleBatch, TradeBatch
+from mmm.core.datasource.okex.subscription import ms_to_datetime, to_raw
+from mmm.core.hub.codec import codec, Str
+from mmm.core.hub.datasource_msg_hub.subscription import LazyField, Subscription, ResponseOfSub
+from mmm.numeric import Number, parse_price, parse_size
+from mmm.project_types import Exchange
+
+
+class BinanceSubscription(Subscription):
+    def get_exchange(self) -> "Exchange":
+        return Exchange.BINANCE
+
+    @abstractmethod
+    def get_stream(self) -> str:
+        """
+        @return: name of the stream on the combined stream endpoint, e.g. btcusdt@trade
+        """
+
+
+class BinanceResponseOfSub(ResponseOfSub):
+    __slots__ = ()
+
+    def get_exchange(self) -> "Exchange":
+        return Exchange.BINANCE
+
+    @property
+    def inst_id(self) -> str:
+        return self.symbol
+
+
+class BinanceTrades(BinanceSubscription):
+    """https://binance-docs.github.io/apidocs/spot/en/#trade-streams"""
+    __batch_type__ = TradeBatch
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+
+    def equal_to(self, obj: "BinanceTrades"):
+        return isinstance(obj, BinanceTrades) and self.symbol == obj.symbol
+
+    def get_routing_key(self):
+        return Exchange.BINANCE, 'trade', self.symbol
+
+    def get_stream(self):
+        return f'{self.symbol.lower()}@trade'
+
+
+@codec.register(110, symbol=Str(), trade_id=Str(), side=Str(), _px=Str(), _sz=Str(), _ts=Str())
+class BinanceTradesResp(BinanceResponseOfSub):
+    """
+    https://binance-docs.github.io/apidocs/spot/en/#trade-streams
+
+    side is the side of the taker, raw strings are kept and decoded on first access like OKEXTradesResp.
+    """
+    __slots__ = ('symbol', 'trade_id', 'side', '_px', '_sz', '_ts', '_price', '_volume', '_ts_ms', '_ts_dt')
+    __batch_type__ = TradeBatch
+
+    price: "Number" = LazyField('_px', parse_price, 'symbol')
+    volume: "Number" = LazyField('_sz', parse_size, 'symbol')
+    ts_ms: int = LazyField('_ts', int)
+    ts_dt: "datetime" = LazyField('_ts', ms_to_datetime)
+
+    def __init__(self, symbol: str, price: Union[str, Decimal], volume: Union[str, Decimal], side: str,
+                 ts: Union[str, int, datetime], origin_data: Optional[Dict] = None, trade_id: str = ''):
+        super().__init__(origin_data)
+        self.symbol: str = symbol
+        self.trade_id: str = trade_id
+        self.side: str = side
+        self._px: str = to_raw(price)
+        self._sz: str = to_raw(volume)
+        self._ts: str = to_raw(ts)
+
+    @property
+    def ts(self) -> "datetime":
+        return self.ts_dt
+
+    def response_for(self, obj: "Subscription") -> bool:
+        return isinstance(obj, BinanceTrades) and obj.symbol == self.symbol
+
+    def get_routing_key(self):
+        return Exchange.BINANCE, 'trade', self.symbol
+
+    def get_dedup_key(self):
+        return 'trade', self.symbol, self.trade_id
+
+
+class BinanceKline(BinanceSubscription):
+    """https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-streams"""
+    __batch_type__ = CandleBatch
+
+    def __init__(self, symbol: str, interval: str):
+        """
+        @param interval: 1m, 5m, 1h, 1d...
+        """
+        self.symbol = symbol.upper()
+        self.interval = interval
+
+    def equal_to(self, obj: "BinanceKline"):
+        return isinstance(obj, BinanceKline) and obj.symbol == self.symbol and obj.interval == self.interval
+
+    def get_routing_key(self):
+        return Exchange.BINANCE, f'kline_{self.interval}', self.symbol
+
+    def get_stream(self):
+        return f'{self.symbol.lower()}@kline_{self.interval}'
+
+
+@codec.register(111, symbol=Str(), interval=Str(), _ts=Str(), _o=Str(), _h=Str(), _l=Str(), _c=Str(), _vol=Str(),
+                _vol_ccy=Str())
+class BinanceKlineResp(BinanceResponseOfSub):
+    """
+    https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-streams
+
+    ts is the start time of the kline, raw strings are kept and decoded on first access like OKEXCandleResp.
+    """
+    __slots__ = ('symbol', 'interval', '_ts', '_o', '_h', '_l', '_c', '_vol', '_vol_ccy', '_open_price',
+                 '_high_price', '_low_price', '_close_price', '_volume', '_volume_ccy', '_ts_ms', '_ts_dt')
+    __batch_type__ = CandleBatch
+
+    open_price: "Number" = LazyField('_o', parse_price, 'symbol')
+    high_price: "Number" = LazyField('_h', parse_price, 'symbol')
+    low_price: "Number" = LazyField('_l', parse_price, 'symbol')
+    close_price: "Number" = LazyField('_c', parse_price, 'symbol')
+    volume: "Number" = LazyField('_vol', parse_size, 'symbol')
+    volume_ccy: "Decimal" = LazyField('_vol_ccy', Decimal)  # quote asset volume stays Decimal in every mode
+    ts_ms: int = LazyField('_ts', int)
+    ts_dt: "datetime" = LazyField('_ts', ms_to_datetime)
+
+    def __init__(self, symbol: str, interval: str, ts: Union[str, int, datetime], open_price: Union[str, Decimal],
+                 high_price: Union[str, Decimal], low_price: Union[str, Decimal], close_price: Union[str, Decimal],
+                 volume: Union[str, Decimal], volume_ccy: Union[str, Decimal], origin_data: Optional[Dict] = None):
+        super().__init__(origin_data)
+        self.symbol: str = symbol
+        self.interval: str = interval
+        self._ts: str = to_raw(ts)
+        self._o: str = to_raw(open_price)
+        self._h: str = to_raw(high_price)
+        self._l: str = to_raw(low_price)
+        self._c: str = to_raw(close_price)
+        self._vol: str = to_raw(volume)
+        self._vol_ccy: str = to_raw(volume_ccy)
+
+    @property
+    def ts(self) -> "datetime":
+        return self.ts_dt
+
+    def response_for(self, obj: "Subscription") -> bool:
+        return isinstance(obj, BinanceKline) and obj.symbol == self.symbol and obj.interval == self.interval
+
+    def get_routing_key(self):
+        return Exchange.BINANCE, f'kline_{self.interval}', self.symbol
+
+    def get_conflation_key(self):
+        return Exchange.BINANCE, f'kline_{self.interval}', self.symbol, self._ts
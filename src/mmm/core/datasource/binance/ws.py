@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+from typing import Dict, List
+
+from mmm.core.datasource.base import DataSource
+from mmm.core.datasource.binance.parser import parser_factory
+from mmm.core.datasource.binance.subscription import BinanceSubscription
+from mmm.core.datasource.parser import Parser, ParserFactory
+from mmm.third_party.binance.client import AsyncClient
+from mmm.third_party.binance.streams import BinanceSocketManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class BinanceWsDatasource(DataSource):
+    """
+    streams of all subscriptions are packed into combined stream connections, each of them carries up to
+    max_streams_per_connection streams. the vendored ReconnectingWebsocket reconnects a dropped connection,
+    the connection is opened again after it gives up.
+    """
+    __max_streams__ = 1024  # streams binance allows on one connection
+    __reopen_interval__ = 5
+
+    def __init__(self, factory: "ParserFactory" = parser_factory, max_streams_per_connection: int = __max_streams__,
+                 tld: str = 'com', testnet: bool = False):
+        super().__init__()
+        self.parser_factory: "ParserFactory" = factory
+        self.max_streams_per_connection = max_streams_per_connection
+        self.tld = tld
+        self.testnet = testnet
+        self._parsers: Dict[str, "Parser"] = {}
+
+    def get_parser(self, stream: str) -> "Parser":
+        """btcusdt@kline_1m -> parser of kline_1m"""
+        parser = self._parsers.get(stream)
+        if parser is None:
+            parser = self._parsers[stream] = self.parser_factory.get(stream[stream.index('@') + 1:])
+        return parser
+
+    async def subscribe(self, subscriptions: List["BinanceSubscription"]):
+        streams = list(dict.fromkeys(sub.get_stream() for sub in subscriptions))
+        for stream in streams:
+            self.get_parser(stream)
+        client = AsyncClient(tld=self.tld, testnet=self.testnet)
+        try:
+            bm = BinanceSocketManager(client)
+            n = self.max_streams_per_connection
+            await asyncio.gather(*[self._run(bm, streams[start:start + n]) for start in range(0, len(streams), n)])
+        finally:
+            await client.close_connection()
+
+    async def _run(self, bm: "BinanceSocketManager", streams: List[str]):
+        while True:
+            try:
+                async with bm.multiplex_socket(streams) as socket:
+                    error = None
+                    while error is None:
+                        for msg in await socket.recv_batch():
+                            if msg.get('e') == 'error':
+                                error = msg['m']
+                                break
+                            for each in self.get_parser(msg['stream']).parse(msg):
+                                self.ds_msg_hub.publish(each)
+                        await self.ds_msg_hub.flush()
+                    logger.error(f'combined stream of {len(streams)} streams failed, {error}')
+            except Exception as e:
+                logger.exception(e)
+            logger.info(f'reopen combined stream of {len(streams)} streams in {self.__reopen_interval__}s...')
+            await asyncio.sleep(self.__reopen_interval__)
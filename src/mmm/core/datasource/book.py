@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from mmm.numeric import Number, format_price, parse_price, parse_size
+
+
+class BookSide:
+    """
+    price levels of one side of a book kept in parallel arrays sorted from the best price, raw price and size
+    strings are kept as they are received. a level is found by bisecting float keys, bids use negated keys so
+    that both sides are ascending.
+    """
+    __slots__ = ('_sign', '_keys', 'prices', 'sizes')
+
+    def __init__(self, is_bid: bool):
+        self._sign = -1.0 if is_bid else 1.0
+        self._keys: List[float] = []
+        self.prices: List[str] = []
+        self.sizes: List[str] = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self.prices.clear()
+        self.sizes.clear()
+
+    def replace(self, levels: Iterable[Sequence[str]]):
+        """levels of a snapshot, they must be sorted from the best price."""
+        self.clear()
+        for level in levels:
+            self._keys.append(self._sign * float(level[0]))
+            self.prices.append(level[0])
+            self.sizes.append(level[1])
+
+    def update(self, price: str, size: str):
+        """set the size of a level, the level is removed when size is 0."""
+        key = self._sign * float(price)
+        i = bisect_left(self._keys, key)
+        found = i < len(self._keys) and self._keys[i] == key
+        if float(size) == 0:
+            if found:
+                del self._keys[i], self.prices[i], self.sizes[i]
+        elif found:
+            self.sizes[i] = size
+        else:
+            self._keys.insert(i, key)
+            self.prices.insert(i, price)
+            self.sizes.insert(i, size)
+
+    def size_at(self, price: str) -> Optional[str]:
+        key = self._sign * float(price)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self.sizes[i]
+        return None
+
+
+Levels = Tuple[Tuple[str, str], ...]  # raw (price, size) from the best price
+
+
+class BookSnapshot:
+    """
+    the best levels of an OrderBook at one moment, it is not changed by the frames applied later, so it can be shared
+    by consumers and sent to other processes. prices and sizes are returned in the numeric mode like OrderBook.
+    """
+    __slots__ = ('inst_id', 'seq_id', 'ts', 'bids', 'asks')
+
+    def __init__(self, inst_id: str, seq_id: int, ts: str, bids: "Levels", asks: "Levels"):
+        """
+        @param seq_id: -1 if the book waits for a snapshot
+        """
+        self.inst_id = inst_id
+        self.seq_id = seq_id
+        self.ts = ts
+        self.bids = bids
+        self.asks = asks
+
+    def _levels(self, levels: "Levels", n: int) -> List[Tuple["Number", "Number"]]:
+        return [(parse_price(price, self.inst_id), parse_size(size, self.inst_id)) for price, size in levels[:n]]
+
+    def top(self, n: int = 1) -> Tuple[List[Tuple["Number", "Number"]], List[Tuple["Number", "Number"]]]:
+        """
+        @return: ([(price, size) of the best n bids], [(price, size) of the best n asks])
+        """
+        return self._levels(self.bids, n), self._levels(self.asks, n)
+
+    @property
+    def best_bid(self) -> Optional["Number"]:
+        return parse_price(self.bids[0][0], self.inst_id) if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional["Number"]:
+        return parse_price(self.asks[0][0], self.inst_id) if self.asks else None
+
+    def depth_at(self, price: "Number") -> Optional["Number"]:
+        """
+        @return: size resting at the price on either side, None if there is no such level in the snapshot
+        """
+        key = float(format_price(price, self.inst_id))
+        for levels in (self.bids, self.asks):
+            for raw, size in levels:
+                if float(raw) == key:
+                    return parse_size(size, self.inst_id)
+        return None
+
+
+class OrderBook:
+    """incremental L2 book of one instrument, prices and sizes are returned in the numeric mode, see mmm.numeric."""
+    __slots__ = ('inst_id', 'bids', 'asks', 'seq_id', 'ts', 'synced')
+
+    def __init__(self, inst_id: str):
+        self.inst_id = inst_id
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.seq_id = -1
+        self.ts = ''
+        self.synced = False
+
+    def apply_snapshot(self, bids: Iterable[Sequence[str]], asks: Iterable[Sequence[str]]):
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+        self.synced = True
+
+    def apply_update(self, bids: Iterable[Sequence[str]], asks: Iterable[Sequence[str]]):
+        for level in bids:
+            self.bids.update(level[0], level[1])
+        for level in asks:
+            self.asks.update(level[0], level[1])
+
+    def invalidate(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.seq_id = -1
+        self.synced = False
+
+    def snapshot(self, depth: int) -> "BookSnapshot":
+        """
+        @param depth: levels of each side that are copied
+        """
+        bids, asks = self.bids, self.asks
+        return BookSnapshot(self.inst_id, self.seq_id if self.synced else -1, self.ts,
+                            tuple(zip(bids.prices[:depth], bids.sizes[:depth])),
+                            tuple(zip(asks.prices[:depth], asks.sizes[:depth])))
+
+    def _levels(self, side: "BookSide", n: int) -> List[Tuple["Number", "Number"]]:
+        return [(parse_price(price, self.inst_id), parse_size(size, self.inst_id))
+                for price, size in zip(side.prices[:n], side.sizes[:n])]
+
+    def top(self, n: int = 1) -> Tuple[List[Tuple["Number", "Number"]], List[Tuple["Number", "Number"]]]:
+        """
+        @return: ([(price, size) of the best n bids], [(price, size) of the best n asks])
+        """
+        return self._levels(self.bids, n), self._levels(self.asks, n)
+
+    @property
+    def best_bid(self) -> Optional["Number"]:
+        return parse_price(self.bids.prices[0], self.inst_id) if self.bids.prices else None
+
+    @property
+    def best_ask(self) -> Optional["Number"]:
+        return parse_price(self.asks.prices[0], self.inst_id) if self.asks.prices else None
+
+    def depth_at(self, price: "Number") -> Optional["Number"]:
+        """
+        @return: size resting at the price on either side, None if there is no such level
+        """
+        raw = format_price(price, self.inst_id)
+        size = self.bids.size_at(raw)
+        if size is None:
+            size = self.asks.size_at(raw)
+        return None if size is None else parse_size(size, self.inst_id)
@@ -0,0 +1,31 @@
+import json
+
+from abc import ABC, abstractmethod
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class Decoder(ABC):
+    @abstractmethod
+    def loads(self, frame: Union[str, bytes]) -> Any: ...
+
+
+class StdJsonDecoder(Decoder):
+    def loads(self, frame: Union[str, bytes]) -> Any:
+        return json.loads(frame)
+
+
+class OrjsonDecoder(Decoder):
+    def loads(self, frame: Union[str, bytes]) -> Any:
+        return orjson.loads(frame)
+
+
+def get_default_decoder() -> "Decoder":
+    """orjson if it is installed, otherwise the standard library."""
+    if orjson is not None:
+        return OrjsonDecoder()
+    return StdJsonDecoder()
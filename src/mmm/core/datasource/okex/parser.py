@@ -1,43 +1,115 @@
-from datetime import datetime
-from decimal import Decimal
-from typing import Dict, List
+import zlib
 
-from mmm.core.datasource.okex.subscription import OKEXTradesResp, OKEXCandleResp
+from typing import Dict, List, Tuple
+
+from mmm.core.datasource.book import OrderBook
+from mmm.core.datasource.okex.subscription import OKEXBooksResp, OKEXTradesResp, OKEXCandleResp
 from mmm.core.datasource.parser import Parser, ParserFactory
+from mmm.exceptions import BookOutOfSyncError
 
 
 class TradesParser(Parser):
 
+    def __init__(self, keep_raw: bool = False):
+        """
+        :param keep_raw: whether responses keep a reference to the raw frame
+        """
+        self.keep_raw = keep_raw
+
     def parse(self, data: Dict) -> List["OKEXTradesResp"]:
-        result = []
-        data = data['data']
-        for each in data:
-            item = OKEXTradesResp(each['instId'], Decimal(each['px']), Decimal(each['sz']), each['side'],
-                                  datetime.fromtimestamp(int(each['ts'])/1000), data)
-            result.append(item)
-        return result
+        origin_data = data if self.keep_raw else None
+        return [OKEXTradesResp(each['instId'], each['px'], each['sz'], each['side'], each['ts'], origin_data,
+                               each.get('tradeId', '')) for each in data['data']]
 
 
 class CandleParser(Parser):
 
+    def __init__(self, keep_raw: bool = False):
+        """
+        :param keep_raw: whether responses keep a reference to the raw frame
+        """
+        self.keep_raw = keep_raw
+
     def parse(self, data) -> List["OKEXCandleResp"]:
-        result = []
+        origin_data = data if self.keep_raw else None
+        candle_type, inst_id = data['arg']['channel'], data['arg']['instId']
+        return [OKEXCandleResp(candle_type, inst_id, *each[:7], origin_data=origin_data) for each in data['data']]
+
+
+def checksum(book: "OrderBook", depth: int = 25) -> int:
+    """
+    okex checksum of a book, crc32 as a signed int of 'bid price:bid size:ask price:ask size:...' of the best
+    `depth` levels, a level that only exists on one side is followed by the next level of that side.
+    """
+    bids, asks = book.bids, book.asks
+    parts = []
+    for i in range(min(depth, max(len(bids), len(asks)))):
+        if i < len(bids):
+            parts.append(bids.prices[i])
+            parts.append(bids.sizes[i])
+        if i < len(asks):
+            parts.append(asks.prices[i])
+            parts.append(asks.sizes[i])
+    crc = zlib.crc32(':'.join(parts).encode())
+    return crc - (1 << 32) if crc & 0x80000000 else crc
+
+
+class BooksParser(Parser):
+    """
+    parser of books, books5 and books-l2-tbt, it keeps one OrderBook per channel and instrument and applies the
+    frames in place. frames that are already applied, e.g. copies of redundant connections, are skipped. an update
+    that follows the seqId of the book is applied even if its seqId is smaller, okex resets the seqId on maintenance.
+    a sequence gap or a checksum mismatch invalidates the book and raises BookOutOfSyncError with the arg, the book
+    waits for a new snapshot. every response carries a BookSnapshot of the best `depth` levels.
+    """
+
+    def __init__(self, keep_raw: bool = False, depth: int = 25):
+        """
+        :param keep_raw: whether responses keep a reference to the raw frame
+        :param depth: levels of each side in the snapshots of the responses
+        """
+        self.keep_raw = keep_raw
+        self.depth = depth
+        self.books: Dict[Tuple[str, str], "OrderBook"] = {}
+
+    def get_book(self, channel: str, inst_id: str) -> "OrderBook":
+        book = self.books.get((channel, inst_id))
+        if book is None:
+            book = self.books[(channel, inst_id)] = OrderBook(inst_id)
+        return book
+
+    def parse(self, data: Dict) -> List["OKEXBooksResp"]:
+        origin_data = data if self.keep_raw else None
+        arg = data['arg']
+        channel, inst_id = arg['channel'], arg['instId']
+        book = self.get_book(channel, inst_id)
+        action = data.get('action', 'snapshot')  # every books5 push is a snapshot
+        rv = []
         for each in data['data']:
-            bar = OKEXCandleResp(
-                candle_type=data['arg']['channel'],
-                inst_id=data['arg']['instId'],
-                ts=datetime.fromtimestamp(int(each[0])/1000),
-                open_price=Decimal(each[1]),
-                high_price=Decimal(each[2]),
-                low_price=Decimal(each[3]),
-                close_price=Decimal(each[4]),
-                volume=Decimal(each[5]),
-                volume_ccy=Decimal(each[6]),
-                origin_data=data
-            )
-            result.append(bar)
-        return result
+            seq_id = each.get('seqId', -1)
+            if action == 'snapshot':
+                if book.synced and 0 <= seq_id <= book.seq_id:
+                    continue
+                book.apply_snapshot(each['bids'], each['asks'])
+            else:
+                if not book.synced:
+                    continue
+                if each['prevSeqId'] != book.seq_id:
+                    if seq_id <= book.seq_id:
+                        continue
+                    book.invalidate()
+                    raise BookOutOfSyncError(arg)
+                book.apply_update(each['bids'], each['asks'])
+            book.seq_id, book.ts = seq_id, each['ts']
+            if 'checksum' in each and checksum(book) != each['checksum']:
+                book.invalidate()
+                raise BookOutOfSyncError(arg)
+            rv.append(OKEXBooksResp(channel, inst_id, action, seq_id, book.snapshot(self.depth), each['ts'],
+                                    origin_data))
+        return rv
 
 
 parser_factory = ParserFactory()
 parser_factory.register('trades', TradesParser())
+parser_factory.register('candle', CandleParser())
+parser_factory.register('books', BooksParser())
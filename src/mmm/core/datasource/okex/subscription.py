@@ -1,12 +1,30 @@
 from abc import abstractmethod
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict
+from enum import Enum
+from typing import Dict, List, Optional, Union
 
-from mmm.core.hub.datasource_msg_hub.subscription import Subscription, ResponseOfSub
+from mmm.core.datasource.batch import BookBatch, CandleBatch, TradeBatch
+from mmm.core.datasource.book import BookSnapshot, Levels
+from mmm.core.hub.codec import codec, EnumField, Int, Json, Str, StrPairs
+from mmm.core.hub.datasource_msg_hub.subscription import LazyField, Subscription, ResponseOfSub
+from mmm.numeric import Number, parse_price, parse_size
 from mmm.project_types import Exchange
 
 
+def to_raw(value) -> str:
+    """keep okex raw strings, values of other types are converted the way okex formats them."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return str(round(value.timestamp() * 1000))
+    return str(value)
+
+
+def ms_to_datetime(ts: str) -> "datetime":
+    return datetime.fromtimestamp(int(ts) / 1000)
+
+
 class OKEXSubscription(Subscription):
     def get_exchange(self) -> "Exchange":
         return Exchange.OKEX
@@ -19,12 +37,15 @@ class OKEXSubscription(Subscription):
 
 
 class OKEXResponseOfSub(ResponseOfSub):
+    __slots__ = ()
+
     def get_exchange(self) -> "Exchange":
         return Exchange.OKEX
 
 
 class OKEXTrades(OKEXSubscription):
     """https://www.okx.com/docs-v5/en/#websocket-api-public-channel-trades-channel"""
+    __batch_type__ = TradeBatch
 
     def __init__(self, inst_id: str):
         self.inst_id = inst_id
@@ -32,6 +53,9 @@ class OKEXTrades(OKEXSubscription):
     def equal_to(self, obj: "OKEXTrades"):
         return isinstance(obj, OKEXTrades) and self.inst_id == obj.inst_id
 
+    def get_routing_key(self):
+        return Exchange.OKEX, 'trades', self.inst_id
+
     def get_topic(self):
         return {
             "op": "subscribe",
@@ -42,23 +66,51 @@ class OKEXTrades(OKEXSubscription):
         }
 
 
+@codec.register(100, inst_id=Str(), trade_id=Str(), side=Str(), _px=Str(), _sz=Str(), _ts=Str())
 class OKEXTradesResp(OKEXResponseOfSub):
-    """https://www.okx.com/docs-v5/en/#websocket-api-public-channel-trades-channel"""
+    """
+    https://www.okx.com/docs-v5/en/#websocket-api-public-channel-trades-channel
+
+    raw strings are kept, price, volume and ts are decoded on first access, price and volume follow the
+    numeric mode, see mmm.numeric.
+    """
+    __slots__ = ('inst_id', 'trade_id', 'side', '_px', '_sz', '_ts', '_price', '_volume', '_ts_ms', '_ts_dt')
+    __batch_type__ = TradeBatch
 
-    def __init__(self, inst_id: str, price: Decimal, volume: Decimal, side: str, ts: datetime, origin_data: Dict):
+    price: "Number" = LazyField('_px', parse_price, 'inst_id')
+    volume: "Number" = LazyField('_sz', parse_size, 'inst_id')
+    ts_ms: int = LazyField('_ts', int)
+    ts_dt: "datetime" = LazyField('_ts', ms_to_datetime)
+
+    def __init__(self, inst_id: str, price: Union[str, Decimal], volume: Union[str, Decimal], side: str,
+                 ts: Union[str, int, datetime], origin_data: Optional[Dict] = None, trade_id: str = ''):
         super().__init__(origin_data)
         self.inst_id: str = inst_id
-        self.price: Decimal = price
-        self.volume: Decimal = volume
+        self.trade_id: str = trade_id
         self.side: str = side
-        self.ts: datetime = ts
+        self._px: str = to_raw(price)
+        self._sz: str = to_raw(volume)
+        self._ts: str = to_raw(ts)
+
+    @property
+    def ts(self) -> "datetime":
+        return self.ts_dt
 
     def response_for(self, obj: "Subscription") -> bool:
         return isinstance(obj, OKEXTrades) and obj.inst_id == self.inst_id
 
+    def get_routing_key(self):
+        return Exchange.OKEX, 'trades', self.inst_id
+
+    def get_dedup_key(self):
+        if self.trade_id:
+            return 'trades', self.inst_id, self.trade_id
+        return 'trades', self.inst_id, self._ts, self._px, self._sz, self.side
+
 
 class OKEXCandle(OKEXSubscription):
     """https://www.okx.com/docs-v5/en/#websocket-api-public-channel-candlesticks-channel"""
+    __batch_type__ = CandleBatch
 
     def equal_to(self, obj: "OKEXCandle"):
         return isinstance(obj, OKEXCandle) and obj.candle_type == self.candle_type and obj.inst_id == self.inst_id
@@ -67,6 +119,9 @@ class OKEXCandle(OKEXSubscription):
         self.candle_type = candle_type
         self.inst_id = inst_id
 
+    def get_routing_key(self):
+        return Exchange.OKEX, self.candle_type, self.inst_id
+
     def get_topic(self):
         return {
             "op": "subscribe",
@@ -79,21 +134,163 @@ class OKEXCandle(OKEXSubscription):
         }
 
 
+@codec.register(101, candle_type=Str(), inst_id=Str(), _ts=Str(), _o=Str(), _h=Str(), _l=Str(), _c=Str(),
+                _vol=Str(), _vol_ccy=Str())
 class OKEXCandleResp(OKEXResponseOfSub):
-    """https://www.okx.com/docs-v5/en/#websocket-api-public-channel-candlesticks-channel"""
+    """
+    https://www.okx.com/docs-v5/en/#websocket-api-public-channel-candlesticks-channel
+
+    raw strings are kept, prices, volumes and ts are decoded on first access, prices and volume follow the
+    numeric mode, see mmm.numeric.
+    """
+    __slots__ = ('candle_type', 'inst_id', '_ts', '_o', '_h', '_l', '_c', '_vol', '_vol_ccy', '_open_price',
+                 '_high_price', '_low_price', '_close_price', '_volume', '_volume_ccy', '_ts_ms', '_ts_dt')
+    __batch_type__ = CandleBatch
+
+    open_price: "Number" = LazyField('_o', parse_price, 'inst_id')
+    high_price: "Number" = LazyField('_h', parse_price, 'inst_id')
+    low_price: "Number" = LazyField('_l', parse_price, 'inst_id')
+    close_price: "Number" = LazyField('_c', parse_price, 'inst_id')
+    volume: "Number" = LazyField('_vol', parse_size, 'inst_id')
+    volume_ccy: "Decimal" = LazyField('_vol_ccy', Decimal)  # quote currency volume stays Decimal in every mode
+    ts_ms: int = LazyField('_ts', int)
+    ts_dt: "datetime" = LazyField('_ts', ms_to_datetime)
 
-    def __init__(self, candle_type: str, inst_id: str, ts: datetime, open_price: Decimal, high_price: Decimal,
-                 low_price: Decimal, close_price: Decimal, volume: Decimal, volume_ccy: Decimal, origin_data: Dict):
+    def __init__(self, candle_type: str, inst_id: str, ts: Union[str, int, datetime], open_price: Union[str, Decimal],
+                 high_price: Union[str, Decimal], low_price: Union[str, Decimal], close_price: Union[str, Decimal],
+                 volume: Union[str, Decimal], volume_ccy: Union[str, Decimal], origin_data: Optional[Dict] = None):
         super().__init__(origin_data)
         self.candle_type: str = candle_type
         self.inst_id: str = inst_id
-        self.ts: datetime = ts
-        self.open_price: Decimal = open_price
-        self.high_price: Decimal = high_price
-        self.low_price: Decimal = low_price
-        self.close_price: Decimal = close_price
-        self.volume: Decimal = volume
-        self.volume_ccy: Decimal = volume_ccy
+        self._ts: str = to_raw(ts)
+        self._o: str = to_raw(open_price)
+        self._h: str = to_raw(high_price)
+        self._l: str = to_raw(low_price)
+        self._c: str = to_raw(close_price)
+        self._vol: str = to_raw(volume)
+        self._vol_ccy: str = to_raw(volume_ccy)
+
+    @property
+    def ts(self) -> "datetime":
+        return self.ts_dt
 
     def response_for(self, obj: "Subscription") -> bool:
         return isinstance(obj, OKEXCandle) and obj.candle_type == self.candle_type and obj.inst_id == self.inst_id
+
+    def get_routing_key(self):
+        return Exchange.OKEX, self.candle_type, self.inst_id
+
+    def get_conflation_key(self):
+        return Exchange.OKEX, self.candle_type, self.inst_id, self._ts
+
+    def get_dedup_key(self):
+        # the candle of a ts is pushed again whenever it changes, so an update is identified by its ts and content
+        return self.candle_type, self.inst_id, self._ts, self._c, self._vol
+
+
+class OKEXBooks(OKEXSubscription):
+    """https://www.okx.com/docs-v5/en/#websocket-api-public-channel-order-book-channel"""
+    __batch_type__ = BookBatch
+
+    def __init__(self, inst_id: str, channel: str = 'books'):
+        """
+        @param channel: books, books5 or books-l2-tbt
+        """
+        self.inst_id = inst_id
+        self.channel = channel
+
+    def equal_to(self, obj: "OKEXBooks"):
+        return isinstance(obj, OKEXBooks) and obj.channel == self.channel and obj.inst_id == self.inst_id
+
+    def get_routing_key(self):
+        return Exchange.OKEX, self.channel, self.inst_id
+
+    def get_topic(self):
+        return {
+            "op": "subscribe",
+            "args": [{
+                "channel": self.channel,
+                "instId": self.inst_id
+            }]
+        }
+
+
+@codec.register(103, channel=Str(), inst_id=Str(), action=Str(), seq_id=Int(), bids=StrPairs(), asks=StrPairs(),
+                _ts=Str())
+class OKEXBooksResp(OKEXResponseOfSub):
+    """
+    https://www.okx.com/docs-v5/en/#websocket-api-public-channel-order-book-channel
+
+    pushed after a snapshot or an update is applied, `book` is a BookSnapshot of the best levels of the book after
+    this frame, later frames do not change it. bids and asks are its raw levels, which is what is encoded.
+    """
+    __slots__ = ('channel', 'inst_id', 'action', 'seq_id', 'bids', 'asks', '_ts', '_ts_ms', '_ts_dt', '_book')
+    __batch_type__ = BookBatch
+
+    ts_ms: int = LazyField('_ts', int)
+    ts_dt: "datetime" = LazyField('_ts', ms_to_datetime)
+    book: "BookSnapshot" = LazyField('inst_id', BookSnapshot, 'seq_id', '_ts', 'bids', 'asks')
+
+    def __init__(self, channel: str, inst_id: str, action: str, seq_id: int, book: "BookSnapshot",
+                 ts: Union[str, int, datetime], origin_data: Optional[Dict] = None):
+        super().__init__(origin_data)
+        self.channel: str = channel
+        self.inst_id: str = inst_id
+        self.action: str = action
+        self.seq_id: int = seq_id
+        self.bids: "Levels" = book.bids
+        self.asks: "Levels" = book.asks
+        self._ts: str = to_raw(ts)
+        self._book: "BookSnapshot" = book
+
+    @property
+    def ts(self) -> "datetime":
+        return self.ts_dt
+
+    def response_for(self, obj: "Subscription") -> bool:
+        return isinstance(obj, OKEXBooks) and obj.channel == self.channel and obj.inst_id == self.inst_id
+
+    def get_routing_key(self):
+        return Exchange.OKEX, self.channel, self.inst_id
+
+
+class StreamStatus(Enum):
+    DISCONNECTED = 1  # the connection dropped, messages are lost until it is recovered
+    STALE = 2  # the connection is open but no message arrived for a while
+    RECOVERED = 3  # messages arrive again after DISCONNECTED or STALE
+
+
+class OKEXStreamStatus(OKEXSubscription):
+    """status of the okex websocket connections, nothing is sent to okex for it."""
+
+    def equal_to(self, obj: "OKEXStreamStatus"):
+        return isinstance(obj, OKEXStreamStatus)
+
+    def get_routing_key(self):
+        return Exchange.OKEX, 'status', ''
+
+    def get_topic(self):
+        return None
+
+
+@codec.register(102, conn_id=Int(), status=EnumField(StreamStatus), args=Json(), gap_ms=Int())
+class OKEXStreamStatusResp(OKEXResponseOfSub):
+    """
+    @param conn_id: id of the connection
+    @param args: okex args, e.g. [{"channel": "trades", "instId": "BTC-USDT-SWAP"}], served by the connection
+    @param gap_ms: milliseconds since the last message, when RECOVERED it is the length of the gap
+    """
+    __slots__ = ('conn_id', 'status', 'args', 'gap_ms')
+
+    def __init__(self, conn_id: int, status: "StreamStatus", args: List[Dict], gap_ms: int = 0):
+        super().__init__()
+        self.conn_id: int = conn_id
+        self.status: "StreamStatus" = status
+        self.args: List[Dict] = args
+        self.gap_ms: int = gap_ms
+
+    def response_for(self, obj: "Subscription") -> bool:
+        return isinstance(obj, OKEXStreamStatus)
+
+    def get_routing_key(self):
+        return Exchange.OKEX, 'status', ''
@@ -1,95 +1,195 @@
 import json
 import logging
 import asyncio
+import random
 import websockets
 
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from mmm.core.datasource.okex.subscription import OKEXSubscription
+from mmm.core.datasource.okex.subscription import OKEXSubscription, OKEXStreamStatusResp, StreamStatus
 from mmm.credential import Credential
-from mmm.exceptions import CollectionError
+from mmm.exceptions import BookOutOfSyncError, CollectionError
 from mmm.third_party.okex.utils import get_local_timestamp, login_params
 from mmm.core.datasource.base import DataSource
+from mmm.core.datasource.decoder import Decoder, get_default_decoder
 from mmm.core.datasource.okex.parser import parser_factory
-from mmm.core.datasource.parser import ParserFactory
+from mmm.core.datasource.parser import Parser, ParserFactory
+from mmm.core.datasource.redundancy import FeedStats, FirstArrival
+from mmm.core.datasource.watchdog import Watched, get_watchdog
 
 
 logger = logging.getLogger(__name__)
 
 
+class OkexWsConnection(Watched):
+    """
+    one websocket connection that serves a shard of the subscriptions, it reconnects with jittered exponential
+    backoff and resubscribes, status changes are published to the hub as OKEXStreamStatusResp.
+    with redundant feeds several connections serve the same shard and only the first copy of a message is published.
+    idleness is watched by the watchdog of the loop, which sends the pings.
+    """
+    __backoff_base__ = 0.5
+    __backoff_max__ = 30
+
+    def __init__(self, conn_id: int, datasource: "OkexWsDatasource", args: List[Dict], uri: str):
+        self.conn_id = conn_id
+        self.datasource = datasource
+        self.args = args
+        self.uri = uri
+        self.stats = FeedStats(uri)
+        self.idle_timeout = self.pong_timeout = datasource.__ping_interval__
+        self.rtt: Optional[float] = None  # seconds of the last ping pong
+        self.last_message_at: Optional[float] = None
+        self._ws: Optional["websockets.WebSocketClientProtocol"] = None
+        self._pending: Optional["asyncio.Task"] = None
+        self.status: Optional["StreamStatus"] = None
+        self._healthy = False
+
+    async def run(self):
+        attempt = 0
+        while True:
+            self._healthy = False
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.exception(e)
+            if self._healthy:
+                attempt = 0
+            self._set_status(StreamStatus.DISCONNECTED)
+            delay = random.uniform(0, min(self.__backoff_max__, self.__backoff_base__ * 2 ** attempt))
+            attempt += 1
+            logger.info(f'connection {self.conn_id} reconnecting in {delay:.2f}s...')
+            await get_watchdog().clock.sleep(delay)
+
+    def _gap_ms(self) -> int:
+        if self.last_message_at is None:
+            return 0
+        return int((get_watchdog().clock.monotonic() - self.last_message_at) * 1000)
+
+    def _set_status(self, status: "StreamStatus"):
+        if status == self.status or (status == StreamStatus.STALE and self.status == StreamStatus.DISCONNECTED):
+            return
+        self.status = status
+        if status != StreamStatus.RECOVERED:
+            logger.warning(f'connection {self.conn_id} is {status.name.lower()}.')
+        self.datasource.ds_msg_hub.publish(OKEXStreamStatusResp(self.conn_id, status, self.args, self._gap_ms()))
+
+    def on_idle(self):
+        self._set_status(StreamStatus.STALE)
+        logger.info('send a ping')
+        self._pending = asyncio.create_task(self._ws.send("ping"))
+
+    def on_dead(self):
+        logger.error(f'connection {self.conn_id} is looking forward a pong message, but not received.')
+        self._pending = asyncio.create_task(self._ws.close())
+
+    async def _resubscribe(self, ws, arg: Dict):
+        """okex sends a new snapshot after the channel is subscribed again."""
+        logger.warning(f'connection {self.conn_id}: {arg} is out of sync, resubscribing.')
+        await ws.send(json.dumps({'op': 'unsubscribe', 'args': [arg]}))
+        await ws.send(json.dumps({'op': 'subscribe', 'args': [arg]}))
+
+    async def _login(self, ws):
+        credential = self.datasource.credential
+        timestamp = str(get_local_timestamp())
+        await ws.send(login_params(timestamp, credential.api_key, credential.phrase, credential.secret_key))
+        rv = json.loads(await ws.recv())
+        if rv['code'] != '0':
+            raise CollectionError(f'login error: {rv}')
+
+    async def _connect(self):
+        datasource = self.datasource
+        async with websockets.connect(self.uri, ping_interval=None) as ws:
+            if datasource.credential is not None:
+                await self._login(ws)
+            topic = json.dumps({'op': 'subscribe', 'args': self.args})
+            await ws.send(topic)
+            publish = datasource.ds_msg_hub.publish
+            first_arrival = datasource.first_arrival
+            watchdog = get_watchdog()
+            loop_time = watchdog.clock.monotonic
+            self._ws, self.ping_sent_at, self.last_received_at = ws, None, loop_time()
+            watchdog.watch(self)
+            try:
+                while True:
+                    frame = await ws.recv()
+                    self.last_received_at = now = loop_time()
+                    if frame == 'pong':
+                        if self.ping_sent_at is not None:
+                            self.rtt, self.ping_sent_at = now - self.ping_sent_at, None
+                            logger.info(f'received a pong message, rtt {self.rtt * 1000:.1f}ms')
+                    elif frame.startswith(datasource.__event_prefix__):
+                        data = datasource.decoder.loads(frame)
+                        if data['event'] == 'subscribe':
+                            logger.info(f'subscribe {data.get("arg")} successfully')
+                        elif data['event'] == 'error':
+                            logger.error(f'subscribe {topic} failed, {data}')
+                    else:
+                        data = datasource.decoder.loads(frame)
+                        if self.status is not None and self.status != StreamStatus.RECOVERED:
+                            self._set_status(StreamStatus.RECOVERED)
+                        self._healthy = True
+                        self.last_message_at = now
+                        try:
+                            responses = datasource.get_parser(data['arg']['channel']).parse(data)
+                        except BookOutOfSyncError as e:
+                            await self._resubscribe(ws, e.args[0])
+                            continue
+                        for each in responses:
+                            if first_arrival is None or first_arrival.accept(each.get_dedup_key(), self.stats, now):
+                                publish(each)
+                        await datasource.ds_msg_hub.flush()
+            finally:
+                watchdog.unwatch(self)
+                self._ws = None
+
+
 class OkexWsDatasource(DataSource):
     __uri__ = "wss://wsaws.okex.com:8443/ws/v5/public"  # noqa
     __ping_interval__ = 20
+    __event_prefix__ = '{"event"'  # okex puts the event key first in event frames
 
     def __init__(self, credential: Optional["Credential"] = None,
-                 factory: "ParserFactory" = parser_factory):
+                 factory: "ParserFactory" = parser_factory, decoder: Optional["Decoder"] = None,
+                 max_topics_per_connection: int = 100, uris: Optional[List[str]] = None,
+                 redundancy: Optional[int] = None, dedup_window: int = 4096):
+        """
+        :param max_topics_per_connection: subscriptions are sharded across connections by this limit
+        :param uris: endpoints, __uri__ by default
+        :param redundancy: connections per shard, the endpoints are used in turn, len(uris) by default
+        :param dedup_window: message keys remembered per datasource to drop the copies of redundant connections
+        """
         super().__init__()
-        self.received_pong = False
         self.credential: Optional["Credential"] = credential
         self.parser_factory: "ParserFactory" = factory
+        self.decoder: "Decoder" = decoder or get_default_decoder()
+        self.max_topics_per_connection = max_topics_per_connection
+        self.uris: List[str] = uris or [self.__uri__]
+        self.redundancy: int = redundancy or len(self.uris)
+        self.first_arrival: Optional["FirstArrival"] = FirstArrival(dedup_window) if self.redundancy > 1 else None
+        self.connections: List["OkexWsConnection"] = []
+        self._parsers: Dict[str, "Parser"] = {}
 
-    async def ping(self, ws):
-        await asyncio.sleep(self.__ping_interval__)
-        logger.info('send a ping')
-        await ws.send("ping")
-        self.received_pong = False
-        await asyncio.sleep(self.__ping_interval__)
-        if not self.received_pong:
-            raise CollectionError('looking forward a pong message, but not received.')
+    def get_parser(self, channel: str) -> "Parser":
+        return self._parsers[channel]
+
+    def get_feed_stats(self) -> Dict[int, "FeedStats"]:
+        """win rate and lag of every connection, only counted with redundant feeds."""
+        return {each.conn_id: each.stats for each in self.connections}
 
     async def subscribe(self, subscriptions: List["OKEXSubscription"]):
-        topics = {
-            'op': 'subscribe',
-            'args': []
-        }
+        args = []
         for sub in subscriptions:
             topic = sub.get_topic()
-            topics['args'].extend(topic['args'])
-        try:
-            await self._do_subscribe(json.dumps(topics))
-        except CollectionError as e:
-            logger.exception("looking forward a pong message, but not received.", exc_info=e)
-        except Exception as e:
-            logger.exception(e)
-            logger.info('reconnecting...')
-
-    async def _do_subscribe(self, topic: str):
-        async with websockets.connect(self.__uri__, ping_interval=None) as ws:
-            if self.credential is not None:
-                timestamp = str(get_local_timestamp())
-                login_str = login_params(timestamp,
-                                         self.credential.api_key,
-                                         self.credential.phrase,
-                                         self.credential.secret_key)
-                await ws.send(login_str)
-                rv = json.loads(await ws.recv())
-                if rv['code'] != '0':
-                    logger.error(f'login error: {rv}')
-                    return
-            await ws.send(topic)
-            rv = await ws.recv()
-            data = json.loads(rv)
-            assert data['event'] == 'subscribe', data
-            ping = asyncio.create_task(self.ping(ws))
-            while True:
-                try:
-                    data = await ws.recv()
-                    if data == 'pong':
-                        logger.info('received a pong message')
-                        self.received_pong = True
-                    else:
-                        data = json.loads(data)
-                        if data.get('event') == 'subscribe':
-                            logger.info(f'subscribe {topic} successfully')
-                        elif data.get('event') == 'error':
-                            logger.error(f'subscribe {topic} failed, {data}')
-                        else:
-                            channel = data['arg']['channel']
-                            msg = self.parser_factory.get(channel).parse(data)
-                            for each in msg:
-                                self.ds_msg_hub.publish(each)
-                    ping.cancel()
-                    ping = asyncio.create_task(self.ping(ws))
-                except Exception as e:
-                    logger.exception(e)
-                    break
+            if topic is None:
+                continue
+            args.extend(topic['args'])
+            for arg in topic['args']:
+                self._parsers[arg['channel']] = self.parser_factory.get(arg['channel'])
+        n = self.max_topics_per_connection
+        self.connections = []
+        for start in range(0, len(args), n):
+            for i in range(self.redundancy):
+                self.connections.append(OkexWsConnection(
+                    len(self.connections), self, args[start:start + n], self.uris[i % len(self.uris)]))
+        await asyncio.gather(*[each.run() for each in self.connections])
@@ -13,13 +13,20 @@ class Parser(ABC):
 class ParserFactory:
     def __init__(self):
         self.__registry__ = {}
+        self._resolved = {}
 
     def get(self, channel: str) -> "Parser":
-        for key in self.__registry__.keys():
+        """channels are matched by prefix, e.g. candle1D resolves to the parser registered as candle."""
+        parser = self._resolved.get(channel)
+        if parser is not None:
+            return parser
+        for key in sorted(self.__registry__.keys(), key=len, reverse=True):
             if channel.startswith(key):
-                return self.__registry__[key]
+                self._resolved[channel] = self.__registry__[key]
+                return self._resolved[channel]
         else:
             raise RuntimeError(f'can not find a message parser of {channel}')
 
     def register(self, channel: str, parser: "Parser"):
         self.__registry__[channel] = parser
+        self._resolved.clear()
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class FeedStats:
+    """how often a redundant connection delivered a message first, and how far it was behind when it did not."""
+    __slots__ = ('uri', 'wins', 'losses', 'lag_sum', 'lag_max')
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.wins = 0
+        self.losses = 0
+        self.lag_sum = 0.0
+        self.lag_max = 0.0
+
+    @property
+    def win_rate(self) -> float:
+        total = self.wins + self.losses
+        return self.wins / total if total else 0.0
+
+    @property
+    def mean_lag_ms(self) -> float:
+        return self.lag_sum / self.losses * 1000 if self.losses else 0.0
+
+    def __repr__(self):
+        return (f'FeedStats(uri={self.uri!r}, wins={self.wins}, losses={self.losses}, win_rate={self.win_rate:.3f}, '
+                f'mean_lag_ms={self.mean_lag_ms:.3f}, max_lag_ms={self.lag_max * 1000:.3f})')
+
+
+class FirstArrival:
+    """
+    dedup of redundant feeds, a message is accepted from the connection that delivers it first, copies that arrive
+    later on other connections are dropped and counted as the lag of those connections.
+    only the last `window` keys are remembered.
+    """
+
+    def __init__(self, window: int = 4096):
+        self.window = window
+        self._seen: "OrderedDict[Hashable, Tuple[float, FeedStats]]" = OrderedDict()
+
+    def accept(self, key: Optional[Hashable], stats: "FeedStats", now: float) -> bool:
+        """
+        @param key: dedup key of the message, messages without a key are always accepted
+        @param now: loop time when the frame was received
+        """
+        if key is None:
+            return True
+        first = self._seen.get(key)
+        if first is None:
+            self._seen[key] = now, stats
+            if len(self._seen) > self.window:
+                self._seen.popitem(last=False)
+            stats.wins += 1
+            return True
+        first_at, winner = first
+        if winner is stats:  # repeated by the same connection
+            return False
+        lag = now - first_at
+        stats.losses += 1
+        stats.lag_sum += lag
+        if lag > stats.lag_max:
+            stats.lag_max = lag
+        return False
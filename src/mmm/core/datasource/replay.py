@@ -0,0 +1,208 @@
+import asyncio
+import logging
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from mmm.core.datasource.base import DataSource
+from mmm.core.datasource.batch import np
+from mmm.core.datasource.binance.subscription import BinanceKline, BinanceKlineResp, BinanceTrades, BinanceTradesResp
+from mmm.core.datasource.book import BookSnapshot
+from mmm.core.datasource.okex.subscription import (OKEXBooks, OKEXBooksResp, OKEXCandle, OKEXCandleResp, OKEXTrades,
+                                                   OKEXTradesResp)
+from mmm.core.hub.datasource_msg_hub.subscription import ResponseOfSub, Subscription
+from mmm.core.recorder.segment import SegmentReader, SegmentStore
+from mmm.exceptions import ConfigureError
+from mmm.numeric import to_str
+
+
+logger = logging.getLogger(__name__)
+
+Columns = Dict[str, "np.ndarray"]
+Builder = Callable[["Subscription", Dict, Columns], Callable[[int], "ResponseOfSub"]]
+
+
+def _raws(header: Dict, column: "np.ndarray", which: int) -> List[str]:
+    """raw strings of a price (which=0) or size (which=1) column, scaled ints use the recorded precision"""
+    if header['numeric_mode'] == 'FIXED':
+        decimals = header['precision'][which]
+        return [to_str(each, decimals) for each in column.tolist()]
+    return [str(each) for each in column.tolist()]
+
+
+def _trades(resp_type: type) -> "Builder":
+    def build(sub: "Subscription", header: Dict, columns: "Columns"):
+        inst_id = header['inst_id']
+        px, sz = _raws(header, columns['px'], 0), _raws(header, columns['sz'], 1)
+        side = ['buy' if each > 0 else 'sell' for each in columns['side'].tolist()]
+        ts = [str(each) for each in columns['ts'].tolist()]
+        return lambda i: resp_type(inst_id, px[i], sz[i], side[i], ts[i])
+    return build
+
+
+def _candle_columns(header: Dict, columns: "Columns") -> Tuple[List[str], ...]:
+    """ts, open, high, low, close and volume as raw strings"""
+    return (
+        [str(each) for each in columns['ts'].tolist()],
+        *[_raws(header, columns[name], 0) for name in ('open', 'high', 'low', 'close')],
+        _raws(header, columns['volume'], 1),
+    )
+
+
+def _okex_candles(sub: "OKEXCandle", header: Dict, columns: "Columns"):
+    values = _candle_columns(header, columns)
+    return lambda i: OKEXCandleResp(sub.candle_type, sub.inst_id, *[each[i] for each in values], '0')
+
+
+def _binance_klines(sub: "BinanceKline", header: Dict, columns: "Columns"):
+    values = _candle_columns(header, columns)
+    return lambda i: BinanceKlineResp(sub.symbol, sub.interval, *[each[i] for each in values], '0')
+
+
+def _okex_books(sub: "OKEXBooks", header: Dict, columns: "Columns"):
+    sides = [(_raws(header, columns[px].ravel(), 0), _raws(header, columns[sz].ravel(), 1), columns[sz].shape[1])
+             for px, sz in (('bid_px', 'bid_sz'), ('ask_px', 'ask_sz'))]
+    seq_ids, ts = columns['seq_id'].tolist(), [str(each) for each in columns['ts'].tolist()]
+
+    def levels(i, prices, sizes, depth):
+        return tuple((prices[j], sizes[j]) for j in range(i * depth, (i + 1) * depth) if float(sizes[j]))
+
+    def make(i):
+        if seq_ids[i] < 0:
+            book = BookSnapshot(sub.inst_id, -1, ts[i], (), ())
+        else:
+            book = BookSnapshot(sub.inst_id, seq_ids[i], ts[i], levels(i, *sides[0]), levels(i, *sides[1]))
+        return OKEXBooksResp(sub.channel, sub.inst_id, 'snapshot', seq_ids[i], book, ts[i])
+    return make
+
+
+class _Stream:
+    """rows of one subscription read block by block, every block is sorted by ts."""
+
+    def __init__(self, sub: "Subscription", builder: "Builder", chunks: Iterator[Tuple[Dict, "Columns"]]):
+        self.sub = sub
+        self.builder = builder
+        self.chunks = chunks
+        self.ts: Optional["np.ndarray"] = None
+        self.make: Optional[Callable[[int], "ResponseOfSub"]] = None
+        self.pos = 0
+
+    def advance(self) -> bool:
+        """load the next block once the current one is consumed, False when there is nothing left."""
+        while self.ts is None or self.pos >= len(self.ts):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return False
+            header, columns = chunk
+            if len(columns['ts']) > 1 and (columns['ts'][1:] < columns['ts'][:-1]).any():
+                order = np.argsort(columns['ts'], kind='stable')
+                columns = {name: column[order] for name, column in columns.items()}
+            self.ts, self.pos = columns['ts'], 0
+            self.make = self.builder(self.sub, header, columns)
+        return True
+
+
+class ReplayDatasource(DataSource):
+    """
+    publishes market data recorded by TickRecorder as the responses the live datasources publish, in ts order across
+    all subscriptions. the streams are merged block by block, rows up to the smallest last ts of the loaded blocks
+    are sorted together and published, so only one block of every subscription is decoded at a time.
+
+    books are replayed as snapshots of the recorded levels, candles have no volume_ccy and trades no trade_id since
+    they are not recorded.
+    """
+    __builders__: Dict[type, "Builder"] = {
+        OKEXTrades: _trades(OKEXTradesResp),
+        OKEXCandle: _okex_candles,
+        OKEXBooks: _okex_books,
+        BinanceTrades: _trades(BinanceTradesResp),
+        BinanceKline: _binance_klines,
+    }
+    __yield_every__ = 1000  # messages published at full speed before the loop is given to the consumers
+
+    def __init__(self, root: str, start: Optional[int] = None, end: Optional[int] = None,
+                 speed: Optional[float] = None):
+        """
+        @param root: root of the SegmentStore
+        @param start: first ts in milliseconds, included
+        @param end: last ts in milliseconds, excluded
+        @param speed: None replays as fast as possible, 1 at wall clock speed, 10 ten times as fast
+        """
+        if np is None:
+            raise ConfigureError('numpy is required by ReplayDatasource.')
+        super().__init__()
+        self.store = SegmentStore(root)
+        self.start = start
+        self.end = end
+        self.speed = speed
+        self.published = 0
+        self.max_lag = 0.0  # seconds the replay fell behind the schedule of its speed
+
+    @classmethod
+    def register(cls, sub_type: type, builder: "Builder"):
+        """
+        @param builder: (subscription, segment header, columns of a block) -> (row -> response)
+        """
+        cls.__builders__[sub_type] = builder
+
+    def _chunks(self, sub: "Subscription") -> Iterator[Tuple[Dict, "Columns"]]:
+        for path in self.store.segments(sub.get_routing_key(), self.start, self.end):
+            with SegmentReader(path) as reader:
+                for i in reader.blocks(self.start, self.end):
+                    columns = reader.read_block(i)
+                    ts = columns['ts']
+                    mask = np.ones(len(ts), bool)
+                    if self.start is not None:
+                        mask &= ts >= self.start
+                    if self.end is not None:
+                        mask &= ts < self.end
+                    if not mask.all():
+                        columns = {name: column[mask] for name, column in columns.items()}
+                    if len(columns['ts']):
+                        yield reader.header, columns
+
+    async def subscribe(self, subscriptions: List["Subscription"]):
+        streams = []
+        for sub in dict.fromkeys(subscriptions):
+            builder = self.__builders__.get(type(sub))
+            if builder is None:
+                logger.warning(f'{sub.__class__.__name__} can not be replayed.')
+                continue
+            stream = _Stream(sub, builder, self._chunks(sub))
+            if stream.advance():
+                streams.append(stream)
+        if streams:
+            await self._replay(streams)
+
+    async def _replay(self, streams: List["_Stream"]):
+        loop = asyncio.get_running_loop()
+        hub = self.ds_msg_hub
+        begin = loop.time()
+        first = self.start if self.start is not None else min(int(each.ts[each.pos]) for each in streams)
+        while streams:
+            horizon = min(each.ts[-1] for each in streams)
+            ts, ids, rows = [], [], []
+            for k, each in enumerate(streams):
+                hi = int(np.searchsorted(each.ts, horizon, 'right'))
+                if hi > each.pos:
+                    ts.append(each.ts[each.pos:hi])
+                    ids.append(np.full(hi - each.pos, k))
+                    rows.append(np.arange(each.pos, hi))
+                    each.pos = hi
+            ts, ids, rows = np.concatenate(ts), np.concatenate(ids), np.concatenate(rows)
+            order = np.lexsort((ids, ts))
+            makes = [each.make for each in streams]
+            for t, k, i in zip(ts[order].tolist(), ids[order].tolist(), rows[order].tolist()):
+                if self.speed:
+                    delay = begin + (t - first) / 1000 / self.speed - loop.time()
+                    if delay > 0.001:
+                        await hub.flush()
+                        await asyncio.sleep(delay)
+                    elif -delay > self.max_lag:
+                        self.max_lag = -delay
+                hub.publish(makes[k](i))
+                self.published += 1
+                if self.published % self.__yield_every__ == 0:
+                    await hub.flush()
+                    await asyncio.sleep(0)
+            await hub.flush()
+            streams = [each for each in streams if each.advance()]
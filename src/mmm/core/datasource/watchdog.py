@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import math
+import threading
+
+from abc import ABCMeta, abstractmethod
+from typing import Dict, List, Optional, Set
+
+from mmm.core.clock import Clock, get_clock
+
+
+logger = logging.getLogger(__name__)
+
+
+class Watched(metaclass=ABCMeta):
+    """
+    a connection that is watched by the Watchdog, the connection only sets `last_received_at` on every frame and
+    `ping_sent_at` back to None when the pong arrives, the watchdog does the rest.
+    """
+    idle_timeout: float = 20  # seconds without any frame before a ping is sent
+    pong_timeout: float = 20  # seconds to wait for any frame after the ping before the connection is dead
+    last_received_at: float = 0.0
+    ping_sent_at: Optional[float] = None
+
+    @abstractmethod
+    def on_idle(self):
+        """send a ping, it must not block."""
+
+    @abstractmethod
+    def on_dead(self):
+        """close the connection, it must not block."""
+
+
+class Watchdog:
+    """
+    one hashed timer wheel per thread that watches the idleness of all websocket connections, a connection is
+    only looked at when its timer fires, so receiving a frame costs nothing but a float assignment.
+    """
+
+    def __init__(self, tick: float = 0.5, slots: int = 256, clock: Optional["Clock"] = None):
+        """
+        @param tick: resolution of the timers in seconds
+        @param slots: slots of the wheel, timers further than tick * slots are checked and rescheduled
+        @param clock: the clock of the process if None, connections stamp their frames with clock.monotonic()
+        """
+        self.tick = tick
+        self.clock = clock or get_clock()
+        self._wheel: List[Set["Watched"]] = [set() for _ in range(slots)]
+        self._where: Dict["Watched", int] = {}
+        self._cursor = 0
+        self._task: Optional["asyncio.Task"] = None
+
+    def watch(self, conn: "Watched"):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(), name='task.watchdog')
+        self.unwatch(conn)
+        self._schedule(conn, conn.last_received_at + conn.idle_timeout, self.clock.monotonic())
+
+    def unwatch(self, conn: "Watched"):
+        slot = self._where.pop(conn, None)
+        if slot is not None:
+            self._wheel[slot].discard(conn)
+
+    def _schedule(self, conn: "Watched", deadline: float, now: float):
+        ticks = min(len(self._wheel) - 1, max(1, math.ceil((deadline - now) / self.tick)))
+        slot = (self._cursor + ticks) % len(self._wheel)
+        self._wheel[slot].add(conn)
+        self._where[conn] = slot
+
+    def _check(self, conn: "Watched", now: float):
+        if conn.ping_sent_at is not None:
+            if now - conn.ping_sent_at < conn.pong_timeout:
+                self._schedule(conn, conn.ping_sent_at + conn.pong_timeout, now)
+                return
+            if conn.last_received_at < conn.ping_sent_at:
+                conn.on_dead()
+                return
+            conn.ping_sent_at = None  # frames arrived after the ping, the pong is lost but the connection is alive
+        if now - conn.last_received_at >= conn.idle_timeout:
+            conn.ping_sent_at = now
+            conn.on_idle()
+            self._schedule(conn, now + conn.pong_timeout, now)
+        else:
+            self._schedule(conn, conn.last_received_at + conn.idle_timeout, now)
+
+    async def _run(self):
+        clock = self.clock
+        next_at = clock.monotonic()
+        while True:
+            next_at += self.tick
+            await clock.sleep_until(next_at)
+            self._cursor = (self._cursor + 1) % len(self._wheel)
+            due = self._wheel[self._cursor]
+            if not due:
+                continue
+            self._wheel[self._cursor] = set()
+            now = clock.monotonic()
+            for conn in due:
+                del self._where[conn]
+                try:
+                    self._check(conn, now)
+                except Exception as e:
+                    logger.exception(e)
+
+
+_local = threading.local()
+
+
+def get_watchdog() -> "Watchdog":
+    """watchdog of the current thread, threads that run their own loops get their own watchdog."""
+    rv = getattr(_local, 'watchdog', None)
+    if rv is None:
+        rv = _local.watchdog = Watchdog()
+    return rv
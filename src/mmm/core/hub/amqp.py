@@ -0,0 +1,122 @@
+import asyncio
+import logging
+
+from enum import Enum
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import aio_pika
+
+
+logger = logging.getLogger(__name__)
+
+
+def topic_of(routing_key: Hashable) -> str:
+    """(Exchange.OKEX, 'trades', 'BTC-USDT-SWAP') -> 'OKEX.trades.BTC-USDT-SWAP'"""
+    if not isinstance(routing_key, tuple):
+        routing_key = (routing_key, )
+    return '.'.join(each.name if isinstance(each, Enum) else str(each) for each in routing_key)
+
+
+class AmqpConnection:
+    """one robust connection and one channel per process, shared by the rabbitmq hubs."""
+
+    def __init__(self, url: str, prefetch_count: int):
+        self.url = url
+        self.prefetch_count = prefetch_count
+        self._connection: Optional["aio_pika.abc.AbstractRobustConnection"] = None
+        self._channel: Optional["aio_pika.abc.AbstractChannel"] = None
+        self._exchanges: Dict[str, "aio_pika.abc.AbstractExchange"] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_channel(self) -> "aio_pika.abc.AbstractChannel":
+        async with self._lock:
+            if self._channel is None:
+                self._connection = await aio_pika.connect_robust(self.url)
+                self._channel = await self._connection.channel(publisher_confirms=True)
+                await self._channel.set_qos(prefetch_count=self.prefetch_count)
+            return self._channel
+
+    async def get_exchange(self, name: str) -> "aio_pika.abc.AbstractExchange":
+        if name not in self._exchanges:
+            channel = await self.get_channel()
+            self._exchanges[name] = await channel.declare_exchange(name, aio_pika.ExchangeType.TOPIC)
+        return self._exchanges[name]
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+        self._connection, self._channel, self._exchanges = None, None, {}
+
+
+class BatchPublisher:
+    """
+    publishes messages to a topic exchange in micro batches, a batch is sent when it is full or when it has
+    waited for `linger` seconds, every message of a batch is confirmed by the broker.
+
+    the messages that are nacked or fail to be sent are put back in front of the next batch and sent again after a
+    backoff, flush() waits for the backoff, so publishers are slowed down while the broker is unavailable. a message
+    is given up and counted in undelivered after max_attempts sends.
+    """
+    __retry_base__ = 0.1  # seconds before the first retry, doubled by every retry in a row
+    __retry_max__ = 5.0
+
+    def __init__(self, connection: "AmqpConnection", exchange_name: str, batch_size: int, linger: float,
+                 persistent: bool = False, max_attempts: Optional[int] = None):
+        """
+        @param max_attempts: sends of a message before it is given up, retried until it is confirmed if None
+        """
+        self.connection = connection
+        self.exchange_name = exchange_name
+        self.batch_size = batch_size
+        self.linger = linger
+        self.delivery_mode = aio_pika.DeliveryMode.PERSISTENT if persistent else aio_pika.DeliveryMode.NOT_PERSISTENT
+        self.max_attempts = max_attempts
+        self.undelivered = 0
+        self._batch: List[Tuple[str, bytes, int]] = []  # (topic, body, sends so far)
+        self._retries = 0
+        self._lock = asyncio.Lock()
+        self._linger_task: Optional["asyncio.Task"] = None
+
+    def add(self, topic: str, body: bytes):
+        self._batch.append((topic, body, 0))
+        if self._linger_task is None:
+            self._linger_task = asyncio.create_task(self._linger_loop(), name=f'task.amqp.{self.exchange_name}')
+
+    async def flush(self):
+        if len(self._batch) >= self.batch_size:
+            await self._send_batch()
+
+    async def _linger_loop(self):
+        while True:
+            await asyncio.sleep(self.linger)
+            if self._batch:
+                await self._send_batch()
+
+    async def _send_batch(self):
+        async with self._lock:
+            batch, self._batch = self._batch, []
+            if not batch:
+                return
+            try:
+                exchange = await self.connection.get_exchange(self.exchange_name)
+                rv = await asyncio.gather(*[
+                    exchange.publish(aio_pika.Message(body, delivery_mode=self.delivery_mode), routing_key=topic)
+                    for topic, body, _ in batch
+                ], return_exceptions=True)
+            except Exception as e:
+                rv = [e] * len(batch)
+            failed = [(topic, body, sends + 1) for (topic, body, sends), each in zip(batch, rv)
+                      if isinstance(each, Exception)]
+            if not failed:
+                self._retries = 0
+                return
+            retry = [each for each in failed if self.max_attempts is None or each[2] < self.max_attempts]
+            self.undelivered += len(failed) - len(retry)
+            error = next(each for each in rv if isinstance(each, Exception))
+            logger.error(f'{len(failed)} of {len(batch)} messages to {self.exchange_name} are not confirmed, '
+                         f'{len(retry)} of them are retried, {error!r}')
+            if retry:
+                self._batch[:0] = retry  # ahead of the messages added during the send
+                delay = min(self.__retry_base__ * 2 ** self._retries, self.__retry_max__)
+                self._retries += 1
+                await asyncio.sleep(delay)
@@ -11,3 +11,6 @@ class MessageHub(metaclass=ABCMeta):
 
     @abstractmethod
     def unsubscribe(self, *args, **kwargs): ...
+
+    async def flush(self):
+        """wait until published messages are handed over, producers should call it after publishing."""
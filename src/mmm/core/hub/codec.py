@@ -0,0 +1,172 @@
+import json
+import pickle
+import struct
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Tuple, Type
+
+
+_u8 = struct.Struct('<B')
+_u16 = struct.Struct('<H')
+_u32 = struct.Struct('<I')
+_i64 = struct.Struct('<q')
+
+PICKLE_TYPE_ID = 0  # types that are not registered fall back to pickle
+
+
+class Field(ABC):
+    @abstractmethod
+    def pack(self, value, out: bytearray): ...
+
+    @abstractmethod
+    def unpack(self, buf, offset: int) -> Tuple[Any, int]: ...
+
+
+class Str(Field):
+    def pack(self, value: str, out: bytearray):
+        data = value.encode()
+        out += _u32.pack(len(data))
+        out += data
+
+    def unpack(self, buf, offset):
+        n = _u32.unpack_from(buf, offset)[0]
+        offset += _u32.size
+        return str(buf[offset:offset + n], 'utf-8'), offset + n
+
+
+class Int(Field):
+    def pack(self, value: int, out: bytearray):
+        out += _i64.pack(value)
+
+    def unpack(self, buf, offset):
+        return _i64.unpack_from(buf, offset)[0], offset + _i64.size
+
+
+class DecimalField(Str):
+    def pack(self, value: "Decimal", out: bytearray):
+        super().pack(str(value), out)
+
+    def unpack(self, buf, offset):
+        value, offset = super().unpack(buf, offset)
+        return Decimal(value), offset
+
+
+class DatetimeField(Int):
+    """microseconds since epoch."""
+
+    def pack(self, value: "datetime", out: bytearray):
+        super().pack(round(value.timestamp() * 10**6), out)
+
+    def unpack(self, buf, offset):
+        value, offset = super().unpack(buf, offset)
+        return datetime.fromtimestamp(value / 10**6), offset
+
+
+class EnumField(Field):
+    def __init__(self, enum_type: Type["Enum"]):
+        self.enum_type = enum_type
+
+    def pack(self, value: "Enum", out: bytearray):
+        out += _u16.pack(value.value)
+
+    def unpack(self, buf, offset):
+        return self.enum_type(_u16.unpack_from(buf, offset)[0]), offset + _u16.size
+
+
+class Json(Str):
+    def pack(self, value, out: bytearray):
+        super().pack(json.dumps(value, separators=(',', ':')), out)
+
+    def unpack(self, buf, offset):
+        value, offset = super().unpack(buf, offset)
+        return json.loads(value), offset
+
+
+class StrPairs(Field):
+    """tuple of (str, str), such as the (price, size) levels of a book."""
+    _str = Str()
+
+    def pack(self, value, out: bytearray):
+        out += _u32.pack(len(value))
+        for first, second in value:
+            self._str.pack(first, out)
+            self._str.pack(second, out)
+
+    def unpack(self, buf, offset):
+        n = _u32.unpack_from(buf, offset)[0]
+        offset += _u32.size
+        pairs = []
+        for _ in range(n):
+            first, offset = self._str.unpack(buf, offset)
+            second, offset = self._str.unpack(buf, offset)
+            pairs.append((first, second))
+        return tuple(pairs), offset
+
+
+class Nullable(Field):
+    def __init__(self, field: "Field"):
+        self.field = field
+
+    def pack(self, value, out: bytearray):
+        if value is None:
+            out += _u8.pack(0)
+        else:
+            out += _u8.pack(1)
+            self.field.pack(value, out)
+
+    def unpack(self, buf, offset):
+        flag = _u8.unpack_from(buf, offset)[0]
+        offset += _u8.size
+        if not flag:
+            return None, offset
+        return self.field.unpack(buf, offset)
+
+
+class Codec:
+    """
+    compact binary codec, a message is a u16 type id followed by its registered fields in order.
+    decoding does not call __init__, attributes are set directly.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, Tuple[type, Tuple[Tuple[str, "Field"], ...]]] = {}
+        self._by_type: Dict[type, Tuple[int, Tuple[Tuple[str, "Field"], ...]]] = {}
+
+    def register(self, type_id: int, **fields: "Field"):
+        if type_id == PICKLE_TYPE_ID or type_id in self._by_id:
+            raise ValueError(f'type id {type_id} is reserved or already registered.')
+
+        def wrapper(cls):
+            schema = tuple(fields.items())
+            self._by_id[type_id] = (cls, schema)
+            self._by_type[cls] = (type_id, schema)
+            return cls
+        return wrapper
+
+    def encode(self, obj) -> bytes:
+        registered = self._by_type.get(type(obj))
+        if registered is None:
+            return _u16.pack(PICKLE_TYPE_ID) + pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        type_id, schema = registered
+        out = bytearray(_u16.pack(type_id))
+        for name, field in schema:
+            field.pack(getattr(obj, name), out)
+        return bytes(out)
+
+    def decode(self, data: bytes):
+        type_id = _u16.unpack_from(data, 0)[0]
+        if type_id == PICKLE_TYPE_ID:
+            return pickle.loads(memoryview(data)[_u16.size:])
+        cls, schema = self._by_id[type_id]
+        obj = cls.__new__(cls)
+        offset = _u16.size
+        for name, field in schema:
+            value, offset = field.unpack(data, offset)
+            object.__setattr__(obj, name, value)
+        return obj
+
+
+codec = Codec()
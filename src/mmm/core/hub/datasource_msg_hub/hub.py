@@ -1,9 +1,13 @@
+import asyncio
 import logging
 
 from asyncio import Queue
-from typing import Dict
+from typing import Dict, Hashable, List, Optional
 
 from mmm.core.hub.base import MessageHub
+from mmm.core.hub.codec import codec
+from mmm.core.hub.queue import Backlog, OverflowPolicy, SubQueue
+from mmm.core.hub.shm import ShmRing
 from mmm.core.hub.datasource_msg_hub.subscription import Subscription, ResponseOfSub
 
 
@@ -11,33 +15,86 @@ logger = logging.getLogger(__name__)
 
 
 class AsyncioQueueDsMsgHub(MessageHub):
-    """asyncio queue datasource message hub."""
+    """
+    asyncio queue datasource message hub.
+
+    equal subscriptions share one multicast channel, every subscribe call adds a consumer queue to it and
+    the same response object is handed to all of them, so handlers must not modify it.
+    """
     def __init__(self):
         super().__init__()
-        self._subscriptions: Dict["Subscription", "Queue"] = {}
+        self._channels: Dict[Hashable, List["Queue"]] = {}
+        self._backlog = Backlog()
 
     def publish(self, msg: "ResponseOfSub"):
-        for subscription, queue in self._subscriptions.items():
-            if msg.response_for(subscription):
-                queue.put_nowait(msg)
+        queues = self._channels.get(msg.get_routing_key())
+        if queues is None:
+            return
+        for queue in queues:
+            self._backlog.put(queue, msg)
+
+    async def flush(self):
+        await self._backlog.flush()
+
+    def subscribe(self, subscription: "Subscription", maxsize: int = 0,
+                  overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        queue = SubQueue(maxsize, overflow)
+        self._channels.setdefault(subscription.get_routing_key(), []).append(queue)
+        return queue
+
+    def unsubscribe(self, subscription: "Subscription", queue: Optional["Queue"] = None):
+        """
+        @param subscription: subscription
+        @param queue: consumer queue returned by subscribe, if None all consumers of the channel are removed.
+        """
+        key = subscription.get_routing_key()
+        queues = self._channels.get(key)
+        if queues is None:
+            return
+        for each in list(queues):
+            if queue is None or each is queue:
+                self._backlog.discard(each)
+                queues.remove(each)
+        if not queues:
+            del self._channels[key]
 
-    def subscribe(self, subscription: "Subscription"):
-        if subscription not in self._subscriptions:
-            self._subscriptions[subscription] = Queue()
-        return self._subscriptions[subscription]
+    def consumer_count(self, subscription: "Subscription") -> int:
+        return len(self._channels.get(subscription.get_routing_key(), ()))
 
-    def unsubscribe(self, subscription: "Subscription"):
-        if subscription in self._subscriptions:
-            del self._subscriptions[subscription]
 
+class ShmDsMsgHub(AsyncioQueueDsMsgHub):
+    """
+    shared memory ring buffer datasource message hub, the datasource process writes to the ring and every
+    strategy process reads it and fans messages out to local queues.
+    """
+    __poll_interval__ = 0.0005
 
-class RabbitMQDsMsgHub(MessageHub):
-    """rabbitmq datasource message hub."""
-    def publish(self, msg):
-        """todo"""
+    def __init__(self, name: str, size: int):
+        super().__init__()
+        self.name = name
+        self.size = size
+        self._writer: Optional["ShmRing"] = None
+        self._reader_task: Optional["asyncio.Task"] = None
+
+    def publish(self, msg: "ResponseOfSub"):
+        if self._writer is None:
+            self._writer = ShmRing(self.name, self.size, create=True)
+        self._writer.write(codec.encode(msg))
 
-    def subscribe(self, subscription: "Subscription"):
-        """todo"""
+    def subscribe(self, subscription: "Subscription", maxsize: int = 0,
+                  overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        queue = super().subscribe(subscription, maxsize, overflow)
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_loop(), name='task.shm_ds_msg_hub.read')
+        return queue
 
-    def unsubscribe(self, subscription: "Subscription"):
-        """todo"""
+    async def _read_loop(self):
+        reader = await ShmRing.open_reader(self.name, self.size)  # the datasource process creates the ring
+        while True:
+            frames = reader.read()
+            if not frames:
+                await asyncio.sleep(self.__poll_interval__)
+                continue
+            for each in frames:
+                super().publish(codec.decode(each))
+            await super().flush()
@@ -0,0 +1,72 @@
+import asyncio
+
+from asyncio import Queue
+from typing import Optional
+
+import aio_pika
+
+from mmm.core.hub.amqp import AmqpConnection, BatchPublisher, topic_of
+from mmm.core.hub.codec import codec
+from mmm.core.hub.datasource_msg_hub.hub import AsyncioQueueDsMsgHub
+from mmm.core.hub.datasource_msg_hub.subscription import Subscription, ResponseOfSub
+from mmm.core.hub.queue import OverflowPolicy
+
+
+class RabbitMQDsMsgHub(AsyncioQueueDsMsgHub):
+    """
+    rabbitmq datasource message hub, messages are published to a topic exchange with the subscription routing
+    key as topic, every process binds one exclusive queue to the topics it subscribed and fans messages out to
+    local queues.
+    """
+    __exchange__ = 'mmm.ds_msg'
+    __max_attempts__ = 3  # market data is stale long before the broker is back, it is not retried forever
+
+    def __init__(self, connection: "AmqpConnection", batch_size: int = 100, batch_linger: float = 0.005):
+        super().__init__()
+        self.connection = connection
+        self.publisher = BatchPublisher(connection, self.__exchange__, batch_size, batch_linger,
+                                        max_attempts=self.__max_attempts__)
+        self._queue: Optional["aio_pika.abc.AbstractQueue"] = None
+        self._tasks = set()
+
+    def publish(self, msg: "ResponseOfSub"):
+        self.publisher.add(topic_of(msg.get_routing_key()), codec.encode(msg))
+
+    async def flush(self):
+        await self.publisher.flush()
+
+    def subscribe(self, subscription: "Subscription", maxsize: int = 0,
+                  overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        if self.consumer_count(subscription) == 0:
+            self._run(self._bind(topic_of(subscription.get_routing_key())))
+        return super().subscribe(subscription, maxsize, overflow)
+
+    def unsubscribe(self, subscription: "Subscription", queue: Optional["Queue"] = None):
+        super().unsubscribe(subscription, queue)
+        if self.consumer_count(subscription) == 0:
+            self._run(self._unbind(topic_of(subscription.get_routing_key())))
+
+    def _run(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _get_queue(self) -> "aio_pika.abc.AbstractQueue":
+        if self._queue is None:
+            channel = await self.connection.get_channel()
+            self._queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+            await self._queue.consume(self._on_message)
+        return self._queue
+
+    async def _bind(self, topic: str):
+        queue = await self._get_queue()
+        await queue.bind(await self.connection.get_exchange(self.__exchange__), routing_key=topic)
+
+    async def _unbind(self, topic: str):
+        queue = await self._get_queue()
+        await queue.unbind(await self.connection.get_exchange(self.__exchange__), routing_key=topic)
+
+    async def _on_message(self, message: "aio_pika.abc.AbstractIncomingMessage"):
+        async with message.process():
+            super().publish(codec.decode(message.body))
+            await super().flush()
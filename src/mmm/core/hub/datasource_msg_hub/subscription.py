@@ -1,9 +1,11 @@
 from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Hashable, Optional
 
 from mmm.project_types import Exchange
 
 
 class Subscription(metaclass=ABCMeta):
+    __batch_type__ = None  # batch type of the responses, None if they can not be used with @sub(..., batch=True)
 
     @abstractmethod
     def get_exchange(self) -> "Exchange": ...
@@ -11,15 +13,81 @@ class Subscription(metaclass=ABCMeta):
     @abstractmethod
     def equal_to(self, obj: "Subscription"): ...
 
+    @abstractmethod
+    def get_routing_key(self) -> Hashable:
+        """
+        @return: a stable key such as (exchange, channel, instId), equal subscriptions must return the same key.
+        """
+
+    def __eq__(self, other):
+        if not isinstance(other, Subscription):
+            return NotImplemented
+        return self.equal_to(other)
+
+    def __hash__(self):
+        return hash(self.get_routing_key())
+
+
+class LazyField:
+    """
+    read only attribute that is converted from a raw slot on first access and cached in `_<name>`,
+    the owner must declare both slots. values of the attributes named by `args` are passed to convert after
+    the raw value.
+    """
+
+    def __init__(self, raw: str, convert: Callable[..., Any], *args: str):
+        self.raw = raw
+        self.convert = convert
+        self.args = args
+        self.cache = None
+
+    def __set_name__(self, owner, name):
+        self.cache = f'_{name}'
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.cache)
+        except AttributeError:
+            value = self.convert(getattr(obj, self.raw), *[getattr(obj, each) for each in self.args])
+            setattr(obj, self.cache, value)
+            return value
+
 
 class ResponseOfSub(metaclass=ABCMeta):
-    """response of subscription."""
+    """response of subscription, one instance is shared by all consumers and must not be modified."""
+    __slots__ = ('_raw_data', )
+    __batch_type__ = None  # columnar batch type used by @sub(..., batch=True)
 
     def __init__(self, data=None):
         self._raw_data = data
 
+    @property
+    def raw_data(self):
+        """raw frame, only kept if the parser is asked to."""
+        return getattr(self, '_raw_data', None)
+
     @abstractmethod
     def get_exchange(self) -> "Exchange": ...
 
     @abstractmethod
     def response_for(self, obj: "Subscription") -> bool: ...
+
+    @abstractmethod
+    def get_routing_key(self) -> Hashable:
+        """
+        @return: routing key of the subscription this response belongs to.
+        """
+
+    def get_dedup_key(self) -> Optional[Hashable]:
+        """
+        @return: identity of the message across redundant feeds, None if copies can not be told apart.
+        """
+        return None
+
+    def get_conflation_key(self) -> Hashable:
+        """
+        @return: messages with the same key replace each other in a conflating queue.
+        """
+        return self.get_routing_key()
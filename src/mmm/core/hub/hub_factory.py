@@ -1,6 +1,6 @@
 from mmm.config import settings
-from mmm.core.hub.datasource_msg_hub.hub import AsyncioQueueDsMsgHub, RabbitMQDsMsgHub
-from mmm.core.hub.inner_event_hub.hub import AsyncioQueueEventHub, RabbitmqEventHub
+from mmm.core.hub.datasource_msg_hub.hub import AsyncioQueueDsMsgHub, ShmDsMsgHub
+from mmm.core.hub.inner_event_hub.hub import AsyncioQueueEventHub, ShmEventHub
 from mmm.project_types import RunningModel
 
 
@@ -20,6 +20,15 @@ class HubFactory:
     def __init__(self):
         self._ds_msg_hub = None
         self._inner_event_hub = None
+        self._amqp_connection = None
+
+    def get_amqp_connection(self):
+        """all rabbitmq hubs of a process share one connection and channel."""
+        from mmm.core.hub.amqp import AmqpConnection  # aio_pika is only required by RunningModel.DISTRIBUTED
+
+        if self._amqp_connection is None:
+            self._amqp_connection = AmqpConnection(settings.RABBITMQ['URL'], settings.RABBITMQ['PREFETCH_COUNT'])
+        return self._amqp_connection
 
     def get_ds_msg_hub(self):
         """get datasource message hub"""
@@ -29,7 +38,16 @@ class HubFactory:
                 self._ds_msg_hub = AsyncioQueueDsMsgHub()
             return self._ds_msg_hub
         elif settings.MODEL == RunningModel.DISTRIBUTED:
-            return RabbitMQDsMsgHub()
+            if self._ds_msg_hub is None:
+                from mmm.core.hub.datasource_msg_hub.rabbitmq import RabbitMQDsMsgHub
+
+                self._ds_msg_hub = RabbitMQDsMsgHub(self.get_amqp_connection(), settings.RABBITMQ['BATCH_SIZE'],
+                                                    settings.RABBITMQ['BATCH_LINGER'])
+            return self._ds_msg_hub
+        elif settings.MODEL == RunningModel.SHARED_MEMORY:
+            if self._ds_msg_hub is None:
+                self._ds_msg_hub = ShmDsMsgHub(settings.SHM_DS_MSG_HUB['NAME'], settings.SHM_DS_MSG_HUB['SIZE'])
+            return self._ds_msg_hub
 
     def get_inner_event_hub(self):
         if settings.MODEL == RunningModel.ALL_ALONE:
@@ -37,4 +55,14 @@ class HubFactory:
                 self._inner_event_hub = AsyncioQueueEventHub()
             return self._inner_event_hub
         elif settings.MODEL == RunningModel.DISTRIBUTED:
-            return RabbitmqEventHub()
+            if self._inner_event_hub is None:
+                from mmm.core.hub.inner_event_hub.rabbitmq import RabbitmqEventHub
+
+                self._inner_event_hub = RabbitmqEventHub(self.get_amqp_connection(), settings.RABBITMQ['BATCH_SIZE'],
+                                                         settings.RABBITMQ['BATCH_LINGER'])
+            return self._inner_event_hub
+        elif settings.MODEL == RunningModel.SHARED_MEMORY:
+            if self._inner_event_hub is None:
+                self._inner_event_hub = ShmEventHub(settings.SHM_INNER_EVENT_HUB['NAME'],
+                                                    settings.SHM_INNER_EVENT_HUB['SIZE'])
+            return self._inner_event_hub
@@ -1,50 +1,53 @@
-import pickle
-
-from copy import deepcopy
 from enum import Enum
 from typing import Optional
 
-from mmm.credential import Credential
+from mmm.core.hub.codec import codec, EnumField, Json, Nullable, Str
+from mmm.credential import Credential, credential_store
 from mmm.project_types import Exchange
 
 
-def clear(data, key):
-    data = deepcopy(data)
-    if key in data:
-        del data[key]
-    return data
-
-
 class Event:
-    def __init__(self, data=None):
-        self._raw_data = data
+    __slots__ = ()
 
     @property
     def raw_data(self):
-        return self._raw_data
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
 
     def __repr__(self):
-        return str(self._raw_data)
+        return str(self.raw_data)
 
     @classmethod
     def decode(cls, data):
-        return pickle.loads(data)
+        return codec.decode(data)
 
     def encode(self):
-        return pickle.dumps(self)
+        return codec.encode(self)
 
 
+@codec.register(1, uniq_id=Str(), strategy_name=Str(), bot_id=Str(), exchange=EnumField(Exchange), account=Str(),
+                params=Json())
 class OrderCreationEvent(Event):
+    """
+    in process the event keeps the credential it was created with. across processes only the account name travels,
+    it is resolved from the credential store of the receiving process, so accounts must be unique per credential there.
+    """
+    __slots__ = ('uniq_id', 'strategy_name', 'bot_id', 'exchange', 'account', 'params', '_credential')
+
     def __init__(self, uniq_id: str, strategy_name: str, bot_id: str, exchange: "Exchange",
                  credential: "Credential", params: dict):
-        super().__init__(clear(locals(), 'self'))
+        self._credential: Optional["Credential"] = credential
         self.uniq_id: str = uniq_id
         self.strategy_name: str = strategy_name
         self.bot_id: str = bot_id
         self.exchange: "Exchange" = exchange
-        self.credential: "Credential" = credential
+        self.account: str = credential.account
         self.params: dict = params
 
+    @property
+    def credential(self) -> "Credential":
+        credential = getattr(self, '_credential', None)  # decoded events do not have it
+        return credential if credential is not None else credential_store.get(self.account)
+
 
 class Command(Enum):
     START_BOT = 1
@@ -53,11 +56,10 @@ class Command(Enum):
     STOP_ALL = 4
 
 
+@codec.register(2, command=EnumField(Command), bot_id=Nullable(Str()))
 class BotControlEvent(Event):
+    __slots__ = ('command', 'bot_id')
 
     def __init__(self, command: "Command", bot_id: Optional[str] = None):
-        super().__init__(clear(locals(), 'self'))
         self.bot_id = bot_id
         self.command = command
-
-
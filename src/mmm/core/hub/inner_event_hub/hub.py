@@ -1,6 +1,11 @@
-from asyncio import Queue
+import asyncio
+
+from typing import Optional
 
 from mmm.core.hub.base import MessageHub
+from mmm.core.hub.codec import codec
+from mmm.core.hub.queue import Backlog, OverflowPolicy, SubQueue
+from mmm.core.hub.shm import ShmRing
 
 
 class AsyncioQueueEventHub(MessageHub):
@@ -8,30 +13,55 @@ class AsyncioQueueEventHub(MessageHub):
     def __init__(self):
         super().__init__()
         self._subscriptions = {}
+        self._backlog = Backlog()
 
-    def subscribe(self, event_type):
+    def subscribe(self, event_type, maxsize: int = 0, overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
         if event_type not in self._subscriptions:
-            self._subscriptions[event_type] = Queue()
+            self._subscriptions[event_type] = SubQueue(maxsize, overflow)
         return self._subscriptions[event_type]
 
     def unsubscribe(self, event_type):
         if event_type in self._subscriptions:
+            self._backlog.discard(self._subscriptions[event_type])
             del self._subscriptions[event_type]
 
     def publish(self, msg):
         if type(msg) in self._subscriptions:
-            self._subscriptions[type(msg)].put_nowait(msg)
+            self._backlog.put(self._subscriptions[type(msg)], msg)
 
+    async def flush(self):
+        await self._backlog.flush()
 
-class RabbitmqEventHub(MessageHub):
 
-    def publish(self, msg):
-        pass
+class ShmEventHub(AsyncioQueueEventHub):
+    """shared memory ring buffer event hub, writers from different processes are serialized by a file lock."""
+    __poll_interval__ = 0.001
 
-    def subscribe(self, *args, **kwargs):
-        pass
+    def __init__(self, name: str, size: int):
+        super().__init__()
+        self.name = name
+        self.size = size
+        self._writer: Optional["ShmRing"] = None
+        self._reader_task: Optional["asyncio.Task"] = None
 
-    def unsubscribe(self, *args, **kwargs):
-        pass
+    def publish(self, msg):
+        if self._writer is None:
+            self._writer = ShmRing(self.name, self.size, create=True, lock=True)
+        self._writer.write(codec.encode(msg))
 
+    def subscribe(self, event_type, maxsize: int = 0, overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        queue = super().subscribe(event_type, maxsize, overflow)
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_loop(), name='task.shm_event_hub.read')
+        return queue
 
+    async def _read_loop(self):
+        reader = await ShmRing.open_reader(self.name, self.size, lock=True)  # the first writer creates the ring
+        while True:
+            frames = reader.read()
+            if not frames:
+                await asyncio.sleep(self.__poll_interval__)
+                continue
+            for each in frames:
+                super().publish(codec.decode(each))
+            await super().flush()
@@ -0,0 +1,46 @@
+import asyncio
+
+import aio_pika
+
+from mmm.core.hub.amqp import AmqpConnection, BatchPublisher
+from mmm.core.hub.codec import codec
+from mmm.core.hub.inner_event_hub.hub import AsyncioQueueEventHub
+from mmm.core.hub.queue import OverflowPolicy
+
+
+class RabbitmqEventHub(AsyncioQueueEventHub):
+    """
+    rabbitmq event hub, every event type has a durable queue that is shared by all of its consumers, so an
+    event is handled once even if several processes subscribe to it.
+    """
+    __exchange__ = 'mmm.inner_event'
+
+    def __init__(self, connection: "AmqpConnection", batch_size: int = 100, batch_linger: float = 0.005):
+        super().__init__()
+        self.connection = connection
+        self.publisher = BatchPublisher(connection, self.__exchange__, batch_size, batch_linger, persistent=True)
+        self._tasks = set()
+
+    def publish(self, msg):
+        self.publisher.add(type(msg).__name__, codec.encode(msg))
+
+    async def flush(self):
+        await self.publisher.flush()
+
+    def subscribe(self, event_type, maxsize: int = 0, overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        if event_type not in self._subscriptions:
+            task = asyncio.create_task(self._consume(event_type.__name__))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return super().subscribe(event_type, maxsize, overflow)
+
+    async def _consume(self, topic: str):
+        channel = await self.connection.get_channel()
+        queue = await channel.declare_queue(f'{self.__exchange__}.{topic}', durable=True)
+        await queue.bind(await self.connection.get_exchange(self.__exchange__), routing_key=topic)
+        await queue.consume(self._on_message)
+
+    async def _on_message(self, message: "aio_pika.abc.AbstractIncomingMessage"):
+        async with message.process():
+            super().publish(codec.decode(message.body))
+            await super().flush()
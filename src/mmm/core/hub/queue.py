@@ -0,0 +1,127 @@
+from asyncio import Queue, QueueFull, Task, ensure_future, wait
+from collections import deque
+from enum import Enum
+from functools import partial
+from time import monotonic
+from typing import Dict, List
+
+
+class OverflowPolicy(Enum):
+    BLOCK = 1  # producer waits until the consumer catches up
+    DROP_OLDEST = 2  # the oldest pending message is dropped
+    CONFLATE = 3  # only the latest pending message of each conflation key is kept
+
+
+class SubQueue(Queue):
+    """
+    asyncio queue with an overflow policy, counts dropped and conflated messages and the seconds messages wait in
+    the queue, a conflated message waits since the first message of its key was put.
+    """
+
+    def __init__(self, maxsize: int = 0, overflow: "OverflowPolicy" = OverflowPolicy.BLOCK):
+        self.overflow: "OverflowPolicy" = overflow
+        self.dropped: int = 0
+        self.conflated: int = 0
+        self.waited: float = 0.0  # seconds all messages that were got waited
+        self.max_wait: float = 0.0
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = deque()
+        self._put_at = deque()
+        self._latest = {}
+
+    def _put(self, item):
+        if self.overflow is OverflowPolicy.CONFLATE:
+            key = item.get_conflation_key()
+            self._latest[key] = item
+            self._queue.append(key)
+        else:
+            self._queue.append(item)
+        self._put_at.append(monotonic())
+
+    def _get(self):
+        put_at, item = self._pop()
+        wait = monotonic() - put_at
+        self.waited += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        return item
+
+    def _pop(self):
+        put_at = self._put_at.popleft()
+        if self.overflow is OverflowPolicy.CONFLATE:
+            return put_at, self._latest.pop(self._queue.popleft())
+        return put_at, self._queue.popleft()
+
+    def get_ready(self, limit: int = 0) -> List:
+        """
+        the messages that are pending, without waiting
+        @param limit: most messages to get, all if 0
+        """
+        n = self.qsize() if limit <= 0 else min(limit, self.qsize())
+        return [self.get_nowait() for _ in range(n)]
+
+    def put_nowait(self, item):
+        if self.overflow is OverflowPolicy.CONFLATE:
+            key = item.get_conflation_key()
+            if key in self._latest:
+                self._latest[key] = item
+                self.conflated += 1
+                return
+        if self.full():
+            if self.overflow is OverflowPolicy.BLOCK:
+                raise QueueFull
+            self._pop()
+            self.task_done()
+            self.dropped += 1
+        super().put_nowait(item)
+
+
+class Backlog:
+    """
+    messages waiting for room in full BLOCK queues, producers that can wait drain it with flush(). a put that waits
+    for room runs as a task of its own, so discard() can cancel it when the consumer of the queue goes away.
+    """
+
+    def __init__(self):
+        self._pending: Dict["Queue", deque] = {}
+        self._putting: Dict["Queue", "Task"] = {}  # queue -> put of the first pending message that waits for room
+
+    def put(self, queue: "Queue", msg):
+        pending = self._pending.get(queue)
+        if pending is not None:
+            pending.append(msg)
+            return
+        try:
+            queue.put_nowait(msg)
+        except QueueFull:
+            self._pending[queue] = deque([msg])
+
+    def discard(self, queue: "Queue"):
+        """drop the messages of a queue that is unsubscribed and wake up the flush that waits for it."""
+        self._pending.pop(queue, None)
+        put = self._putting.pop(queue, None)
+        if put is not None:
+            put.cancel()
+
+    def _on_put(self, queue: "Queue", pending: deque, put: "Task"):
+        if self._putting.get(queue) is put:
+            del self._putting[queue]
+        if not put.cancelled():
+            pending.popleft()
+
+    async def flush(self):
+        while self._pending:
+            queue, pending = next(iter(self._pending.items()))
+            while pending and self._pending.get(queue) is pending:
+                if queue not in self._putting and not queue.full():
+                    queue.put_nowait(pending.popleft())
+                    continue
+                put = self._putting.get(queue)
+                if put is None:
+                    put = self._putting[queue] = ensure_future(queue.put(pending[0]))
+                    put.add_done_callback(partial(self._on_put, queue, pending))
+                await wait((put,))
+            if self._pending.get(queue) is pending:
+                del self._pending[queue]
@@ -0,0 +1,163 @@
+import asyncio
+import fcntl
+import os
+import struct
+import tempfile
+import time
+
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+
+
+HEADER = struct.Struct('<QQ')  # write cursor, capacity
+FRAME = struct.Struct('<I')  # payload length, frames are 8 bytes aligned
+PADDING = 0xFFFFFFFF  # marks the unused tail before the writer wraps around
+ALIGN = 8
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) & ~(ALIGN - 1)
+
+
+class ShmRing:
+    """
+    broadcast ring buffer in shared memory.
+
+    cursors are absolute byte positions that only grow, the writer never waits for readers, every reader keeps
+    its own cursor and detects when it has been lapped.
+
+    the segment is not unlinked when a process exits, a restarted writer continues the same ring and the readers
+    keep reading it. call unlink to remove it, e.g. with the clean-shared-memory command.
+    """
+
+    def __init__(self, name: str, size: int, create: bool = False, lock: bool = False):
+        """
+        :param create: create the segment if it does not exist, otherwise FileNotFoundError is raised
+        """
+        capacity = _align(size)
+        while True:
+            try:
+                self._shm = self._attach(name)
+                break
+            except FileNotFoundError:
+                if not create:
+                    raise
+            try:
+                self._shm = SharedMemory(name, create=True, size=HEADER.size + capacity)
+                resource_tracker.unregister(self._shm._name, 'shared_memory')  # noqa
+                HEADER.pack_into(self._shm.buf, 0, 0, capacity)
+                break
+            except FileExistsError:
+                time.sleep(0.001)  # created by another process, attach once its header is written
+        self.name = name
+        self.capacity = HEADER.unpack_from(self._shm.buf, 0)[1]
+        self.max_frame = self.capacity // 4
+        self._buf = self._shm.buf
+        self._lock_fd: Optional[int] = None
+        if lock:
+            path = os.path.join(tempfile.gettempdir(), f'{name}.lock')
+            self._lock_fd = os.open(path, os.O_CREAT | os.O_RDWR)
+
+    @staticmethod
+    def _attach(name: str) -> "SharedMemory":
+        shm = SharedMemory(name)
+        # the segment outlives this process, do not let the resource tracker unlink it on exit.
+        resource_tracker.unregister(shm._name, 'shared_memory')  # noqa
+        if shm.size < HEADER.size or HEADER.unpack_from(shm.buf, 0)[1] == 0:
+            shm.close()
+            raise FileNotFoundError(f'shared memory {name} is not initialized yet.')
+        return shm
+
+    @property
+    def write_cursor(self) -> int:
+        return HEADER.unpack_from(self._buf, 0)[0]
+
+    def write(self, payload: bytes):
+        n = len(payload)
+        size = _align(FRAME.size + n)
+        if size > self.max_frame:
+            raise ValueError(f'frame of {n} bytes exceeds the limit of ring {self.name}.')
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            cursor = self.write_cursor
+            offset = cursor % self.capacity
+            if offset + size > self.capacity:
+                FRAME.pack_into(self._buf, HEADER.size + offset, PADDING)
+                cursor += self.capacity - offset
+                offset = 0
+            start = HEADER.size + offset
+            FRAME.pack_into(self._buf, start, n)
+            self._buf[start + FRAME.size:start + FRAME.size + n] = payload
+            struct.pack_into('<Q', self._buf, 0, cursor + size)
+        finally:
+            if self._lock_fd is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def reader(self) -> "ShmRingReader":
+        return ShmRingReader(self)
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def unlink(self):
+        # unlink unregisters the segment from the resource tracker, which forgot it when it was opened.
+        resource_tracker.register(self._shm._name, 'shared_memory')  # noqa
+        self._shm.unlink()
+
+    @classmethod
+    async def open_reader(cls, name: str, size: int, lock: bool = False,
+                          interval: float = 0.1) -> "ShmRingReader":
+        """wait until the writer has created the segment and return a reader of it."""
+        while True:
+            try:
+                return cls(name, size, lock=lock).reader()
+            except FileNotFoundError:
+                await asyncio.sleep(interval)
+
+
+class ShmRingReader:
+    """
+    reads frames written after it was created.
+
+    a write that wraps around writes the padding marker and up to max_frame bytes at the start of the ring before
+    it publishes its cursor, so unpublished bytes reach up to 2 * max_frame past the published cursor. a reader
+    that is closer than that to being lapped counts an overrun and skips to the cursor.
+    """
+
+    def __init__(self, ring: "ShmRing"):
+        self.ring = ring
+        self.position = ring.write_cursor
+        self.overruns = 0
+
+    def read(self, limit: int = 1024) -> List[bytes]:
+        ring = self.ring
+        buf, capacity = ring._buf, ring.capacity  # noqa
+        cursor = ring.write_cursor
+        margin = capacity - 2 * ring.max_frame
+        if cursor - self.position > margin:
+            self.overruns += 1
+            self.position = cursor
+            return []
+        start, position, frames = self.position, self.position, []
+        while position < cursor and len(frames) < limit:
+            offset = position % capacity
+            n = FRAME.unpack_from(buf, HEADER.size + offset)[0]
+            if n == PADDING:
+                position += capacity - offset
+                continue
+            begin = HEADER.size + offset + FRAME.size
+            frames.append(bytes(buf[begin:begin + n]))
+            position += _align(FRAME.size + n)
+        if ring.write_cursor - start > margin:
+            # the writer may have overwritten what was just copied.
+            self.overruns += 1
+            self.position = ring.write_cursor
+            return []
+        self.position = position
+        return frames
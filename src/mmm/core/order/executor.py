@@ -3,12 +3,14 @@ import logging
 from copy import deepcopy
 from typing import List
 
+from mmm.config import settings
+from mmm.config.tools import load_strategy_app
 from mmm.core.hub.hub_factory import HubFactory
 from mmm.core.hub.inner_event_hub.event import OrderCreationEvent
 from mmm.core.storage import default_storage, Storage
 from mmm.core.order.handler import OkexOrderHandler, OrderHandler, BinanceOrderHandler
 from mmm.core.order.filter import Filter
-from mmm.credential import Credential
+from mmm.credential import Credential, credential_store
 from mmm.project_types import Exchange
 
 logger = logging.getLogger(__name__)
@@ -21,8 +23,14 @@ class OrderExecutor:
         self.cached_handler = {}
         self.middlewares: List["Filter"] = []  # todo
 
+    @staticmethod
+    def load_credentials():
+        """fill the credential store with settings.CREDENTIALS and the credentials of the strategies."""
+        credential_store.load_settings()
+        load_strategy_app(settings.STRATEGIES)  # strategies add their credential when they are created
+
     def get_order_handler(self, exchange: "Exchange", credential: "Credential"):
-        executor = self.cached_handler.get(exchange, None)
+        executor = self.cached_handler.get((exchange, credential.account), None)
         if executor is None:
             if exchange == Exchange.OKEX:
                 executor = OkexOrderHandler(credential)
@@ -32,7 +40,8 @@ class OrderExecutor:
         return executor
 
     def set_handler(self, exchange: "Exchange", handler: "OrderHandler"):
-        self.cached_handler[exchange] = handler
+        """handlers are cached by exchange and account, every account trades with its own credential."""
+        self.cached_handler[(exchange, handler.credential.account)] = handler
 
     async def on_order_event(self, order_event: "OrderCreationEvent"):
         c = deepcopy(order_event)
@@ -46,6 +55,7 @@ class OrderExecutor:
         self.storage.save_order(order_result)
 
     async def run_executor(self):
+        self.load_credentials()
         queue = self.order_event_hub.subscribe(OrderCreationEvent)
         while True:
             event = await queue.get()
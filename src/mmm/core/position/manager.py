@@ -1,6 +1,7 @@
 import logging
 from typing import List
 
+from mmm.numeric import notional
 from mmm.tools import get_price
 from mmm.project_types import Asset
 
@@ -20,7 +21,7 @@ class StrategyPosition:
     def get_worth(self, unit='USDT'):
         worth = 0
         for each in self._assets:
-            worth += get_price(each.inst_id, unit) * each.amount
+            worth += notional(get_price(each.inst_id, unit), each.amount, each.inst_id)
         return worth
 
     def add(self, asset: Asset):
@@ -0,0 +1,2 @@
+from .recorder import TickRecorder
+from .segment import SegmentReader, SegmentStore
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Set
+
+from mmm.core.datasource.batch import BookBatch, np
+from mmm.core.hub.datasource_msg_hub.subscription import Subscription
+from mmm.core.hub.hub_factory import HubFactory
+from mmm.core.recorder.segment import SegmentStore, SegmentWriter, key_to_parts
+from mmm.exceptions import ConfigureError
+from mmm.numeric import get_mode, get_precision
+from mmm.project_types import NumericMode
+
+
+logger = logging.getLogger(__name__)
+
+
+class TickRecorder:
+    """
+    subscribes to the datasource message hub like a bot and appends the columnar batches of the responses, trades,
+    candles and top levels of books, to the segments of a SegmentStore. batches of a subscription are buffered on the
+    loop until they reach block_rows or flush_interval passes, then they are concatenated, compressed and written by
+    one writer thread, so blocks of a segment are written in order.
+
+    the responses of a book share the live book, a book is recorded once every time the recorder drains its queue.
+    """
+
+    def __init__(self, subscriptions: List["Subscription"], root: str, partition: int = 3600, block_rows: int = 4096,
+                 flush_interval: float = 1.0, compress_level: int = 1, book_depth: int = 5):
+        """
+        @param partition: seconds of a segment
+        @param block_rows: rows buffered for a subscription before they are written as a block
+        @param flush_interval: seconds after which buffered rows are written even if the block is not full
+        @param compress_level: zlib level, 0 writes columns as they are
+        @param book_depth: levels of each side of a book that are recorded
+        """
+        if np is None:
+            raise ConfigureError('numpy is required by TickRecorder.')
+        self.subscriptions = list(dict.fromkeys(subscriptions))
+        self.store = SegmentStore(root, partition)
+        self.block_rows = block_rows
+        self.flush_interval = flush_interval
+        self.compress_level = compress_level
+        self.book_depth = book_depth
+        self.ds_msg_hub = HubFactory().get_ds_msg_hub()
+        self.rows = 0  # rows written
+        self.blocks = 0  # blocks written
+        self._pending: Dict[Hashable, list] = {}
+        self._pending_rows: Dict[Hashable, int] = {}
+        self._writers: Dict[Hashable, "SegmentWriter"] = {}
+        self._writing: Set["asyncio.Future"] = set()
+        self._executor: Optional["ThreadPoolExecutor"] = None
+        self._queues = []
+
+    async def run(self):
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='tick_recorder')
+        tasks = []
+        for sub in self.subscriptions:
+            queue = self.ds_msg_hub.subscribe(sub)
+            self._queues.append((sub, queue))
+            tasks.append(asyncio.create_task(self._consume(sub.get_routing_key(), queue),
+                                             name=f'task.tick_recorder.sub.{sub.__class__.__name__}'))
+        tasks.append(asyncio.create_task(self._flush_periodically(), name='task.tick_recorder.flush'))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.close()
+
+    async def _consume(self, key: Hashable, queue: "asyncio.Queue"):
+        while True:
+            events = [await queue.get()]
+            events.extend(queue.get_ready())
+            batch_type = type(events[0]).__batch_type__
+            if batch_type is None:
+                continue
+            if batch_type is BookBatch:
+                batch = BookBatch.from_responses(events, self.book_depth)
+            else:
+                batch = batch_type.from_responses(events)
+            self._pending.setdefault(key, []).append(batch)
+            self._pending_rows[key] = self._pending_rows.get(key, 0) + len(batch)
+            if self._pending_rows[key] >= self.block_rows:
+                self._submit(key)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """hand the rows buffered for every subscription to the writer thread."""
+        for key in list(self._pending):
+            self._submit(key)
+
+    def _submit(self, key: Hashable):
+        batches = self._pending.pop(key)
+        del self._pending_rows[key]
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._write, key, batches)
+        self._writing.add(future)
+        future.add_done_callback(self._on_written)
+
+    def _on_written(self, future: "asyncio.Future"):
+        self._writing.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f'tick recorder failed to write, {future.exception()!r}')
+
+    def _write(self, key: Hashable, batches: list):
+        names = [each for each in type(batches[0]).__slots__ if each != 'inst_id']
+        columns = {name: np.concatenate([getattr(each, name) for each in batches]) for name in names}
+        ts = columns['ts']
+        if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+            order = np.argsort(ts, kind='stable')
+            columns = {name: column[order] for name, column in columns.items()}
+            ts = columns['ts']
+        starts = [self.store.partition_of(int(each)) for each in (ts[0], ts[-1])]
+        if starts[0] == starts[1]:
+            self._append(key, starts[0], batches[0], columns)
+            return
+        partitions = ts // (self.store.partition * 1000)
+        bounds = np.flatnonzero(np.diff(partitions)) + 1
+        for lo, hi in zip([0, *bounds], [*bounds, len(ts)]):
+            self._append(key, self.store.partition_of(int(ts[lo])), batches[0],
+                         {name: column[lo:hi] for name, column in columns.items()})
+
+    def _append(self, key: Hashable, start: int, batch, columns: Dict[str, "np.ndarray"]):
+        writer = self._writers.get(key)
+        if writer is None or writer.header['start'] != start:
+            if writer is not None:
+                writer.close()
+            header = {
+                'kind': type(batch).__name__,
+                'inst_id': batch.inst_id,
+                'key': key_to_parts(key),
+                'start': start,
+                'partition': self.store.partition,
+                'numeric_mode': get_mode().name,
+                'precision': get_precision(batch.inst_id) if get_mode() is NumericMode.FIXED else None,
+                'columns': [[name, column.dtype.str, list(column.shape[1:])] for name, column in columns.items()],
+            }
+            writer = self._writers[key] = SegmentWriter(self.store.path_of(key, start), header, self.compress_level)
+        writer.append(columns)
+        self.rows += len(columns['ts'])
+        self.blocks += 1
+
+    async def close(self):
+        """unsubscribe, write what is buffered and close the segments."""
+        for sub, queue in self._queues:
+            self.ds_msg_hub.unsubscribe(sub, queue)
+        self._queues = []
+        if self._executor is None:
+            return
+        self.flush()
+        if self._writing:
+            await asyncio.gather(*self._writing, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close_writers)
+        self._executor.shutdown()
+        self._executor = None
+
+    def _close_writers(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
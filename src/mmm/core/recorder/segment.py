@@ -0,0 +1,337 @@
+"""
+append-only columnar segment files.
+
+a segment holds the rows of one subscription in one time partition, it is a header followed by blocks, every block
+stores each column as one compressed run. the index file next to it keeps one entry per block, (first ts, last ts,
+offset, rows), so a reader maps the segment and only decodes the blocks that overlap the range it asks for.
+
+    <segment>.seg: MAGIC | header length | json header | block | block ...
+    block:         BLOCK | stored length of every column | column ... each column is padded to 8 bytes
+    <segment>.idx: entry | entry ...
+
+the writer appends a block before its entry, after a crash a block without an entry is cut off when the segment is
+opened for writing again.
+"""
+import json
+import mmap
+import os
+import struct
+import zlib
+
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from mmm.core.datasource.batch import np
+from mmm.exceptions import SegmentError
+
+
+MAGIC = b'MMMSEG01'
+HEADER_LEN = struct.Struct('<I')
+BLOCK = struct.Struct('<4sIqq')  # marker, rows, first ts, last ts
+BLOCK_MARKER = b'BLK0'
+COLUMN_LEN = struct.Struct('<Q')
+ALIGN = 8
+INDEX_DTYPE = None if np is None else np.dtype([('first', '<i8'), ('last', '<i8'), ('offset', '<u8'), ('rows', '<u8')])
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) & ~(ALIGN - 1)
+
+
+def _dtype(spec: Sequence) -> "np.dtype":
+    """[name, dtype str, shape of a row] of the header -> numpy dtype of a row"""
+    return np.dtype((spec[1], tuple(spec[2]))) if spec[2] else np.dtype(spec[1])
+
+
+def key_to_parts(routing_key: Hashable) -> List[str]:
+    """(Exchange.OKEX, 'trades', 'BTC-USDT') -> ['okex', 'trades', 'BTC-USDT']"""
+    return [each.name.lower() if hasattr(each, 'name') else str(each) for each in routing_key]
+
+
+class SegmentWriter:
+    """writes one segment, it is not thread safe and should be used by one thread."""
+
+    def __init__(self, path: str, header: Dict, compress_level: int = 1):
+        """
+        @param header: kind, inst_id, key, start and columns, columns are [[name, dtype str, shape of a row], ...]
+        @param compress_level: zlib level of the columns, 0 stores them as they are so readers get zero copy views
+        """
+        self.path = path
+        self.compress_level = compress_level
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path):
+            self.header = read_header(path)[0]
+            if self.header['columns'] != header['columns']:
+                raise SegmentError(f'columns of {path} are {self.header["columns"]}, not {header["columns"]}.')
+            self._truncate_torn()
+        else:
+            self.header = dict(header, compress_level=compress_level)
+            payload = json.dumps(self.header).encode()
+            with open(path, 'wb') as f:
+                head = MAGIC + HEADER_LEN.pack(len(payload)) + payload
+                f.write(head + b'\0' * (_align(len(head)) - len(head)))
+            open(index_path(path), 'wb').close()
+        self.columns = [each[0] for each in self.header['columns']]
+        self._dtypes = [_dtype(each) for each in self.header['columns']]
+        self._data = open(path, 'ab')
+        self._index = open(index_path(path), 'ab')
+
+    def _truncate_torn(self):
+        """drop a partial entry and the blocks that have no entry."""
+        size = os.path.getsize(index_path(self.path))
+        entries = size // INDEX_DTYPE.itemsize
+        with open(index_path(self.path), 'r+b') as f:
+            f.truncate(entries * INDEX_DTYPE.itemsize)
+        index = read_index(self.path)
+        if len(index):
+            last = int(index['offset'][-1])
+            end = last + _block_size(self.path, last, len(self.header['columns']))
+        else:
+            end = _align(len(MAGIC) + HEADER_LEN.size + read_header(self.path)[1])
+        with open(self.path, 'r+b') as f:
+            f.truncate(end)
+
+    def append(self, columns: Dict[str, "np.ndarray"]):
+        """append one block, rows should be in ts order, ts is the time column of the index."""
+        ts = columns['ts']
+        rows = len(ts)
+        if not rows:
+            return
+        payloads = []
+        for name, dtype in zip(self.columns, self._dtypes):
+            raw = np.ascontiguousarray(columns[name], dtype=dtype.base).tobytes()
+            payloads.append(zlib.compress(raw, self.compress_level) if self.compress_level else raw)
+        offset = self._data.tell()
+        parts = [BLOCK.pack(BLOCK_MARKER, rows, int(ts.min()), int(ts.max()))]
+        parts.extend(COLUMN_LEN.pack(len(each)) for each in payloads)
+        for each in payloads:
+            parts.append(each)
+            parts.append(b'\0' * (_align(len(each)) - len(each)))
+        self._data.write(b''.join(parts))
+        self._data.flush()
+        self._index.write(np.array([(ts.min(), ts.max(), offset, rows)], INDEX_DTYPE).tobytes())
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+
+def index_path(path: str) -> str:
+    return path[:-len('.seg')] + '.idx' if path.endswith('.seg') else path + '.idx'
+
+
+def read_header(path: str) -> Tuple[Dict, int]:
+    """
+    @return: (header, length of the json header)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(MAGIC) + HEADER_LEN.size)
+        if head[:len(MAGIC)] != MAGIC:
+            raise SegmentError(f'{path} is not a segment.')
+        n = HEADER_LEN.unpack_from(head, len(MAGIC))[0]
+        return json.loads(f.read(n)), n
+
+
+def read_index(path: str) -> "np.ndarray":
+    """entries of the complete blocks of a segment, a partial entry being written is ignored."""
+    with open(index_path(path), 'rb') as f:
+        raw = f.read()
+    return np.frombuffer(raw[:len(raw) - len(raw) % INDEX_DTYPE.itemsize], INDEX_DTYPE)
+
+
+def _block_size(path: str, offset: int, n_columns: int) -> int:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        head = f.read(BLOCK.size + COLUMN_LEN.size * n_columns)
+    marker = BLOCK.unpack_from(head)[0]
+    if marker != BLOCK_MARKER:
+        raise SegmentError(f'no block at {offset} of {path}.')
+    lengths = struct.unpack_from(f'<{n_columns}Q', head, BLOCK.size)
+    return BLOCK.size + COLUMN_LEN.size * n_columns + sum(_align(each) for each in lengths)
+
+
+class SegmentReader:
+    """
+    memory maps a segment, it sees the blocks that were indexed when it was opened. columns of segments that are not
+    compressed are views of the map as long as the range falls in one block, keep the reader open while using them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header = read_header(path)[0]
+        self.columns = [each[0] for each in self.header['columns']]
+        self._dtypes = {each[0]: _dtype(each) for each in self.header['columns']}
+        self.index = read_index(path)
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if len(self.index) else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return int(self.index['rows'].sum())
+
+    @property
+    def first_ts(self) -> Optional[int]:
+        return int(self.index['first'].min()) if len(self.index) else None
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self.index['last'].max()) if len(self.index) else None
+
+    def blocks(self, start: Optional[int] = None, end: Optional[int] = None) -> "np.ndarray":
+        """
+        @return: positions of the blocks that have rows in [start, end)
+        """
+        mask = np.ones(len(self.index), bool)
+        if start is not None:
+            mask &= self.index['last'] >= start
+        if end is not None:
+            mask &= self.index['first'] < end
+        return np.flatnonzero(mask)
+
+    def read_block(self, i: int, columns: Optional[Iterable[str]] = None) -> Dict[str, "np.ndarray"]:
+        entry = self.index[i]
+        offset, rows = int(entry['offset']), int(entry['rows'])
+        marker = BLOCK.unpack_from(self._map, offset)[0]
+        if marker != BLOCK_MARKER:
+            raise SegmentError(f'no block at {offset} of {self.path}.')
+        n = len(self.columns)
+        lengths = struct.unpack_from(f'<{n}Q', self._map, offset + BLOCK.size)
+        pos = offset + BLOCK.size + COLUMN_LEN.size * n
+        wanted = set(self.columns if columns is None else columns)
+        rv = {}
+        compressed = self.header.get('compress_level', 0)
+        for name, length in zip(self.columns, lengths):
+            if name in wanted:
+                dtype = self._dtypes[name]
+                if compressed:
+                    buf = zlib.decompress(memoryview(self._map)[pos:pos + length])
+                else:
+                    buf = memoryview(self._map)[pos:pos + length]
+                rv[name] = np.frombuffer(buf, dtype.base).reshape((rows,) + dtype.shape)
+            pos += _align(length)
+        return rv
+
+    def read(self, start: Optional[int] = None, end: Optional[int] = None,
+             columns: Optional[Iterable[str]] = None) -> Dict[str, "np.ndarray"]:
+        """
+        @param start: first ts in milliseconds, included
+        @param end: last ts in milliseconds, excluded
+        @param columns: names of the columns, all columns if None
+        @return: name -> column of the rows in [start, end)
+        """
+        columns = self.columns if columns is None else list(columns)
+        names = columns if 'ts' in columns else columns + ['ts']
+        blocks = [self.read_block(i, names) for i in self.blocks(start, end)]
+        if not blocks:
+            return {name: np.empty((0,) + self._dtypes[name].shape, self._dtypes[name].base) for name in columns}
+        if len(blocks) == 1:
+            rv = blocks[0]
+        else:
+            rv = {name: np.concatenate([each[name] for each in blocks]) for name in names}
+        if start is not None or end is not None:
+            ts = rv['ts']
+            mask = np.ones(len(ts), bool)
+            if start is not None:
+                mask &= ts >= start
+            if end is not None:
+                mask &= ts < end
+            if not mask.all():
+                rv = {name: rv[name][mask] for name in names}
+        return {name: rv[name] for name in columns}
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # columns that are views of the map keep it open until they are released
+            self._map = None
+        self._file.close()
+
+
+class SegmentStore:
+    """
+    segments under root, <root>/<exchange>/<channel>/<inst_id>/<partition start ms>.seg, a segment holds the rows
+    whose ts falls in its partition, so a segment covers the time until the next one starts.
+    """
+
+    def __init__(self, root: str, partition: int = 3600, mapped: bool = False):
+        """
+        @param partition: seconds of a segment
+        @param mapped: keep the segments mapped between reads, processes that read the same segments then share their
+                       pages and columns of uncompressed segments are views of the maps. blocks appended after a
+                       segment is mapped are not seen.
+        """
+        self.root = root
+        self.partition = partition
+        self.mapped = mapped
+        self._readers: Dict[str, "SegmentReader"] = {}
+
+    def partition_of(self, ts: int) -> int:
+        ms = self.partition * 1000
+        return ts // ms * ms
+
+    def path_of(self, routing_key: Hashable, start: int) -> str:
+        return os.path.join(self.root, *key_to_parts(routing_key), f'{start}.seg')
+
+    def segments(self, routing_key: Hashable, start: Optional[int] = None, end: Optional[int] = None) -> List[str]:
+        """
+        @return: paths of the segments that may have rows in [start, end), in time order
+        """
+        directory = os.path.join(self.root, *key_to_parts(routing_key))
+        if not os.path.isdir(directory):
+            return []
+        starts = sorted(int(each[:-len('.seg')]) for each in os.listdir(directory) if each.endswith('.seg'))
+        rv = []
+        for i, each in enumerate(starts):
+            following = starts[i + 1] if i + 1 < len(starts) else None
+            if end is not None and each >= end:
+                break
+            if start is not None and following is not None and following <= start:
+                continue
+            rv.append(os.path.join(directory, f'{each}.seg'))
+        return rv
+
+    def header(self, routing_key: Hashable) -> Optional[Dict]:
+        """header of the first segment of the subscription, None if nothing is recorded"""
+        paths = self.segments(routing_key)
+        return read_header(paths[0])[0] if paths else None
+
+    def span(self, routing_key: Hashable) -> Tuple[Optional[int], Optional[int]]:
+        """
+        @return: (first ts, last ts) of the recorded rows of the subscription
+        """
+        paths = self.segments(routing_key)
+        if not paths:
+            return None, None
+        with SegmentReader(paths[0]) as first, SegmentReader(paths[-1]) as last:
+            return first.first_ts, last.last_ts
+
+    def read(self, routing_key: Hashable, start: Optional[int] = None, end: Optional[int] = None,
+             columns: Optional[Iterable[str]] = None) -> Dict[str, "np.ndarray"]:
+        """columns of the rows in [start, end) of all segments of the subscription, see SegmentReader.read"""
+        parts = []
+        for path in self.segments(routing_key, start, end):
+            if self.mapped:
+                reader = self._readers.get(path)
+                if reader is None:
+                    reader = self._readers[path] = SegmentReader(path)
+                parts.append(reader.read(start, end, columns))
+                continue
+            with SegmentReader(path) as reader:
+                parts.append({k: v.copy() for k, v in reader.read(start, end, columns).items()})
+        if not parts:
+            return {}
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([each[name] for each in parts]) for name in parts[0]}
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
@@ -4,14 +4,18 @@ import inspect
 import logging
 from abc import ABCMeta, abstractmethod
 
-from datetime import datetime
 from enum import Enum
-from typing import Callable, List
+from time import perf_counter
+from typing import Dict, List, Optional
 
+from mmm.core.clock import Clock, get_clock
+from mmm.core.datasource.batch import make_batch
 from mmm.core.hub.hub_factory import HubFactory
 from mmm.core.hub.inner_event_hub.event import Command, BotControlEvent
+from mmm.core.hub.queue import OverflowPolicy, SubQueue
 from mmm.core.storage import default_storage, Storage
 from mmm.core.strategy.decorators import register_handler
+from mmm.core.strategy.scheduler import MissedTick, TimerScheduler
 from mmm.core.strategy.strategy import Strategy
 from mmm.exceptions import HandlerRegisterError
 
@@ -25,53 +29,117 @@ class BotStatus(Enum):
     Stopped = 2
 
 
+class HandlerStats:
+    """load of a subscription handler, the queue wait is read from its queue."""
+    __slots__ = ('queue', 'calls', 'messages', 'wakeups', 'busy', 'max_busy')
+
+    def __init__(self, queue: "SubQueue"):
+        self.queue = queue
+        self.calls = 0
+        self.messages = 0
+        self.wakeups = 0  # times the consumer woke up and drained the queue
+        self.busy = 0.0  # seconds spent in the handler
+        self.max_busy = 0.0  # most seconds spent on the messages of one wakeup
+
+    @property
+    def queue_wait(self) -> float:
+        """seconds all messages waited in the queue"""
+        return self.queue.waited
+
+    @property
+    def max_queue_wait(self) -> float:
+        return self.queue.max_wait
+
+    def __repr__(self):
+        return (f'HandlerStats(calls={self.calls}, messages={self.messages}, wakeups={self.wakeups}, '
+                f'busy={self.busy:.6f}, max_busy={self.max_busy:.6f}, queue_wait={self.queue_wait:.6f}, '
+                f'max_queue_wait={self.max_queue_wait:.6f})')
+
+
 class Bot:
-    def __init__(self, strategy: "Strategy"):
+    __drain_limit__ = 0  # most messages a consumer takes from its queue in one wakeup, 0 takes all that are pending
+
+    def __init__(self, strategy: "Strategy", clock: Optional["Clock"] = None):
+        """
+        @param clock: clock of the timers, the clock of the process if None
+        """
         self.bot_id = strategy.bot_id
         self.strategy = strategy
+        self.clock = clock or get_clock()
+        self.scheduler: Optional["TimerScheduler"] = None  # timers of the bot, see scheduler.stats for their metrics
+        self.stats: Dict[str, "HandlerStats"] = {}  # method name -> load of the subscription handler
         self.ds_msg_hub = HubFactory().get_ds_msg_hub()
+        self._queues = []
 
     async def gather_tasks(self):
         tasks = self.create_timed_tasks() + self.create_event_consuming_tasks()
         await asyncio.gather(*tasks)
 
+    def pending(self) -> int:
+        """messages waiting in the queues of the subscriptions"""
+        return sum(queue.qsize() for _, queue in self._queues)
+
+    async def join(self):
+        """wait until every message put in the queues of the subscriptions has been handled"""
+        await asyncio.gather(*(queue.join() for _, queue in self._queues))
+
     def on_close(self):
-        sub_registry = self.strategy.get_sub_registry()
-        for sub in sub_registry.get_subscriptions():
-            self.ds_msg_hub.unsubscribe(sub)
+        for sub, queue in self._queues:
+            self.ds_msg_hub.unsubscribe(sub, queue)
+        self._queues = []
 
     def create_timed_tasks(self):
-        async def _timer(name_: str, i: int, callback: Callable):
+        async def _timers(name_: str):
             try:
-                callback()
-                while True:
-                    await asyncio.sleep(i)
-                    if inspect.iscoroutinefunction(callback):
-                        await callback()
-                    else:
-                        callback()
+                await self.scheduler.run()
             except asyncio.CancelledError as e:
                 if str(e):
                     logger.error(f"task {name_} {e}")
                 else:
                     logger.error(f"task {name_} canceled.")
-        tasks = []
-        registry = self.strategy.get_timer_registry()
-        for interval, method_name in registry.items():
+        self.scheduler = TimerScheduler(self.clock)
+        for interval, method_name in self.strategy.get_timer_registry().items():
             method = getattr(self.strategy, method_name)
-            name = f'{self.strategy.strategy_name}.timer({interval})'
-            tasks.append(asyncio.create_task(_timer(name, interval, method), name=f'task.timer.{interval}'))
-        return tasks
+            self.scheduler.add(method_name, method, interval, align=getattr(method, '__timer_align__', False),
+                               offset=getattr(method, '__timer_offset__', 0),
+                               missed=getattr(method, '__timer_missed__', MissedTick.COALESCE))
+        if not len(self.scheduler):
+            return []
+        name = f'task.{self.strategy.strategy_name}.timers'
+        return [asyncio.create_task(_timers(name), name=name)]
 
     def create_event_consuming_tasks(self):
-        async def consume(name_, queue_, callback):
+        async def consume(name_, queue_: "SubQueue", callback, batch, as_list, stats: "HandlerStats"):
+            is_async = inspect.iscoroutinefunction(callback)
+            whole = batch or as_list  # the handler takes all pending messages in one call
             try:
                 while True:
-                    event = await queue_.get()
-                    if inspect.iscoroutinefunction(callback):
-                        await callback(event)
+                    events = [await queue_.get()]
+                    events.extend(queue_.get_ready(self.__drain_limit__))
+                    start = perf_counter()
+                    if whole:
+                        arg = make_batch(events) if batch else events
+                        if is_async:
+                            await callback(arg)
+                        else:
+                            callback(arg)
+                        stats.calls += 1
+                    elif is_async:
+                        for event in events:
+                            await callback(event)
+                        stats.calls += len(events)
                     else:
-                        callback(event)
+                        for event in events:
+                            callback(event)
+                        stats.calls += len(events)
+                    busy = perf_counter() - start
+                    for _ in events:
+                        queue_.task_done()
+                    stats.messages += len(events)
+                    stats.wakeups += 1
+                    stats.busy += busy
+                    if busy > stats.max_busy:
+                        stats.max_busy = busy
             except asyncio.CancelledError as e:
                 if str(e):
                     logger.error(f"task {name_} {e}")
@@ -80,10 +148,14 @@ class Bot:
         tasks = []
         sub_registry = self.strategy.get_sub_registry()
         for sub, method_name in sub_registry.items():
-            queue = self.ds_msg_hub.subscribe(sub)
             method = getattr(self.strategy, method_name)
+            queue = self.ds_msg_hub.subscribe(sub, maxsize=getattr(method, '__queue_size__', 0),
+                                              overflow=getattr(method, '__overflow__', OverflowPolicy.BLOCK))
+            self._queues.append((sub, queue))
+            stats = self.stats[method_name] = HandlerStats(queue)
             name = f'task.{self.strategy.strategy_name}.sub.{sub.__class__.__name__}'
-            tasks.append(asyncio.create_task(consume(name, queue, method), name=name))
+            tasks.append(asyncio.create_task(consume(name, queue, method, getattr(method, '__batch__', False),
+                                                     getattr(method, '__as_list__', False), stats), name=name))
         return tasks
 
 
@@ -175,10 +247,11 @@ class BotCommandHandler(metaclass=HandlerABCMetaclass):
 
 
 class BotControlEventHandler(BotCommandHandler):
-    def __init__(self, bot_registry: "BotRegistry", storage=default_storage):
+    def __init__(self, bot_registry: "BotRegistry", storage=default_storage, clock: Optional["Clock"] = None):
         super().__init__()
         self.bot_registry = bot_registry
         self.storage: "Storage" = storage
+        self.clock = clock or get_clock()
         self.bot_tasks = {}
         self.persistent_task = set()
 
@@ -189,17 +262,17 @@ class BotControlEventHandler(BotCommandHandler):
         del self.bot_tasks[bot_id]
 
     async def persistent_bot(self, bot: "Bot"):
-        s = datetime.utcnow()
+        s = self.clock.monotonic()
         self.storage.create_or_update_bot(bot.bot_id, strategy_name=bot.strategy.strategy_name,
                                           status=BotStatus.Created.value)
-        while (datetime.utcnow() - s).seconds < 15:
+        while self.clock.monotonic() - s < 15:
             task = self.bot_tasks.get(bot.bot_id)
             if task:
                 if not task.done():
                     self.storage.create_or_update_bot(bot.bot_id, strategy_name=bot.strategy.strategy_name,
                                                       status=BotStatus.Running.value)
                     return
-            await asyncio.sleep(0.5)
+            await self.clock.sleep(0.5)
 
     def _start_bot(self, bot):
         bot_id = bot.bot_id
@@ -3,32 +3,69 @@ import inspect
 from functools import wraps
 from typing import Union
 
+from mmm.core.datasource.batch import np
 from mmm.core.hub.datasource_msg_hub.subscription import Subscription
+from mmm.core.hub.queue import OverflowPolicy
+from mmm.core.strategy.scheduler import MissedTick
+from mmm.exceptions import ConfigureError
 
 
 FloatInt = Union[float, int]
 
 
-def timer(interval: "FloatInt"):
+def timer(interval: "FloatInt", align: bool = False, offset: "FloatInt" = 0,
+          missed: "MissedTick" = MissedTick.COALESCE):
     """
-    :param interval: seconds
+    :param interval: seconds, fractions of a second are allowed
+    :param align: if True the timer fires at the multiples of interval since the epoch, such as the closes of candles,
+                  else it fires when the bot starts and every interval after that.
+    :param offset: seconds the aligned ticks are shifted by
+    :param missed: what to do with the ticks that passed while the bot was busy, see MissedTick
     :return:
     """
-    if not isinstance(interval, int):
-        raise TypeError(f'interval must be int')
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not interval > 0:
+        raise TypeError('interval must be a positive number.')
+    if not isinstance(missed, MissedTick):
+        raise TypeError('param missed must be type of MissedTick.')
 
     def new_func(func):
-        @wraps(func)
-        def wrap_func(self):
-            return func(self)
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrap_func(self):
+                return await func(self)
+        else:
+            @wraps(func)
+            def wrap_func(self):
+                return func(self)
         wrap_func.__timer_interval__ = interval
+        wrap_func.__timer_align__ = align
+        wrap_func.__timer_offset__ = offset
+        wrap_func.__timer_missed__ = missed
         return wrap_func
     return new_func
 
 
-def sub(topic: "Subscription"):
+def sub(topic: "Subscription", maxsize: int = 0, overflow: "OverflowPolicy" = OverflowPolicy.BLOCK,
+        batch: bool = False, as_list: bool = False):
+    """
+    :param topic: subscription
+    :param maxsize: max pending messages of the handler queue, 0 means unbounded
+    :param overflow: what to do when the queue is full, see OverflowPolicy
+    :param batch: if True, the handler receives all pending messages at once as a columnar batch such as
+                  TradeBatch or CandleBatch, numpy is required.
+    :param as_list: if True, the handler receives all pending messages at once as a list of responses.
+    :return:
+    """
     if not isinstance(topic, Subscription):
         raise TypeError('param topic must be type of Subscription.')
+    if not isinstance(overflow, OverflowPolicy):
+        raise TypeError('param overflow must be type of OverflowPolicy.')
+    if batch and np is None:
+        raise ConfigureError('numpy is required by sub(..., batch=True).')
+    if batch and as_list:
+        raise TypeError('param batch and as_list can not both be True.')
+    if batch and topic.__batch_type__ is None:
+        raise TypeError(f'responses of {type(topic).__name__} have no batch type, use as_list=True instead.')
 
     def new_func(func):
         if hasattr(func, '__subscription__'):
@@ -43,6 +80,10 @@ def sub(topic: "Subscription"):
             def wrap_func(self, event_data):
                 return func(self, event_data)
         wrap_func.__subscription__ = topic
+        wrap_func.__queue_size__ = maxsize
+        wrap_func.__overflow__ = overflow
+        wrap_func.__batch__ = batch
+        wrap_func.__as_list__ = as_list
         return wrap_func
     return new_func
 
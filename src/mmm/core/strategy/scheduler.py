@@ -0,0 +1,129 @@
+import heapq
+import inspect
+import itertools
+import math
+
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from mmm.core.clock import Clock, get_clock
+
+
+class MissedTick(Enum):
+    """what a timer does with the ticks that passed while the bot was busy"""
+    COALESCE = 1  # fire once for all of them
+    SKIP = 2  # drop them, a tick that is a whole interval late is not fired
+    CATCH_UP = 3  # fire every one of them back to back
+
+
+def first_deadline(now: float, interval: float, align: bool = False, offset: float = 0.0) -> float:
+    """
+    @param now: wall clock seconds
+    @param align: if True the deadlines are the multiples of interval since the epoch shifted by offset, such as the
+                  closes of candles, else the first deadline is now
+    @return: wall clock seconds of the first tick
+    """
+    if not align:
+        return now
+    return math.ceil((now - offset) / interval) * interval + offset
+
+
+class TimerStats:
+    __slots__ = ('fired', 'missed', 'overruns', 'max_lag', 'last_duration', 'total_duration')
+
+    def __init__(self):
+        self.fired = 0
+        self.missed = 0  # ticks coalesced or skipped
+        self.overruns = 0  # calls that took longer than the interval
+        self.max_lag = 0.0  # seconds a call started after its deadline
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+
+    def __repr__(self):
+        return (f'TimerStats(fired={self.fired}, missed={self.missed}, overruns={self.overruns}, '
+                f'max_lag={self.max_lag:.6f}, total_duration={self.total_duration:.6f})')
+
+
+class _Timer:
+    __slots__ = ('name', 'callback', 'is_async', 'interval', 'missed', 'base', 'tick', 'stats')
+
+    def __init__(self, name: str, callback: Callable, interval: float, missed: "MissedTick", base: float):
+        self.name = name
+        self.callback = callback
+        self.is_async = inspect.iscoroutinefunction(callback)
+        self.interval = interval
+        self.missed = missed
+        self.base = base  # monotonic deadline of tick 0
+        self.tick = 0
+        self.stats = TimerStats()
+
+    @property
+    def deadline(self) -> float:
+        # computed from tick 0 so that float intervals do not accumulate rounding errors
+        return self.base + self.tick * self.interval
+
+
+class TimerScheduler:
+    """
+    runs all timers of a bot in one task on a heap of monotonic deadlines. the deadlines of a timer are fixed
+    multiples of its interval, so the time a callback takes does not shift the following ticks, and a tick that is
+    late because the bot was busy is handled by the MissedTick policy of the timer.
+    """
+
+    def __init__(self, clock: Optional["Clock"] = None):
+        self.clock = clock or get_clock()
+        self.stats: Dict[str, "TimerStats"] = {}
+        self._heap: List[tuple] = []  # (deadline, seq, timer)
+        self._seq = itertools.count()
+
+    def add(self, name: str, callback: Callable, interval: float, align: bool = False, offset: float = 0.0,
+            missed: "MissedTick" = MissedTick.COALESCE):
+        """
+        @param interval: seconds between the ticks
+        @param align: see first_deadline
+        """
+        clock = self.clock
+        now = clock.time()
+        base = clock.monotonic() + first_deadline(now, interval, align, offset) - now
+        timer = _Timer(name, callback, interval, missed, base)
+        self.stats[name] = timer.stats
+        heapq.heappush(self._heap, (timer.deadline, next(self._seq), timer))
+
+    def __len__(self):
+        return len(self._heap)
+
+    async def run(self):
+        clock, heap = self.clock, self._heap
+        while heap:
+            deadline = heap[0][0]
+            if clock.monotonic() < deadline:
+                await clock.sleep_until(deadline)
+                continue
+            _, _, timer = heapq.heappop(heap)
+            await self._fire(timer)
+            heapq.heappush(heap, (timer.deadline, next(self._seq), timer))
+
+    async def _fire(self, timer: "_Timer"):
+        clock, stats = self.clock, timer.stats
+        start = clock.monotonic()
+        late = max(0, math.floor((start - timer.deadline) / timer.interval))  # ticks after this one that passed
+        if timer.missed is MissedTick.SKIP and late:
+            timer.tick += late + 1
+            stats.missed += late + 1
+            return
+        stats.max_lag = max(stats.max_lag, start - timer.deadline)
+        if timer.is_async:
+            await timer.callback()
+        else:
+            timer.callback()
+        duration = clock.monotonic() - start
+        stats.fired += 1
+        stats.last_duration = duration
+        stats.total_duration += duration
+        if duration > timer.interval:
+            stats.overruns += 1
+        if timer.missed is MissedTick.CATCH_UP:
+            timer.tick += 1
+        else:
+            timer.tick += late + 1
+            stats.missed += late
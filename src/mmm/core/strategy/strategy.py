@@ -3,14 +3,21 @@ from typing import Dict, Optional, Union
 
 from mmm.core.hub.datasource_msg_hub.subscription import Subscription
 from mmm.core.hub.inner_event_hub.event import OrderCreationEvent
-from mmm.credential import Credential
+from mmm.credential import Credential, credential_store
 from mmm.core.order.manager import OrderManager, DefaultOrderManager
 from mmm.exceptions import SubscriptionError, TimerError
+from mmm.numeric import format_order_params
 from mmm.project_types import Exchange
 
 
 logger = logging.getLogger(__name__)
 
+# instrument key, price keys and size keys of the order params of each exchange
+ORDER_NUMBER_KEYS = {
+    Exchange.OKEX: ('instId', ('px', 'slTriggerPx', 'slOrdPx', 'tpTriggerPx', 'tpOrdPx'), ('sz',)),
+    Exchange.BINANCE: ('symbol', ('price', 'stopPrice'), ('quantity',)),
+}
+
 
 class SubRegistry:
 
@@ -20,10 +27,7 @@ class SubRegistry:
     def exists(self, obj: "Subscription") -> bool:
         if not isinstance(obj, Subscription):
             return False
-        for key, value in self._registry.items():
-            if key.equal_to(obj):
-                return True
-        return False
+        return obj in self._registry
 
     def register(self, s: "Subscription", method_name):
         self._registry[s] = method_name
@@ -31,6 +35,11 @@ class SubRegistry:
     def get_subscriptions(self):
         return list(self._registry.keys())
 
+    def copy(self) -> "SubRegistry":
+        registry = SubRegistry()
+        registry._registry.update(self._registry)
+        return registry
+
     def items(self):
         return self._registry.items()
 
@@ -43,13 +52,16 @@ class TimerRegistry:
         self._registry: Dict[FloatInt, str] = {}
 
     def exists(self, interval: FloatInt):
-        for each in self._registry:
-            return each == interval
-        return False
+        return interval in self._registry
 
     def register(self, interval, method_name):
         self._registry[interval] = method_name
 
+    def copy(self) -> "TimerRegistry":
+        registry = TimerRegistry()
+        registry._registry.update(self._registry)
+        return registry
+
     def items(self):
         return self._registry.items()
 
@@ -57,17 +69,15 @@ class TimerRegistry:
 class StrategyMeta(type):
     def __new__(cls, name, bases, kwargs):  # noqa
         sub_registry = cls.__get_registry_from_base__(cls, bases, '__sub_registry__')
-        if sub_registry is None:
-            sub_registry = SubRegistry()
+        sub_registry = SubRegistry() if sub_registry is None else sub_registry.copy()
 
         timer_registry = cls.__get_registry_from_base__(cls, bases, '__timer_registry__')
-        if timer_registry is None:
-            timer_registry = TimerRegistry()
+        timer_registry = TimerRegistry() if timer_registry is None else timer_registry.copy()
 
         for method_name, method in kwargs.items():
             subscription = getattr(method, '__subscription__', None)
             if subscription and sub_registry.exists(subscription):
-                raise SubscriptionError(f"You can not sub {subscription.__name__} twice.")
+                raise SubscriptionError(f"You can not sub {subscription.__class__.__name__} twice.")
             elif subscription:
                 sub_registry.register(subscription, method_name)
 
@@ -94,6 +104,7 @@ class Strategy(metaclass=StrategyMeta):
     def __init__(self, bot_id: str, credential: "Credential"):
         self.bot_id = bot_id
         self.credential = credential
+        credential_store.add(credential)  # order events carry only the account of it
         self.order_manager: OrderManager = DefaultOrderManager()
 
     @property
@@ -104,10 +115,12 @@ class Strategy(metaclass=StrategyMeta):
         """
         :param uniq_id: an unique id represent for this request
         :param exchange: such as okex, binance
-        :param params: params that exchange api required
+        :param params: params that exchange api required, prices and sizes are strings or numbers of the numeric
+            mode, e.g. scaled ints of responses in NumericMode.FIXED
         :return:
         """
-        uniq_id, self.get_strategy_name(), self.bot_id, exchange, self.credential, params
+        inst_key, prices, sizes = ORDER_NUMBER_KEYS[exchange]
+        params = format_order_params(params, params.get(inst_key), prices, sizes)
         event = OrderCreationEvent(
             uniq_id=uniq_id,
             strategy_name=self.get_strategy_name(),
@@ -1,5 +1,7 @@
-import time
 from abc import ABC, abstractmethod
+from typing import Optional
+
+from mmm.core.clock import Clock, get_clock
 
 
 class OrderIDGenerator(ABC):
@@ -10,8 +12,18 @@ class OrderIDGenerator(ABC):
 class OkexOrderIDGenerator(OrderIDGenerator):
     """字母（区分大小写）与数字的组合，可以是纯字母、纯数字且长度要在1-32位之间。"""
 
+    def __init__(self, clock: Optional["Clock"] = None):
+        """
+        @param clock: the clock of the process at the time of gen if None
+        """
+        self.clock = clock
+        self._last = 0
+
     def gen(self):
-        return str(int(time.time()*10**6))
+        # microseconds of the clock, ids generated within the same microsecond, which is common under a simulated
+        # clock, are bumped so that they stay unique
+        self._last = max(self._last + 1, int((self.clock or get_clock()).time() * 10**6))
+        return str(self._last)
 
 
 class BinanceOrderIDGenerator(OrderIDGenerator):
@@ -1,20 +1,65 @@
 import os
-from typing import Optional
+from typing import Dict, Optional
+
+from mmm.config import settings
+from mmm.exceptions import ConfigureError
 
 
 class Credential:
-    def __init__(self, api_key: str, secret_key: str, phrase: Optional[str] = None):
+    def __init__(self, api_key: str, secret_key: str, phrase: Optional[str] = None, account: str = 'default'):
         self.api_key = api_key
         self.secret_key = secret_key
         self.phrase = phrase
+        self.account = account
 
     @classmethod
-    def load_from_env(cls):
-        api_key = os.environ.get('API_KEY', None)
+    def load_from_env(cls, prefix: str = '', account: Optional[str] = None):
+        """
+        :param prefix: prefix of the environment variables, e.g. 'MAIN_' reads MAIN_API_KEY, MAIN_SECRET_KEY and
+            MAIN_PHRASE
+        :param account: account of the credential, environment variable ACCOUNT or 'default' if None
+        """
+        api_key = os.environ.get(f'{prefix}API_KEY', None)
         if api_key is None:
-            raise RuntimeError('environment variable API_KEY must be configured.')
-        secret_key = os.environ.get('SECRET_KEY', None)
+            raise RuntimeError(f'environment variable {prefix}API_KEY must be configured.')
+        secret_key = os.environ.get(f'{prefix}SECRET_KEY', None)
         if secret_key is None:
-            raise RuntimeError('environment variable SECRET_KEY must be configured.')
-        phrase = os.environ.get('PHRASE', None)
-        return cls(api_key, secret_key, phrase)
+            raise RuntimeError(f'environment variable {prefix}SECRET_KEY must be configured.')
+        phrase = os.environ.get(f'{prefix}PHRASE', None)
+        if account is None:
+            account = os.environ.get(f'{prefix}ACCOUNT', 'default')
+        return cls(api_key, secret_key, phrase, account)
+
+
+class CredentialStore:
+    """
+    credentials of the process by account, so that messages only need to carry the account name. strategies add
+    their credential when they are created, the order executor also loads settings.CREDENTIALS.
+    """
+
+    def __init__(self):
+        self._credentials: Dict[str, "Credential"] = {}
+
+    def add(self, credential: "Credential"):
+        registered = self._credentials.get(credential.account)
+        keys = (credential.api_key, credential.secret_key, credential.phrase)
+        if registered is not None and (registered.api_key, registered.secret_key, registered.phrase) != keys:
+            raise ConfigureError(f'account {credential.account} is already registered with other keys, '
+                                 f'every credential needs an account of its own.')
+        self._credentials[credential.account] = credential
+
+    def load_settings(self):
+        """add the accounts of settings.CREDENTIALS, account -> prefix of its environment variables."""
+        for account, prefix in settings.CREDENTIALS.items():
+            self.add(Credential.load_from_env(prefix, account))
+
+    def get(self, account: str) -> "Credential":
+        if account not in self._credentials:
+            credential = Credential.load_from_env()
+            if credential.account != account:
+                raise RuntimeError(f'credential of account {account} is not configured.')
+            self.add(credential)
+        return self._credentials[account]
+
+
+credential_store = CredentialStore()
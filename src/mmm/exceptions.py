@@ -23,4 +23,12 @@ class EventSourceNotFoundError(Exception):
 
 
 class CollectionError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class BookOutOfSyncError(CollectionError):
+    pass
+
+
+class SegmentError(Exception):
+    pass
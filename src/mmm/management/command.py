@@ -14,16 +14,21 @@ def cli(): ...
 
 
 @click.command()
-def start_order_executor():
+@click.option('--running-model', default='distributed',
+              type=click.Choice(['distributed', 'shared_memory'], case_sensitive=False))
+def start_order_executor(running_model='distributed'):
     from mmm.core.order.executor import OrderExecutor
 
-    settings.MODEL = RunningModel.DISTRIBUTED
+    settings.MODEL = RunningModel[running_model.upper()]
     asyncio.run(OrderExecutor().run_executor())
 
 
 @click.command()
-def start_data_source():
-    settings.MODEL = RunningModel.DISTRIBUTED
+@click.option('--running-model', default='distributed',
+              type=click.Choice(['distributed', 'shared_memory'], case_sensitive=False))
+def start_data_source(running_model='distributed'):
+    settings.MODEL = RunningModel[running_model.upper()]
+
     async def main():
         tasks = _start_data_source()
         await asyncio.gather(*tasks)
@@ -39,11 +44,15 @@ def _start_data_source():
     for app in apps:
         subscriptions = app.get_subscriptions()
         for sub in subscriptions:
-            exchange_sub_conf[sub.get_exchange()].append(sub)
+            if sub not in exchange_sub_conf[sub.get_exchange()]:
+                exchange_sub_conf[sub.get_exchange()].append(sub)
     tasks = []
     for exchange, subs in exchange_sub_conf.items():
         if exchange == Exchange.OKEX:
-            tasks.append(asyncio.create_task(OkexWsDatasource().subscribe(subs), name='task.okex_datasource'))
+            conf = settings.OKEX_DATASOURCE
+            datasource = OkexWsDatasource(uris=conf['URIS'], redundancy=conf['REDUNDANCY'],
+                                          dedup_window=conf['DEDUP_WINDOW'])
+            tasks.append(asyncio.create_task(datasource.subscribe(subs), name='task.okex_datasource'))
         elif exchange == Exchange.BINANCE:
             tasks.append(asyncio.create_task(BinanceWsDatasource().subscribe(subs), name='task.binance_datasource'))
     return tasks
@@ -63,7 +72,7 @@ def _prepare_strategy_tasks():
 @click.command()
 @click.option('--bot-id', default=None, help='bot id of strategy. if None, it will start all bots.')
 @click.option('--running-model', default='all_alone',
-              type=click.Choice(['all_alone', 'distributed'], case_sensitive=False))
+              type=click.Choice(['all_alone', 'distributed', 'shared_memory'], case_sensitive=False))
 def start_strategy(bot_id, running_model='all_alone'):
     from mmm.core.strategy import StrategyRunner
 
@@ -80,13 +89,13 @@ def start_strategy(bot_id, running_model='all_alone'):
 
         asyncio.run(main())
     else:
-        settings.MODEL = RunningModel.DISTRIBUTED
+        settings.MODEL = RunningModel[running_model.upper()]
         asyncio.run(StrategyRunner(apps).run(bot_id))
 
 
 @click.command()
 @click.option('--running-model', default='all_alone',
-              type=click.Choice(['all_alone', 'distributed'], case_sensitive=False))
+              type=click.Choice(['all_alone', 'distributed', 'shared_memory'], case_sensitive=False))
 def strategy_listening(running_model='all_alone'):
     from mmm.config.tools import load_strategy_app
     from mmm.core.strategy import StrategyRunner
@@ -103,10 +112,150 @@ def strategy_listening(running_model='all_alone'):
 
         asyncio.run(main())
     else:
-        settings.MODEL = RunningModel.DISTRIBUTED
+        settings.MODEL = RunningModel[running_model.upper()]
         asyncio.run(StrategyRunner(apps).listening_event())
 
 
+@click.command()
+@click.option('--running-model', default='all_alone',
+              type=click.Choice(['all_alone', 'distributed', 'shared_memory'], case_sensitive=False))
+def record(running_model='all_alone'):
+    """record the market data subscribed by the strategies into segments of RECORDER['ROOT']"""
+    from mmm.core.recorder import TickRecorder
+
+    settings.MODEL = RunningModel[running_model.upper()]
+    apps = load_strategy_app(settings.STRATEGIES)
+    conf = settings.RECORDER
+    subscriptions = [sub for app in apps for sub in app.get_subscriptions()]
+
+    async def main():
+        recorder = TickRecorder(subscriptions, conf['ROOT'], partition=conf['PARTITION'],
+                                block_rows=conf['BLOCK_ROWS'], flush_interval=conf['FLUSH_INTERVAL'],
+                                compress_level=conf['COMPRESS_LEVEL'], book_depth=conf['BOOK_DEPTH'])
+        tasks = [asyncio.create_task(recorder.run(), name='task.tick_recorder')]
+        if settings.MODEL == RunningModel.ALL_ALONE:
+            tasks.extend(_start_data_source())
+        await asyncio.gather(*tasks)
+    asyncio.run(main())
+
+
+@click.command()
+@click.option('--bot-id', default=None, help='bot id of strategy. if None, it will start all bots.')
+@click.option('--root', default=None, help="root of the recorded segments, default RECORDER['ROOT']")
+@click.option('--start', default=None, type=int, help='first ts in milliseconds')
+@click.option('--end', default=None, type=int, help='last ts in milliseconds, excluded')
+@click.option('--speed', default=0.0, type=float, help='1 replays at wall clock speed, 0 as fast as possible')
+def replay(bot_id, root=None, start=None, end=None, speed=0.0):
+    """run strategies on recorded market data, orders are not sent"""
+    from mmm.core.datasource.replay import ReplayDatasource
+    from mmm.core.hub.inner_event_hub.event import BotControlEvent, Command
+    from mmm.core.strategy import StrategyRunner
+
+    settings.MODEL = RunningModel.ALL_ALONE
+    apps = [each for each in load_strategy_app(settings.STRATEGIES) if bot_id is None or each.bot_id == bot_id]
+    subscriptions = [sub for app in apps for sub in app.get_subscriptions()]
+
+    async def main():
+        datasource = ReplayDatasource(root or settings.RECORDER['ROOT'], start, end, speed or None)
+        handler = StrategyRunner(apps).bot_control_event_handler
+        async def subscribed():
+            while not all(datasource.ds_msg_hub.consumer_count(sub) for sub in subscriptions):
+                await asyncio.sleep(0.01)  # the bots subscribe once their tasks run
+
+        await handler.handel(BotControlEvent(Command.START_ALL))
+        try:
+            await asyncio.wait_for(subscribed(), 10)
+        except asyncio.TimeoutError:
+            raise click.ClickException('the bots did not subscribe within 10s, see the log for their errors.')
+        await datasource.subscribe(subscriptions)  # returns once the hub is flushed
+        for bot_id, task in list(handler.bot_tasks.items()):
+            # the last messages are handled, unless the bot failed
+            joined = asyncio.ensure_future(handler.bot_registry.get_bot(bot_id).join())
+            await asyncio.wait((joined, task), return_when=asyncio.FIRST_COMPLETED)
+            joined.cancel()
+        await handler.handel(BotControlEvent(Command.STOP_ALL))
+        click.echo(f'{datasource.published} messages replayed, max lag {datasource.max_lag:.3f}s.')
+    asyncio.run(main())
+
+
+@click.command()
+@click.option('--bot-id', default=None, help='bot id of strategy. if None, all strategies are tested.')
+@click.option('--root', default=None, help="root of the recorded segments, default RECORDER['ROOT']")
+@click.option('--start', default=None, type=int, help='first ts in milliseconds')
+@click.option('--end', default=None, type=int, help='last ts in milliseconds, excluded')
+@click.option('--latency', default=0.0, type=float, help='milliseconds before an order reaches the exchange')
+@click.option('--maker-fee', default=0.0002, type=float)
+@click.option('--taker-fee', default=0.0005, type=float)
+@click.option('--slippage', default=0.0, type=float, help='basis points a taker fill is moved against the order')
+def backtest(bot_id, root=None, start=None, end=None, latency=0.0, maker_fee=0.0002, taker_fee=0.0005,
+             slippage=0.0):
+    """run strategies on recorded market data with simulated orders"""
+    from mmm.core.backtest import Backtest, SimulatedOrderHandler
+
+    apps = [each for each in load_strategy_app(settings.STRATEGIES) if bot_id is None or each.bot_id == bot_id]
+    tbl = PrettyTable()
+    tbl.field_names = ["Strategy", "bot id", "orders", "fills", "pnl"]
+    for app in apps:
+        handler = SimulatedOrderHandler(latency=latency, maker_fee=maker_fee, taker_fee=taker_fee, slippage=slippage)
+        result = asyncio.run(Backtest(app, root or settings.RECORDER['ROOT'], start, end, handler).run())
+        tbl.add_row([app.strategy_name, app.bot_id, len(result.orders), len(result.fills), f'{result.pnl:.8f}'])
+    click.echo(tbl)
+
+
+@click.command()
+@click.option('--strategy', required=True, help='module:StrategyClass to sweep')
+@click.option('--param', '-p', multiple=True, help='name=value,value,... values are python literals or strings')
+@click.option('--root', default=None, help="root of the recorded segments, default RECORDER['ROOT']")
+@click.option('--start', default=None, type=int, help='first ts in milliseconds')
+@click.option('--end', default=None, type=int, help='last ts in milliseconds, excluded')
+@click.option('--workers', default=None, type=int, help='processes, the number of cpus by default')
+@click.option('--latency', default=0.0, type=float, help='milliseconds before an order reaches the exchange')
+@click.option('--maker-fee', default=0.0002, type=float)
+@click.option('--taker-fee', default=0.0005, type=float)
+@click.option('--slippage', default=0.0, type=float, help='basis points a taker fill is moved against the order')
+def sweep(strategy, param, root=None, start=None, end=None, workers=None, latency=0.0, maker_fee=0.0002,
+          taker_fee=0.0005, slippage=0.0):
+    """backtest a strategy class for every combination of params in parallel"""
+    import ast
+    from mmm.core.backtest import Sweep
+
+    def literal(value):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+
+    grid = {}
+    for each in param:
+        name, _, values = each.partition('=')
+        grid[name.strip()] = [literal(value.strip()) for value in values.split(',')]
+    handler_kwargs = {'latency': latency, 'maker_fee': maker_fee, 'taker_fee': taker_fee, 'slippage': slippage}
+    result = Sweep(load_strategy_app([strategy])[0], grid, root or settings.RECORDER['ROOT'], start, end,
+                   handler_kwargs, workers=workers).run()
+    tbl = PrettyTable()
+    tbl.field_names = [*result.names, "orders", "fills", "fees", "pnl", "max drawdown"]
+    for row in result.rows:
+        tbl.add_row([*[row['params'][name] for name in result.names], row['orders'], row['fills'],
+                     f"{row['fees']:.8f}", f"{row['pnl']:.8f}", f"{row['max_drawdown']:.8f}"])
+    click.echo(tbl)
+    click.echo(f'{len(result.rows)} runs in {result.elapsed:.2f}s')
+
+
+@click.command()
+def clean_shared_memory():
+    """unlink the rings of RunningModel.SHARED_MEMORY, run it once every process using them has stopped"""
+    from mmm.core.hub.shm import ShmRing
+
+    for conf in (settings.SHM_DS_MSG_HUB, settings.SHM_INNER_EVENT_HUB):
+        try:
+            ring = ShmRing(conf['NAME'], conf['SIZE'])
+        except FileNotFoundError:
+            continue
+        ring.close()
+        ring.unlink()
+        click.echo(f"{conf['NAME']} unlinked.")
+
+
 @click.command()
 def list_strategy():
     from mmm.config.tools import load_strategy_app
@@ -143,6 +292,11 @@ cli.add_command(start_order_executor)
 cli.add_command(start_data_source)
 cli.add_command(strategy_listening)
 cli.add_command(start_strategy)
+cli.add_command(record)
+cli.add_command(replay)
+cli.add_command(backtest)
+cli.add_command(sweep)
+cli.add_command(clean_shared_memory)
 cli.add_command(list_strategy)
 cli.add_command(start_dashboard)
 cli.add_command(init_database)
@@ -0,0 +1,164 @@
+"""
+numbers of market data, orders and positions.
+
+in NumericMode.DECIMAL prices and sizes are Decimal, in NumericMode.FIXED they are ints scaled by the price and size
+decimals of the instrument (INSTRUMENT_PRECISION), values such as notional are scaled by VALUE_DECIMALS.
+"""
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple, Union
+
+from mmm.config import settings
+from mmm.exceptions import ConfigureError
+from mmm.project_types import NumericMode
+
+
+Number = Union[int, Decimal]
+
+_mode = None
+_precision: Dict[str, Tuple[int, int]] = {}
+_value_decimals = None
+
+
+def get_mode() -> "NumericMode":
+    global _mode
+    if _mode is None:
+        try:
+            _mode = settings.NUMERIC_MODE
+        except ConfigureError:
+            _mode = NumericMode.DECIMAL
+    return _mode
+
+
+def set_mode(mode: "NumericMode"):
+    global _mode
+    _mode = mode
+
+
+def get_precision(inst_id: str) -> Tuple[int, int]:
+    """
+    :return: (price decimals, size decimals) of the instrument
+    """
+    if inst_id not in _precision:
+        try:
+            _precision[inst_id] = tuple(settings.INSTRUMENT_PRECISION[inst_id])
+        except KeyError:
+            raise ConfigureError(f'INSTRUMENT_PRECISION of {inst_id} is required by NumericMode.FIXED.')
+    return _precision[inst_id]
+
+
+def set_precision(inst_id: str, price_decimals: int, size_decimals: int):
+    _precision[inst_id] = (price_decimals, size_decimals)
+
+
+def get_value_decimals() -> int:
+    global _value_decimals
+    if _value_decimals is None:
+        _value_decimals = settings.VALUE_DECIMALS
+    return _value_decimals
+
+
+def to_fixed(value: Union[str, Decimal, int], decimals: int) -> int:
+    """exact conversion to an int scaled by 10**decimals, raise ValueError if it is not representable."""
+    if isinstance(value, int):
+        return value * 10 ** decimals
+    s = str(value)
+    if 'e' in s or 'E' in s:
+        scaled = Decimal(s).scaleb(decimals)
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f'{value} has more than {decimals} decimals.')
+        return int(scaled)
+    dot = s.find('.')
+    if dot < 0:
+        return int(s) * 10 ** decimals
+    digits = int(s[:dot] + s[dot + 1:])
+    shift = decimals - (len(s) - dot - 1)
+    if shift >= 0:
+        return digits * 10 ** shift
+    q, r = divmod(digits, 10 ** -shift)
+    if r:
+        raise ValueError(f'{value} has more than {decimals} decimals.')
+    return q
+
+
+def to_str(value: int, decimals: int) -> str:
+    """exact string of a scaled int, e.g. to_str(4221990, 2) == '42219.90'"""
+    if decimals == 0:
+        return str(value)
+    q, r = divmod(abs(value), 10 ** decimals)
+    return f"{'-' if value < 0 else ''}{q}.{r:0{decimals}d}"
+
+
+def _div_round(n: int, d: int) -> int:
+    """n / d rounded half to even."""
+    q, r = divmod(n, d)
+    if 2 * r > d or (2 * r == d and q % 2):
+        q += 1
+    return q
+
+
+def rescale(value: int, from_decimals: int, to_decimals: int) -> int:
+    if to_decimals >= from_decimals:
+        return value * 10 ** (to_decimals - from_decimals)
+    return _div_round(value, 10 ** (from_decimals - to_decimals))
+
+
+def fmul(a: int, a_decimals: int, b: int, b_decimals: int, decimals: int) -> int:
+    """product of two scaled ints, scaled by 10**decimals."""
+    return rescale(a * b, a_decimals + b_decimals, decimals)
+
+
+def fdiv(a: int, a_decimals: int, b: int, b_decimals: int, decimals: int) -> int:
+    """quotient of two scaled ints, scaled by 10**decimals."""
+    shift = decimals - a_decimals + b_decimals
+    if shift >= 0:
+        return _div_round(a * 10 ** shift, b)
+    return _div_round(a, b * 10 ** -shift)
+
+
+def parse_price(raw: str, inst_id: str) -> "Number":
+    if get_mode() is NumericMode.FIXED:
+        return to_fixed(raw, get_precision(inst_id)[0])
+    return Decimal(raw)
+
+
+def parse_size(raw: str, inst_id: str) -> "Number":
+    if get_mode() is NumericMode.FIXED:
+        return to_fixed(raw, get_precision(inst_id)[1])
+    return Decimal(raw)
+
+
+def format_price(value: "Number", inst_id: str) -> str:
+    """price string that is sent to the exchange."""
+    if get_mode() is NumericMode.FIXED:
+        return to_str(value, get_precision(inst_id)[0])
+    return str(value)
+
+
+def format_size(value: "Number", inst_id: str) -> str:
+    """size string that is sent to the exchange."""
+    if get_mode() is NumericMode.FIXED:
+        return to_str(value, get_precision(inst_id)[1])
+    return str(value)
+
+
+def format_order_params(params: Dict, inst_id: str, prices: Iterable[str], sizes: Iterable[str]) -> Dict:
+    """
+    copy of order params whose numeric prices and sizes are converted to the strings sent to the exchange, ints are
+    scaled in NumericMode.FIXED. strings are kept as they are.
+    """
+    rv = dict(params)
+    for keys, fmt in ((prices, format_price), (sizes, format_size)):
+        for key in keys:
+            value = rv.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, Decimal)):
+                continue
+            rv[key] = fmt(value, inst_id) if isinstance(value, int) else str(value)
+    return rv
+
+
+def notional(price: "Number", size: "Number", inst_id: str) -> "Number":
+    """price * size, scaled by VALUE_DECIMALS in NumericMode.FIXED."""
+    if get_mode() is NumericMode.FIXED:
+        price_decimals, size_decimals = get_precision(inst_id)
+        return fmul(price, price_decimals, size, size_decimals, get_value_decimals())
+    return price * size
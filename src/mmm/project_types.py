@@ -1,18 +1,24 @@
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
-from typing import Optional
+from typing import Optional, Union
 
 
 class RunningModel(Enum):
     ALL_ALONE = 1
     DISTRIBUTED = 2
+    SHARED_MEMORY = 3  # processes on one host exchange messages through shared memory ring buffers
+
+
+class NumericMode(Enum):
+    DECIMAL = 1
+    FIXED = 2  # ints scaled by the precision of the instrument, see mmm.numeric
 
 
 @dataclass
 class Asset:
     inst_id: str
-    amount: Decimal
+    amount: Union[Decimal, int]
 
 
 # class OrderType(Enum):
@@ -1,13 +1,115 @@
 import logging
+from bisect import bisect_left, insort
+from collections.abc import Sequence
 from operator import itemgetter
 import asyncio
 import time
 from typing import Optional, Dict, Callable
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 from .streams import BinanceSocketManager
 from .threaded_stream import ThreadedApiManager
 
 
+class DepthView(Sequence):
+    """Read only view of the best levels of a :class:`DepthSide`, levels are read from the side on access and
+    are not copied, so the view follows later updates.
+
+    """
+    __slots__ = ('_side', '_limit')
+
+    def __init__(self, side, limit=None):
+        self._side = side
+        self._limit = limit
+
+    def __len__(self):
+        n = len(self._side)
+        return n if self._limit is None else min(n, self._limit)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('depth view index out of range')
+        return self._side.level(index)
+
+
+class DepthSide(object):
+    """Price levels of one side of a depth cache, a dict of the quantities by price and a list of the prices
+    sorted from the best one.
+
+    The list holds negated prices for bids so both sides are ascending. Changing the quantity of a level is a dict
+    update, only adding or removing a level bisects the list and shifts the levels after it, which is O(n) but
+    one memmove of pointers.
+
+    """
+    __slots__ = ('_reverse', '_keys', '_quantities')
+
+    def __init__(self, reverse=False):
+        """
+        :param reverse: True for bids, the highest price is the best
+        :type reverse: bool
+
+        """
+        self._reverse = reverse
+        self._keys = []
+        self._quantities = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, price):
+        return price in self._quantities
+
+    def clear(self):
+        self._keys.clear()
+        self._quantities.clear()
+
+    def set(self, price, quantity):
+        """Set the quantity of a price level, the level is removed when quantity is 0"""
+        quantities = self._quantities
+        if not quantity:
+            if quantities.pop(price, None) is not None:
+                del self._keys[bisect_left(self._keys, -price if self._reverse else price)]
+        else:
+            if price not in quantities:
+                insort(self._keys, -price if self._reverse else price)
+            quantities[price] = quantity
+
+    def get(self, price):
+        """Get the quantity at a price, None if there is no such level"""
+        return self._quantities.get(price)
+
+    def prices(self, limit=None):
+        """Prices of the best `limit` levels, all levels if None"""
+        keys = self._keys if limit is None else self._keys[:limit]
+        return [-key for key in keys] if self._reverse else list(keys)
+
+    def level(self, index):
+        key = self._keys[index]
+        price = -key if self._reverse else key
+        return [price, self._quantities[price]]
+
+    def best(self):
+        return self.level(0) if self._keys else None
+
+    def view(self, limit=None):
+        return DepthView(self, limit)
+
+    def to_list(self):
+        quantities = self._quantities
+        if self._reverse:
+            return [[-key, quantities[-key]] for key in self._keys]
+        return [[key, quantities[key]] for key in self._keys]
+
+
 class DepthCache(object):
 
     def __init__(self, symbol, conv_type=float):
@@ -20,33 +122,43 @@ class DepthCache(object):
 
         """
         self.symbol = symbol
-        self._bids = {}
-        self._asks = {}
+        self._bids = DepthSide(reverse=True)
+        self._asks = DepthSide()
         self.update_time = None
         self.conv_type = conv_type
         self._log = logging.getLogger(__name__)
 
     def add_bid(self, bid):
-        """Add a bid to the cache
+        """Add a bid to the cache, a quantity of 0 removes the level
 
         :param bid:
         :return:
 
         """
-        self._bids[bid[0]] = self.conv_type(bid[1])
-        if bid[1] == "0.00000000":
-            del self._bids[bid[0]]
+        self._bids.set(self.conv_type(bid[0]), self.conv_type(bid[1]))
 
     def add_ask(self, ask):
-        """Add an ask to the cache
+        """Add an ask to the cache, a quantity of 0 removes the level
 
         :param ask:
         :return:
 
         """
-        self._asks[ask[0]] = self.conv_type(ask[1])
-        if ask[1] == "0.00000000":
-            del self._asks[ask[0]]
+        self._asks.set(self.conv_type(ask[0]), self.conv_type(ask[1]))
+
+    def replace(self, bids, asks):
+        """Replace the cache with a snapshot of a partial book depth stream
+
+        :param bids: bids sorted from the best price
+        :param asks: asks sorted from the best price
+
+        """
+        self._bids.clear()
+        self._asks.clear()
+        for bid in bids:
+            self.add_bid(bid)
+        for ask in asks:
+            self.add_ask(ask)
 
     def get_bids(self):
         """Get the current bids
@@ -79,7 +191,7 @@ class DepthCache(object):
             ]
 
         """
-        return DepthCache.sort_depth(self._bids, reverse=True, conv_type=self.conv_type)
+        return self._bids.to_list()
 
     def get_asks(self):
         """Get the current asks
@@ -112,7 +224,69 @@ class DepthCache(object):
             ]
 
         """
-        return DepthCache.sort_depth(self._asks, reverse=False, conv_type=self.conv_type)
+        return self._asks.to_list()
+
+    def get_top_bids(self, limit):
+        """Get a view of the best bids, levels are not copied
+
+        :param limit: number of levels
+        :return: DepthView of [price, quantity]
+
+        """
+        return self._bids.view(limit)
+
+    def get_top_asks(self, limit):
+        """Get a view of the best asks, levels are not copied
+
+        :param limit: number of levels
+        :return: DepthView of [price, quantity]
+
+        """
+        return self._asks.view(limit)
+
+    def get_best_bid(self):
+        """Get the best bid, None if there are no bids
+
+        :return: [price, quantity]
+
+        """
+        return self._bids.best()
+
+    def get_best_ask(self):
+        """Get the best ask, None if there are no asks
+
+        :return: [price, quantity]
+
+        """
+        return self._asks.best()
+
+    def get_quantity(self, price):
+        """Get the quantity resting at a price on either side, None if there is no such level
+
+        :param price: price as conv_type
+
+        """
+        quantity = self._bids.get(price)
+        return self._asks.get(price) if quantity is None else quantity
+
+    def to_numpy(self, limit=None):
+        """Export a snapshot of the cache, requires numpy
+
+        :param limit: Optional number of levels of each side
+        :return: (bids, asks), float64 arrays of shape (n, 2) with price and quantity columns
+
+        """
+        if np is None:
+            raise ImportError('numpy is required by DepthCache.to_numpy')
+        rv = []
+        for side in (self._bids, self._asks):
+            n = len(side) if limit is None else min(limit, len(side))
+            prices = side.prices(n)
+            array = np.empty((n, 2), dtype=np.float64)
+            array[:, 0] = prices
+            array[:, 1] = [side.get(price) for price in prices]
+            rv.append(array)
+        return tuple(rv)
 
     @staticmethod
     def sort_depth(vals, reverse=False, conv_type=float):
@@ -158,7 +332,7 @@ class BaseDepthCacheManager:
         self._symbol = symbol
         self._limit = limit
         self._last_update_id = None
-        self._bm = bm or BinanceSocketManager(self._client, self._loop)
+        self._bm = bm or BinanceSocketManager(self._client)
         self._refresh_interval = refresh_interval or self.DEFAULT_REFRESH
         self._conn_key = None
         self._conv_type = conv_type
@@ -321,10 +495,6 @@ class DepthCacheManager(BaseDepthCacheManager):
 
         # process bid and asks from the order book
         self._apply_orders(res)
-        for bid in res['bids']:
-            self._depth_cache.add_bid(bid)
-        for ask in res['asks']:
-            self._depth_cache.add_ask(ask)
 
         # set first update id
         self._last_update_id = res['lastUpdateId']
@@ -397,8 +567,8 @@ class FuturesDepthCacheManager(BaseDepthCacheManager):
         return await super()._process_depth_message(msg)
 
     def _apply_orders(self, msg):
-        self._depth_cache._bids = msg.get('b', [])
-        self._depth_cache._asks = msg.get('a', [])
+        # partial book depth streams push the whole top of the book
+        self._depth_cache.replace(msg.get('b', []), msg.get('a', []))
 
         # keeping update time
         self._depth_cache.update_time = msg.get('E') or msg.get('lastUpdateId')
@@ -419,19 +589,19 @@ class ThreadedDepthCacheManager(ThreadedApiManager):
     def __init__(
         self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
         requests_params: Dict[str, str] = None, tld: str = 'com',
-        testnet: bool = False
+        testnet: bool = False, workers: int = 0
     ):
-        super().__init__(api_key, api_secret, requests_params, tld, testnet)
+        super().__init__(api_key, api_secret, requests_params, tld, testnet, workers)
 
     def _start_depth_cache(
         self, dcm_class, callback: Callable, symbol: str,
         refresh_interval=None, bm=None, limit=10, conv_type=float, **kwargs
     ) -> str:
 
-        while not self._client:
-            time.sleep(0.01)
-            
-        dcm = dcm_class(
+        self._ready.wait()
+
+        dcm = self._call_in_loop(
+            dcm_class,
             client=self._client,
             symbol=symbol,
             loop=self._loop,
@@ -443,7 +613,7 @@ class ThreadedDepthCacheManager(ThreadedApiManager):
         )
         path = symbol.lower() + '@depth' + str(limit)
         self._socket_running[path] = True
-        self._loop.call_soon(asyncio.create_task, self.start_listener(dcm, path, callback))
+        self._loop.call_soon_threadsafe(asyncio.create_task, self.start_listener(dcm, path, callback))
         return path
 
     def start_depth_cache(
@@ -2,7 +2,6 @@ import asyncio
 import gzip
 import json
 import logging
-import time
 from asyncio import sleep
 from enum import Enum
 from random import random
@@ -17,6 +16,8 @@ from .enums import FuturesType
 from .exceptions import BinanceWebsocketUnableToConnect
 from .enums import ContractType
 from .threaded_stream import ThreadedApiManager
+from mmm.core.datasource.watchdog import Watched, get_watchdog
+from mmm.core.hub.queue import OverflowPolicy, SubQueue
 
 KEEPALIVE_TIMEOUT = 5 * 60  # 5 minutes
 
@@ -36,17 +37,28 @@ class BinanceSocketType(str, Enum):
     ACCOUNT = 'Account'
 
 
-class ReconnectingWebsocket:
+class ReconnectingWebsocket(Watched):
     MAX_RECONNECTS = 5
     MAX_RECONNECT_SECONDS = 60
     MIN_RECONNECT_WAIT = 0.1
     TIMEOUT = 10
     NO_MESSAGE_RECONNECT_TIMEOUT = 60
-    MAX_QUEUE_SIZE = 100
+    MAX_QUEUE_SIZE = 10000
+    OVERFLOW = OverflowPolicy.BLOCK
 
     def __init__(
-        self, url: str, path: Optional[str] = None, prefix: str = 'ws/', is_binary: bool = False, exit_coro=None
+        self, url: str, path: Optional[str] = None, prefix: str = 'ws/', is_binary: bool = False, exit_coro=None,
+        max_queue_size: Optional[int] = None, overflow: Optional[OverflowPolicy] = None
     ):
+        """
+        :param max_queue_size: Optional number of messages buffered for the consumer, default MAX_QUEUE_SIZE.
+        :param overflow: Optional policy when the buffer is full, default OVERFLOW. BLOCK stops reading until the
+            consumer catches up, DROP_OLDEST drops the oldest buffered message and counts it in `dropped`.
+
+        """
+        overflow = overflow or self.OVERFLOW
+        if overflow is OverflowPolicy.CONFLATE:
+            raise ValueError('raw websocket messages can not be conflated')
         self._loop = asyncio.get_running_loop()
         self._log = logging.getLogger(__name__)
         self._path = path
@@ -59,8 +71,17 @@ class ReconnectingWebsocket:
         self._socket = None
         self.ws: Optional[ws.WebSocketClientProtocol] = None
         self.ws_state = WSListenerState.INITIALISING
-        self._queue = asyncio.Queue()
+        self._overflow = overflow
+        self._queue = SubQueue(max_queue_size or self.MAX_QUEUE_SIZE, overflow)
         self._handle_read_loop = None
+        self._pending = None
+        # no message for TIMEOUT seconds sends a ping, no answer for another TIMEOUT seconds reconnects
+        self.idle_timeout = self.pong_timeout = self.TIMEOUT
+
+    @property
+    def dropped(self) -> int:
+        """messages dropped by OverflowPolicy.DROP_OLDEST"""
+        return self._queue.dropped
 
     async def __aenter__(self):
         await self.connect()
@@ -70,6 +91,7 @@ class ReconnectingWebsocket:
         if self._exit_coro:
             await self._exit_coro(self._path)
         self.ws_state = WSListenerState.EXITING
+        get_watchdog().unwatch(self)
         if self.ws:
             self.ws.fail_connection()
         if self._conn and hasattr(self._conn, 'protocol'):
@@ -91,6 +113,9 @@ class ReconnectingWebsocket:
             await self._reconnect()
             return
         self._reconnects = 0
+        watchdog = get_watchdog()
+        self.last_received_at, self.ping_sent_at = watchdog.clock.monotonic(), None
+        watchdog.watch(self)
         await self._after_connect()
         # To manage the "cannot call recv while another coroutine is already waiting for the next message"
         if not self._handle_read_loop:
@@ -137,21 +162,11 @@ class ReconnectingWebsocket:
                     elif self.ws.state == ws.protocol.State.CLOSED:
                         await self._reconnect()
                     elif self.ws_state == WSListenerState.STREAMING:
-                        res = await asyncio.wait_for(self.ws.recv(), timeout=self.TIMEOUT)
+                        res = await self.ws.recv()
+                        self.last_received_at = get_watchdog().clock.monotonic()
                         res = self._handle_message(res)
                         if res:
-                            if self._queue.qsize() < self.MAX_QUEUE_SIZE:
-                                await self._queue.put(res)
-                            else:
-                                self._log.debug(f"Queue overflow {self.MAX_QUEUE_SIZE}. Message not filled")
-                                await self._queue.put({
-                                    'e': 'error',
-                                    'm': 'Queue overflow. Message not filled'
-                                })
-                                raise BinanceWebsocketUnableToConnect
-                except asyncio.TimeoutError:
-                    self._log.debug(f"no message in {self.TIMEOUT} seconds")
-                    # _no_message_received_reconnect
+                            await self._put(res)
                 except asyncio.CancelledError as e:
                     self._log.debug(f"cancelled error {e}")
                     break
@@ -184,20 +199,50 @@ class ReconnectingWebsocket:
         else:
             self._log.error(f'Max reconnections {self.MAX_RECONNECTS} reached:')
             # Signal the error
-            await self._queue.put({
+            await self._put({
                 'e': 'error',
                 'm': 'Max reconnect retries reached'
             })
             raise BinanceWebsocketUnableToConnect
 
+    async def _put(self, msg):
+        if self._overflow is OverflowPolicy.BLOCK:
+            await self._queue.put(msg)
+        else:
+            self._queue.put_nowait(msg)
+
     async def recv(self):
-        res = None
-        while not res:
-            try:
-                res = await asyncio.wait_for(self._queue.get(), timeout=self.TIMEOUT)
-            except asyncio.TimeoutError:
-                self._log.debug(f"no message in {self.TIMEOUT} seconds")
-        return res
+        return await self._queue.get()
+
+    async def recv_batch(self, max_size: int = 1000) -> List[Any]:
+        """Wait for a message and return it with the messages buffered behind it
+
+        :param max_size: Optional maximum number of messages returned
+
+        """
+        rv = [await self._queue.get()]
+        queue = self._queue
+        while len(rv) < max_size and not queue.empty():
+            rv.append(queue.get_nowait())
+        return rv
+
+    def on_idle(self):
+        self._pending = asyncio.ensure_future(self._ping())
+
+    async def _ping(self):
+        try:
+            pong = await self.ws.ping()
+            await pong
+        except Exception as e:
+            self._log.debug(f"ping error ({e})")
+        else:
+            self.ping_sent_at = None
+
+    def on_dead(self):
+        self._log.debug(f'no message in {self.TIMEOUT * 2} seconds')
+        self._no_message_received_reconnect()
+        if self.ws:
+            self.ws.fail_connection()
 
     async def _wait_for_reconnect(self):
         while self.ws_state != WSListenerState.STREAMING and self.ws_state != WSListenerState.EXITING:
@@ -208,6 +253,7 @@ class ReconnectingWebsocket:
         return round(random() * min(self.MAX_RECONNECT_SECONDS, expo - 1) + 1)
 
     async def before_reconnect(self):
+        get_watchdog().unwatch(self)
         if self.ws:
             await self._conn.__aexit__(None, None, None)
             self.ws = None
@@ -1180,9 +1226,9 @@ class ThreadedWebsocketManager(ThreadedApiManager):
     def __init__(
         self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
         requests_params: Dict[str, str] = None, tld: str = 'com',
-        testnet: bool = False
+        testnet: bool = False, workers: int = 0
     ):
-        super().__init__(api_key, api_secret, requests_params, tld, testnet)
+        super().__init__(api_key, api_secret, requests_params, tld, testnet, workers)
         self._bsm: Optional[BinanceSocketManager] = None
 
     async def _before_socket_listener_start(self):
@@ -1192,9 +1238,8 @@ class ThreadedWebsocketManager(ThreadedApiManager):
     def _start_async_socket(
         self, callback: Callable, socket_name: str, params: Dict[str, Any], path: Optional[str] = None
     ) -> str:
-        while not self._bsm:
-            time.sleep(0.1)
-        socket = getattr(self._bsm, socket_name)(**params)
+        self._ready.wait()
+        socket = self._call_in_loop(getattr(self._bsm, socket_name), **params)
         path = path or socket._path  # noqa
         self._socket_running[path] = True
         self._loop.call_soon_threadsafe(asyncio.create_task, self.start_listener(socket, socket._path, callback))
@@ -1,6 +1,9 @@
 import asyncio
+import logging
 import threading
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from typing import Optional, Dict, Callable, List, Tuple, Any
 
 from .client import AsyncClient
 
@@ -10,16 +13,25 @@ class ThreadedApiManager(threading.Thread):
     def __init__(
         self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
         requests_params: Dict[str, str] = None, tld: str = 'com',
-        testnet: bool = False
+        testnet: bool = False, workers: int = 0
     ):
         """Initialise the BinanceSocketManager
 
+        :param workers: Optional number of worker threads that run the callbacks, 0 runs them on the socket loop.
+            Messages of one socket are always handled by the same worker and in order.
+
         """
         super().__init__()
         self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
         self._client: Optional[AsyncClient] = None
         self._running: bool = True
         self._socket_running: Dict[str, bool] = {}
+        self._listeners: Dict[str, asyncio.Task] = {}
+        self._ready = threading.Event()
+        self._stopped: Optional[asyncio.Event] = None  # bound to the socket loop, created on it
+        self._workers = [ThreadPoolExecutor(1, thread_name_prefix='binance-callback') for _ in range(workers)]
+        self._messages: SimpleQueue = SimpleQueue()
+        self._log = logging.getLogger(__name__)
         self._client_params = {
             'api_key': api_key,
             'api_secret': api_secret,
@@ -32,32 +44,107 @@ class ThreadedApiManager(threading.Thread):
         ...
 
     async def socket_listener(self):
+        self._stopped = asyncio.Event()
+        if not self._running:  # stopped before the loop ran
+            self._stopped.set()
         self._client = await AsyncClient.create(loop=self._loop, **self._client_params)
         await self._before_socket_listener_start()
-        while self._running:
-            await asyncio.sleep(0.2)
-        while self._socket_running:
-            await asyncio.sleep(0.2)
+        self._ready.set()
+        await self._stopped.wait()
+        listeners = list(self._listeners.values())
+        for task in listeners:
+            task.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+        await self.stop_client()
 
     async def start_listener(self, socket, path: str, callback):
-        async with socket as s:
-            while self._socket_running[path]:
-                try:
-                    msg = await asyncio.wait_for(s.recv(), 3)
-                except asyncio.TimeoutError:
-                    ...
-                    continue
-                if not msg:
-                    continue
+        """Read the socket until it is stopped, messages are handed over in batches
+
+        :param callback: called with every message, if None messages are queued for :meth:`drain`
+
+        """
+        self._listeners[path] = asyncio.current_task()
+        deliver = self._get_delivery(path, callback)
+        try:
+            async with socket as s:
+                recv_batch = getattr(s, 'recv_batch', None)
+                while self._socket_running[path]:
+                    msgs = await recv_batch() if recv_batch else [await s.recv()]
+                    deliver([msg for msg in msgs if msg])
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._listeners.pop(path, None)
+            self._socket_running.pop(path, None)
+
+    def _call_in_loop(self, func, *args, **kwargs):
+        """Call func on the socket loop and wait for the result, objects bound to the loop are created this way"""
+        async def call():
+            return func(*args, **kwargs)
+        return asyncio.run_coroutine_threadsafe(call(), self._loop).result()
+
+    def _get_delivery(self, path: str, callback) -> Callable[[List[Any]], None]:
+        if callback is None:
+            put = self._messages.put
+
+            def deliver(msgs):
+                for msg in msgs:
+                    put((path, msg))
+        elif self._workers:
+            worker = self._workers[hash(path) % len(self._workers)]
+
+            def deliver(msgs):
+                if msgs:
+                    worker.submit(self._run_callback, callback, msgs)
+        else:
+            def deliver(msgs):
+                self._run_callback(callback, msgs)
+        return deliver
+
+    def _run_callback(self, callback, msgs):
+        for msg in msgs:
+            try:
                 callback(msg)
-        del self._socket_running[path]
+            except Exception as e:
+                self._log.exception(e)
+
+    def drain(self, max_size: int = 1000, timeout: Optional[float] = None) -> List[Tuple[str, Any]]:
+        """Take the queued messages of sockets started without a callback, from any thread
+
+        :param max_size: Optional maximum number of messages returned
+        :param timeout: Optional seconds to wait for the first message, None waits forever
+        :return: list of (path, message), empty if the timeout expired
+
+        """
+        try:
+            rv = [self._messages.get(timeout=timeout)]
+        except Empty:
+            return []
+        get = self._messages.get_nowait
+        try:
+            while len(rv) < max_size:
+                rv.append(get())
+        except Empty:
+            pass
+        return rv
 
     def run(self):
         self._loop.run_until_complete(self.socket_listener())
+        # tasks the sockets left on the loop, such as the watchdog of this thread
+        pending = asyncio.all_tasks(self._loop)
+        if pending:
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        for worker in self._workers:
+            worker.shutdown()
 
     def stop_socket(self, socket_name):
         if socket_name in self._socket_running:
             self._socket_running[socket_name] = False
+            task = self._listeners.get(socket_name)
+            if task is not None:
+                self._loop.call_soon_threadsafe(task.cancel)
 
     async def stop_client(self):
         await self._client.close_connection()
@@ -66,6 +153,10 @@ class ThreadedApiManager(threading.Thread):
         if not self._running:
             return
         self._running = False
-        self._loop.call_soon(asyncio.create_task, self.stop_client())
-        for socket_name in self._socket_running.keys():
+        for socket_name in list(self._socket_running.keys()):
             self._socket_running[socket_name] = False
+        self._loop.call_soon_threadsafe(self._set_stopped)
+
+    def _set_stopped(self):
+        if self._stopped is not None:
+            self._stopped.set()
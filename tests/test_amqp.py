@@ -0,0 +1,73 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from mmm.core.hub.amqp import BatchPublisher
+
+
+class FlakyExchange:
+    """fails the sends listed in failures, counted from 1 over all the publishes"""
+
+    def __init__(self, failures):
+        self.failures = set(failures)
+        self.sends = 0
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        self.sends += 1
+        if self.sends in self.failures:
+            raise ConnectionError('nack')
+        self.published.append((routing_key, message.body))
+
+
+class FakeConnection:
+
+    def __init__(self, exchange, down=0):
+        self.exchange = exchange
+        self.down = down  # get_exchange calls that fail before the broker is back
+
+    async def get_exchange(self, name):
+        if self.down:
+            self.down -= 1
+            raise ConnectionError('broker is down')
+        return self.exchange
+
+
+def _publisher(connection, **kwargs):
+    publisher = BatchPublisher(connection, 'test', batch_size=4, linger=0.001, **kwargs)
+    publisher.__retry_base__ = 0.001
+    return publisher
+
+
+async def _publish(publisher, count):
+    for i in range(count):
+        publisher.add('topic', str(i).encode())
+        await publisher.flush()
+    while publisher._batch or publisher._lock.locked():
+        await asyncio.sleep(0.001)
+    publisher._linger_task.cancel()
+
+
+def test_failed_messages_are_retried():
+    exchange = FlakyExchange(failures=[2, 3, 7])
+    publisher = _publisher(FakeConnection(exchange, down=1))
+    asyncio.run(_publish(publisher, 10))
+    assert sorted(int(body) for _, body in exchange.published) == list(range(10))
+    assert publisher.undelivered == 0
+
+
+def test_messages_are_given_up_after_max_attempts():
+    exchange = FlakyExchange(failures=[1, 5])  # the first message fails twice, the others are sent at once
+    publisher = _publisher(FakeConnection(exchange), max_attempts=2)
+    asyncio.run(_publish(publisher, 4))
+    assert [body for _, body in exchange.published] == [b'1', b'2', b'3']
+    assert publisher.undelivered == 1
+
+
+def test_hubs_do_not_import_aio_pika():
+    code = ('import sys\n'
+            'import mmm.core.hub.hub_factory, mmm.core.hub.datasource_msg_hub.hub, mmm.core.hub.inner_event_hub.hub\n'
+            'assert "aio_pika" not in sys.modules\n')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
@@ -0,0 +1,25 @@
+import random
+
+from mmm.third_party.binance.depthcache import DepthCache
+
+
+def test_levels_follow_the_updates():
+    rnd = random.Random(3)
+    cache, bids, asks = DepthCache('BTCUSDT'), {}, {}
+    for _ in range(2000):
+        price = f'{100 + rnd.randrange(50) / 10:.2f}'
+        quantity = '0.00000000' if rnd.random() < 0.3 else f'{rnd.uniform(0.1, 5):.8f}'
+        side, add = (bids, cache.add_bid) if float(price) < 102.5 else (asks, cache.add_ask)
+        add([price, quantity])
+        if float(quantity):
+            side[float(price)] = float(quantity)
+        else:
+            side.pop(float(price), None)
+    assert cache.get_bids() == [list(each) for each in sorted(bids.items(), reverse=True)]
+    assert cache.get_asks() == [list(each) for each in sorted(asks.items())]
+    assert cache.get_top_bids(3)[:] == cache.get_bids()[:3]
+    assert cache.get_best_ask() == cache.get_asks()[0]
+    best = cache.get_bids()[0]
+    assert cache.get_quantity(best[0]) == best[1]
+    top_bids, top_asks = cache.to_numpy(2)
+    assert top_bids.tolist() == cache.get_bids()[:2] and top_asks.tolist() == cache.get_asks()[:2]
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from mmm.third_party.binance.client import AsyncClient
+from mmm.third_party.binance.threaded_stream import ThreadedApiManager
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    async def server_time(*args, **kwargs):
+        return {'serverTime': int(time.time() * 1000)}
+    monkeypatch.setattr(AsyncClient, 'ping', server_time)
+    monkeypatch.setattr(AsyncClient, 'get_server_time', server_time)
+
+
+@pytest.mark.parametrize('stop_first', [False, True])
+def test_stop(stop_first):
+    manager = ThreadedApiManager()
+    if stop_first:
+        manager.stop()
+    manager.start()
+    if not stop_first:
+        assert manager._ready.wait(5)  # noqa
+        manager.stop()
+    manager.join(5)
+    assert not manager.is_alive()
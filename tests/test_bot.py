@@ -0,0 +1,38 @@
+import asyncio
+
+from mmm.core.datasource.okex.subscription import OKEXTrades, OKEXTradesResp
+from mmm.core.strategy import Strategy
+from mmm.core.strategy.bot import Bot
+from mmm.core.strategy.decorators import sub
+from mmm.credential import Credential
+
+
+class Slow(Strategy):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.handled = []
+
+    @sub(OKEXTrades('BTC-USDT'), as_list=True)
+    async def on_trades(self, trades):
+        await asyncio.sleep(0.01)
+        self.handled.extend(each.trade_id for each in trades)
+
+
+def test_join_waits_for_the_batch_in_the_handler():
+    async def main():
+        strategy = Slow('bot.join', Credential('KEY', 'SECRET', account='bot'))
+        bot = Bot(strategy)
+        task = asyncio.create_task(bot.gather_tasks())
+        await asyncio.sleep(0)
+        for i in range(5):
+            bot.ds_msg_hub.publish(OKEXTradesResp('BTC-USDT', '1', '1', 'buy', '1', trade_id=str(i)))
+        await bot.ds_msg_hub.flush()
+        await asyncio.sleep(0.001)
+        assert bot.pending() == 0 and not strategy.handled  # taken from the queue, still in the handler
+        await asyncio.wait_for(bot.join(), 1)
+        assert strategy.handled == ['0', '1', '2', '3', '4']
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        bot.on_close()
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+
+from mmm.core.datasource.binance.subscription import BinanceKlineResp, BinanceTradesResp
+from mmm.core.datasource.book import BookSnapshot
+from mmm.core.datasource.okex.subscription import (OKEXBooksResp, OKEXCandleResp, OKEXStreamStatusResp,
+                                                   OKEXTradesResp, StreamStatus)
+from mmm.core.hub.codec import (Codec, DatetimeField, DecimalField, EnumField, Int, Json, Nullable, PICKLE_TYPE_ID,
+                                Str, StrPairs, codec)
+from mmm.core.hub.inner_event_hub.event import BotControlEvent, Command, OrderCreationEvent
+from mmm.credential import Credential
+from mmm.numeric import get_mode, set_mode, set_precision
+from mmm.project_types import Exchange, NumericMode
+
+
+def round_trip(obj):
+    data = codec.encode(obj)
+    assert int.from_bytes(data[:2], 'little') != PICKLE_TYPE_ID
+    decoded = codec.decode(data)
+    assert type(decoded) is type(obj)
+    return decoded
+
+
+@pytest.fixture
+def fixed_mode():
+    mode = get_mode()
+    set_mode(NumericMode.FIXED)
+    set_precision('BTC-USDT', 1, 8)
+    set_precision('BTCUSDT', 2, 6)
+    yield
+    set_mode(mode)
+
+
+class Color(Enum):
+    RED = 1
+    BLUE = 2
+
+
+class Sample:
+    pass
+
+
+def test_fields():
+    sample_codec = Codec()
+    sample_codec.register(1, s=Str(), i=Int(), d=DecimalField(), dt=DatetimeField(), e=EnumField(Color), j=Json(),
+                          none=Nullable(Str()), some=Nullable(Int()), pairs=StrPairs())(Sample)
+    sample = Sample()
+    values = {'s': 'ä', 'i': -2 ** 63, 'd': Decimal('-0.00012300'), 'dt': datetime(2024, 1, 2, 3, 4, 5, 678901),
+              'e': Color.BLUE, 'j': {'a': [1, '2']}, 'none': None, 'some': 0, 'pairs': (('1.5', '2'), ('1', '0.1'))}
+    sample.__dict__.update(values)
+    decoded = sample_codec.decode(sample_codec.encode(sample))
+    assert decoded.__dict__ == values
+    assert str(decoded.d) == '-0.00012300'
+
+
+def test_unregistered_types_fall_back_to_pickle():
+    data = codec.encode({'a': Decimal('1.1')})
+    assert int.from_bytes(data[:2], 'little') == PICKLE_TYPE_ID
+    assert codec.decode(data) == {'a': Decimal('1.1')}
+
+
+def test_events():
+    event = OrderCreationEvent('1', 'strategy', 'bot', Exchange.BINANCE, Credential('KEY', 'SECRET', account='codec'),
+                               {'instId': 'BTC-USDT', 'px': '1.5'})
+    decoded = round_trip(event)
+    assert decoded.raw_data == event.raw_data and decoded.exchange is Exchange.BINANCE
+    for each in (BotControlEvent(Command.STOP_BOT, 'bot'), BotControlEvent(Command.START_ALL)):
+        assert round_trip(each).raw_data == each.raw_data
+
+
+def test_market_data_in_decimal_mode():
+    trade = OKEXTradesResp('BTC-USDT', Decimal('42000.1'), '0.5', 'buy', '1700000000000', trade_id='7')
+    assert trade.price == Decimal('42000.1')  # the cached value is not encoded
+    decoded = round_trip(trade)
+    assert (decoded.price, decoded.volume, decoded.side, decoded.trade_id, decoded.ts_ms) == \
+           (Decimal('42000.1'), Decimal('0.5'), 'buy', '7', 1700000000000)
+    assert decoded.get_routing_key() == trade.get_routing_key()
+
+    candle = round_trip(OKEXCandleResp('candle1m', 'BTC-USDT', '1700000000000', '1', '3', '0.5', '2', '10', '20.5'))
+    assert (candle.open_price, candle.high_price, candle.low_price, candle.close_price, candle.volume,
+            candle.volume_ccy) == (1, 3, Decimal('0.5'), 2, 10, Decimal('20.5'))
+
+    kline = round_trip(BinanceKlineResp('BTCUSDT', '1m', 1700000000000, '1.01', '1.02', '1.00', '1.01', '5', '5.05'))
+    assert (kline.interval, kline.high_price, kline.ts_ms) == ('1m', Decimal('1.02'), 1700000000000)
+    trade = round_trip(BinanceTradesResp('BTCUSDT', '42000.10', '0.001', 'sell', '1700000000000', trade_id='9'))
+    assert (trade.price, trade.volume, trade.side) == (Decimal('42000.10'), Decimal('0.001'), 'sell')
+
+
+def test_status_and_books():
+    status = OKEXStreamStatusResp(3, StreamStatus.RECOVERED, [{'channel': 'trades', 'instId': 'BTC-USDT'}], 1500)
+    decoded = round_trip(status)
+    assert (decoded.conn_id, decoded.status, decoded.args, decoded.gap_ms) == \
+           (3, StreamStatus.RECOVERED, status.args, 1500)
+
+    book = BookSnapshot('BTC-USDT', 5, '1700000000000', (('10.1', '2'),), (('10.2', '1'), ('10.3', '4')))
+    decoded = round_trip(OKEXBooksResp('books', 'BTC-USDT', 'update', 5, book, '1700000000000'))
+    assert (decoded.action, decoded.seq_id, decoded.book.ts) == ('update', 5, '1700000000000')
+    assert (decoded.book.bids, decoded.book.asks) == (book.bids, book.asks)
+
+
+def test_market_data_in_fixed_mode(fixed_mode):
+    decoded = round_trip(OKEXTradesResp('BTC-USDT', '42000.1', '0.5', 'buy', '1700000000000'))
+    assert (decoded.price, decoded.volume) == (420001, 50000000)
+    candle = round_trip(OKEXCandleResp('candle1m', 'BTC-USDT', '1700000000000', '1', '3', '0.5', '2', '10', '20.5'))
+    assert (candle.low_price, candle.volume, candle.volume_ccy) == (5, 10 * 10 ** 8, Decimal('20.5'))
+    trade = round_trip(BinanceTradesResp('BTCUSDT', '42000.10', '0.001', 'sell', '1700000000000'))
+    assert (trade.price, trade.volume) == (4200010, 1000)
+    book = BookSnapshot('BTC-USDT', 5, '1700000000000', (('10.1', '2'),), ())
+    decoded = round_trip(OKEXBooksResp('books', 'BTC-USDT', 'snapshot', 5, book, '1700000000000'))
+    assert decoded.book.top(1) == ([(101, 2 * 10 ** 8)], [])
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mmm.core.hub.codec import codec
+from mmm.core.hub.inner_event_hub.event import OrderCreationEvent
+from mmm.credential import Credential, CredentialStore, credential_store
+from mmm.exceptions import ConfigureError
+from mmm.project_types import Exchange
+
+
+def make_event(credential, uniq_id='1'):
+    return OrderCreationEvent(uniq_id, 'strategy', 'bot', Exchange.OKEX, credential, {'instId': 'BTC-USDT'})
+
+
+def test_events_keep_their_own_credential_in_process():
+    a = make_event(Credential('KEY_A', 'S_A'))
+    b = make_event(Credential('KEY_B', 'S_B'))
+    assert a.credential.api_key == 'KEY_A'
+    assert b.credential.api_key == 'KEY_B'
+
+
+def test_decoded_event_resolves_the_account_from_the_store():
+    credential = Credential('KEY_C', 'S_C', account='account_c')
+    credential_store.add(credential)
+    event = codec.decode(codec.encode(make_event(credential)))
+    assert event.account == 'account_c'
+    assert event.credential is credential
+    assert '_credential' not in event.raw_data
+
+
+def test_store_rejects_other_keys_for_a_registered_account():
+    store = CredentialStore()
+    store.add(Credential('KEY_A', 'S_A'))
+    store.add(Credential('KEY_A', 'S_A'))
+    with pytest.raises(ConfigureError):
+        store.add(Credential('KEY_B', 'S_B'))
+    store.add(Credential('KEY_B', 'S_B', account='b'))
+    assert store.get('default').api_key == 'KEY_A'
+    assert store.get('b').api_key == 'KEY_B'
+
+
+def test_executor_loads_the_credentials_of_every_account(tmp_path):
+    (tmp_path / 'executor_settings.py').write_text(
+        "STRATEGIES = ['executor_strategy:strategy']\n"
+        "CREDENTIALS = {'main': 'MAIN_'}\n"
+        "DATABASE = 'sqlite://'\n")
+    (tmp_path / 'executor_strategy.py').write_text(
+        "from mmm.core.strategy import Strategy\n"
+        "from mmm.credential import Credential\n"
+        "class Sample(Strategy):\n"
+        "    pass\n"
+        "strategy = Sample('bot', Credential('KEY_S', 'S_S', account='strategy'))\n")
+    events = [codec.encode(make_event(Credential(key, 'S', account=account))).hex()
+              for key, account in (('KEY_S', 'strategy'), ('KEY_M', 'main'))]
+    # the executor process never created the strategy side events, only their accounts are decoded
+    code = ('import sys\n'
+            'from mmm.core.hub.codec import codec\n'
+            'from mmm.core.order.executor import OrderExecutor\n'
+            'OrderExecutor.load_credentials()\n'
+            'print(*[codec.decode(bytes.fromhex(each)).credential.api_key for each in sys.argv[1:]])\n')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path)] + sys.path),
+               MMM_SETTINGS_MODULE='executor_settings', MAIN_API_KEY='KEY_M', MAIN_SECRET_KEY='S_M')
+    rv = subprocess.run([sys.executable, '-c', code, *events], env=env, cwd=tmp_path, check=True,
+                        capture_output=True, text=True)
+    assert rv.stdout.split() == ['KEY_S', 'KEY_M']
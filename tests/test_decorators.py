@@ -0,0 +1,22 @@
+import pytest
+
+from mmm.core.datasource.binance.subscription import BinanceKline, BinanceKlineResp, BinanceTrades, BinanceTradesResp
+from mmm.core.datasource.okex.subscription import (OKEXBooks, OKEXBooksResp, OKEXCandle, OKEXCandleResp,
+                                                   OKEXStreamStatus, OKEXTrades, OKEXTradesResp)
+from mmm.core.strategy.decorators import sub
+
+
+def test_batch_needs_a_batch_type():
+    with pytest.raises(TypeError, match='OKEXStreamStatus'):
+        sub(OKEXStreamStatus(), batch=True)
+    sub(OKEXStreamStatus(), as_list=True)
+
+
+@pytest.mark.parametrize('topic, resp_cls', [
+    (OKEXTrades('BTC-USDT-SWAP'), OKEXTradesResp), (OKEXCandle('candle1m', 'BTC-USDT-SWAP'), OKEXCandleResp),
+    (OKEXBooks('BTC-USDT-SWAP'), OKEXBooksResp), (BinanceTrades('btcusdt'), BinanceTradesResp),
+    (BinanceKline('btcusdt', '1m'), BinanceKlineResp),
+])
+def test_batch_type_of_the_subscription_is_the_one_of_its_responses(topic, resp_cls):
+    assert topic.__batch_type__ is resp_cls.__batch_type__
+    sub(topic, batch=True)
@@ -0,0 +1,94 @@
+import zlib
+
+import pytest
+
+from mmm.core.datasource.book import OrderBook
+from mmm.core.datasource.okex.parser import BooksParser, checksum
+from mmm.core.datasource.okex.subscription import OKEXBooksResp
+from mmm.core.hub.codec import codec
+from mmm.exceptions import BookOutOfSyncError
+
+
+ARG = {'channel': 'books', 'instId': 'BTC-USDT'}
+
+
+def frame(action, seq_id, prev_seq_id, bids, asks, ts='1700000000000', crc=None):
+    data = {'bids': bids, 'asks': asks, 'ts': ts, 'seqId': seq_id, 'prevSeqId': prev_seq_id}
+    if crc is not None:
+        data['checksum'] = crc
+    return {'arg': ARG, 'action': action, 'data': [data]}
+
+
+def signed_crc32(text):
+    crc = zlib.crc32(text.encode())
+    return crc - (1 << 32) if crc >= 1 << 31 else crc
+
+
+@pytest.mark.parametrize('bids, asks, text', [
+    # the examples of https://www.okx.com/docs-v5/en/#websocket-api-checksum
+    ([['3366.1', '7', '0', '3'], ['3366', '6', '3', '4']], [['3366.8', '9', '10', '3'], ['3368', '8', '3', '4']],
+     '3366.1:7:3366.8:9:3366:6:3368:8'),
+    ([['3366.1', '7', '0', '3']], [['3366.8', '9', '10', '3'], ['3368', '8', '3', '4'], ['3372', '8', '3', '4']],
+     '3366.1:7:3366.8:9:3368:8:3372:8'),
+])
+def test_checksum_of_the_okex_examples(bids, asks, text):
+    book = OrderBook('ETH-USDT')
+    book.apply_snapshot(bids, asks)
+    assert checksum(book) == signed_crc32(text)
+
+
+def test_snapshot_update_gap_and_resync():
+    parser = BooksParser()
+    book = parser.get_book('books', 'BTC-USDT')
+    bids, asks = [['10', '1', '0', '1'], ['9', '2', '0', '1']], [['11', '1', '0', '1']]
+    parser.parse(frame('snapshot', 1, -1, bids, asks, crc=signed_crc32('10:1:11:1:9:2')))
+    resp, = parser.parse(frame('update', 2, 1, [['9', '0', '0', '0']], [['12', '4', '0', '1']],
+                               crc=signed_crc32('10:1:11:1:12:4')))
+    assert resp.book.top(2) == book.top(2) and book.seq_id == 2
+    with pytest.raises(BookOutOfSyncError):
+        parser.parse(frame('update', 4, 3, [], []))  # 3 is lost
+    assert not book.synced and (len(book.bids), len(book.asks)) == (0, 0)
+    assert parser.parse(frame('update', 5, 4, [], [])) == []  # updates wait for the snapshot
+    parser.parse(frame('snapshot', 5, -1, bids, asks, crc=signed_crc32('10:1:11:1:9:2')))
+    parser.parse(frame('update', 6, 5, [['10', '3', '0', '1']], [], crc=signed_crc32('10:3:11:1:9:2')))
+    assert (book.synced, book.seq_id, book.bids.sizes) == (True, 6, ['3', '2'])
+    with pytest.raises(BookOutOfSyncError):
+        parser.parse(frame('update', 7, 6, [['10', '4', '0', '1']], [], crc=signed_crc32('10:3:11:1:9:2')))
+    assert not book.synced
+
+
+def test_update_after_a_maintenance_reset_is_applied():
+    parser = BooksParser()
+    parser.parse(frame('snapshot', 100, -1, [['10', '1', '0', '1']], [['11', '1', '0', '1']]))
+    # okex resets the sequence on maintenance, seqId is smaller than prevSeqId
+    resp, = parser.parse(frame('update', 3, 100, [['10', '2', '0', '1']], []))
+    book = parser.get_book('books', 'BTC-USDT')
+    assert (resp.seq_id, book.seq_id, book.bids.sizes) == (3, 3, ['2'])
+    assert parser.parse(frame('update', 3, 100, [['10', '5', '0', '1']], [])) == []  # copy of the reset
+    parser.parse(frame('update', 4, 3, [['10', '4', '0', '1']], []))
+    assert book.bids.sizes == ['4']
+
+
+def test_updates_that_are_already_applied_are_skipped():
+    parser = BooksParser()
+    parser.parse(frame('snapshot', 10, -1, [['10', '1', '0', '1']], [['11', '1', '0', '1']]))
+    parser.parse(frame('update', 11, 10, [['10', '2', '0', '1']], []))
+    assert parser.parse(frame('update', 11, 10, [['10', '3', '0', '1']], [])) == []
+    with pytest.raises(BookOutOfSyncError):
+        parser.parse(frame('update', 13, 12, [], []))
+    assert not parser.get_book('books', 'BTC-USDT').synced
+
+
+def test_responses_keep_the_book_of_their_frame():
+    parser = BooksParser(depth=2)
+    snapshot, = parser.parse(frame('snapshot', 10, -1, [['10', '1', '0', '1'], ['9', '1', '0', '1'],
+                                                         ['8', '1', '0', '1']], [['11', '1', '0', '1']]))
+    update, = parser.parse(frame('update', 11, 10, [['10', '0', '0', '0']], [['11', '3', '0', '1']],
+                                 ts='1700000000001'))
+    assert snapshot.book.bids == (('10', '1'), ('9', '1'))
+    assert (update.book.bids, update.book.asks) == ((('9', '1'), ('8', '1')), (('11', '3'), ))
+    decoded = codec.decode(codec.encode(update))
+    assert type(decoded) is OKEXBooksResp
+    assert (decoded.seq_id, decoded.ts_ms, decoded.book.seq_id) == (11, 1700000000001, 11)
+    assert decoded.book.top(2) == update.book.top(2)
+    assert decoded.book.depth_at(decoded.book.best_ask) == update.book.depth_at(update.book.best_ask)
@@ -0,0 +1,75 @@
+import asyncio
+
+from mmm.core.datasource.okex.subscription import OKEXTrades, OKEXTradesResp
+from mmm.core.hub.datasource_msg_hub.hub import AsyncioQueueDsMsgHub
+from mmm.core.hub.queue import Backlog, OverflowPolicy, SubQueue
+
+
+class Msg:
+    def __init__(self, key, value):
+        self.key, self.value = key, value
+
+    def get_conflation_key(self):
+        return self.key
+
+
+def trade(i):
+    return OKEXTradesResp('BTC-USDT', '1', '1', 'buy', str(i))
+
+
+def test_flush_returns_when_a_full_queue_is_unsubscribed():
+    async def main():
+        hub = AsyncioQueueDsMsgHub()
+        sub = OKEXTrades('BTC-USDT')
+        stopped, alive = hub.subscribe(sub, maxsize=1), hub.subscribe(sub, maxsize=1)
+        received = []
+
+        async def consume():
+            while True:
+                received.append(await alive.get())
+
+        consumer = asyncio.create_task(consume())
+        for i in range(5):
+            hub.publish(trade(i))
+        flush = asyncio.create_task(hub.flush())
+        await asyncio.sleep(0.01)
+        assert not flush.done()  # waits for the stopped consumer
+        hub.unsubscribe(sub, stopped)
+        await asyncio.wait_for(flush, 1)
+        await asyncio.sleep(0)
+        consumer.cancel()
+        assert [each.ts_ms for each in received] == list(range(5))
+        assert stopped.qsize() == 1
+    asyncio.run(main())
+
+
+def test_flush_delivers_in_order_with_concurrent_flushes():
+    async def main():
+        backlog, queue = Backlog(), SubQueue(2)
+        for i in range(10):
+            backlog.put(queue, i)
+        flushes = [asyncio.create_task(backlog.flush()) for _ in range(2)]
+        got = []
+        while len(got) < 10:
+            got.append(await queue.get())
+        await asyncio.wait_for(asyncio.gather(*flushes), 1)
+        assert got == list(range(10))
+    asyncio.run(main())
+
+
+def test_overflow_policies_and_get_ready():
+    async def main():
+        queue = SubQueue(3, OverflowPolicy.DROP_OLDEST)
+        for i in range(5):
+            queue.put_nowait(Msg(i, i))
+        assert [each.value for each in queue.get_ready()] == [2, 3, 4]
+        assert queue.dropped == 2
+
+        queue = SubQueue(0, OverflowPolicy.CONFLATE)
+        for i in range(6):
+            queue.put_nowait(Msg(i % 2, i))
+        assert [each.value for each in queue.get_ready(1)] == [4]
+        assert [each.value for each in queue.get_ready()] == [5]
+        assert queue.conflated == 4
+        assert queue.max_wait >= 0
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+from mmm.core.recorder.segment import INDEX_DTYPE, SegmentReader, SegmentWriter, index_path
+
+
+COLUMNS = [['ts', '<i8', []], ['px', '<f8', []], ['bid_px', '<f8', [3]]]
+
+
+def block(first, rows):
+    ts = np.arange(first, first + rows, dtype=np.int64)
+    return {'ts': ts, 'px': ts / 10, 'bid_px': np.repeat(ts, 3).reshape(rows, 3) / 100}
+
+
+def write(path, *blocks, compress_level=1):
+    writer = SegmentWriter(path, {'kind': 'Test', 'columns': COLUMNS}, compress_level)
+    for each in blocks:
+        writer.append(each)
+    writer.close()
+
+
+def assert_rows(path, *blocks, start=None, end=None):
+    expected = {name: np.concatenate([each[name] for each in blocks]) for name in blocks[0]}
+    if start is not None or end is not None:
+        mask = (expected['ts'] >= (start or 0)) & (expected['ts'] < (end or 2 ** 62))
+        expected = {name: column[mask] for name, column in expected.items()}
+    with SegmentReader(path) as reader:
+        rows = reader.read(start, end)
+        assert len(reader) == sum(len(each['ts']) for each in blocks)
+        assert rows.keys() == expected.keys()
+        for name, column in expected.items():
+            np.testing.assert_array_equal(rows[name], column)
+
+
+@pytest.mark.parametrize('compress_level', [0, 1])
+def test_read_back(tmp_path, compress_level):
+    path = str(tmp_path / 'a.seg')
+    blocks = block(1000, 5), block(1005, 3)
+    write(path, *blocks, compress_level=compress_level)
+    assert_rows(path, *blocks)
+    assert_rows(path, *blocks, start=1003, end=1006)
+    with SegmentReader(path) as reader:
+        assert (reader.first_ts, reader.last_ts) == (1000, 1007)
+        assert reader.blocks(1005).tolist() == [1]
+        assert reader.read(columns=['px'])['px'].tolist() == (blocks[0]['px'].tolist() + blocks[1]['px'].tolist())
+
+
+def test_truncated_final_block(tmp_path):
+    path = str(tmp_path / 'a.seg')
+    blocks = block(1000, 5), block(1005, 3)
+    write(path, *blocks)
+    size = os.path.getsize(path)
+    write(path, block(1008, 4))
+    # a crash while the last block was written, part of it is on disk and its entry is not
+    with open(path, 'r+b') as f:
+        f.truncate(size + (os.path.getsize(path) - size) // 2)
+    with open(index_path(path), 'r+b') as f:
+        f.truncate(2 * INDEX_DTYPE.itemsize)
+    assert_rows(path, *blocks)
+    write(path, block(1008, 2))
+    assert_rows(path, *blocks, block(1008, 2))
+
+
+def test_truncated_final_entry(tmp_path):
+    path = str(tmp_path / 'a.seg')
+    blocks = block(1000, 5), block(1005, 3)
+    write(path, *blocks, block(1008, 4))
+    # the last block is on disk but only a part of its entry
+    with open(index_path(path), 'r+b') as f:
+        f.truncate(3 * INDEX_DTYPE.itemsize - 5)
+    assert_rows(path, *blocks)
+    write(path, block(1008, 1))
+    assert os.path.getsize(index_path(path)) == 3 * INDEX_DTYPE.itemsize
+    assert_rows(path, *blocks, block(1008, 1))
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import struct
+import subprocess
+import sys
+
+import pytest
+
+from mmm.core.hub.shm import ShmRing
+
+
+@pytest.fixture
+def name():
+    name = f'mmm_test_{os.getpid()}'
+    yield name
+    try:
+        ShmRing(name, 0).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def frame(i, n=248):
+    return bytes([i]) * n
+
+
+def test_read_across_the_wrap(name):
+    ring = ShmRing(name, 4096, create=True)
+    for i in range(10):
+        ring.write(frame(i))
+    reader = ring.reader()
+    for i in range(10, 16):  # the last two wrap to the start
+        ring.write(frame(i))
+    assert reader.read() == [frame(i) for i in range(10, 16)]
+    assert reader.overruns == 0
+    ring.close()
+
+
+def test_write_in_progress_near_a_lap(name):
+    ring = ShmRing(name, 4096, create=True)
+    ring.write(frame(0))
+    ring.write(frame(1))
+    reader = ring.reader()  # at 512, the unread frames start there
+    for i in range(2, 13):
+        ring.write(frame(i))
+    ring.write(frame(13, 120))
+    assert ring.write_cursor - reader.position == 2944  # less than capacity - max_frame behind
+    # a wrapping write of max_frame bytes that has not published its cursor yet
+    cursor = ring.write_cursor
+    ring.write(frame(14, ring.max_frame - 8))
+    struct.pack_into('<Q', ring._buf, 0, cursor)  # noqa
+    assert reader.read() == []
+    assert reader.overruns == 1
+    ring.close()
+
+
+def test_segment_survives_its_creator(name):
+    code = (f'from mmm.core.hub.shm import ShmRing\n'
+            f'ShmRing({name!r}, 4096, create=True).write(b"data")\n')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
+    ring = ShmRing(name, 4096)
+    assert ring.write_cursor == 8
+    ring.close()
+
+
+def test_readers_wait_for_the_writer(name):
+    async def main():
+        task = asyncio.create_task(ShmRing.open_reader(name, 4096, interval=0.001))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        with pytest.raises(FileNotFoundError):
+            ShmRing(name, 4096)
+        ring = ShmRing(name, 4096, create=True)
+        reader = await task
+        ring.write(b'data')
+        assert reader.read() == [b'data']
+        ring.close()
+    asyncio.run(main())
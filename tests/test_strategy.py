@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+import pytest
+
+from mmm.core.strategy.strategy import Strategy
+from mmm.credential import Credential
+from mmm.numeric import get_mode, set_mode, set_precision
+from mmm.project_types import Exchange, NumericMode
+
+
+class Orders:
+
+    def __init__(self):
+        self.events = []
+
+    def create_order(self, event):
+        self.events.append(event)
+
+
+class Sample(Strategy):
+    pass
+
+
+@pytest.fixture
+def strategy():
+    strategy = Sample('bot', Credential('KEY', 'SECRET', account='strategy'))
+    strategy.order_manager = Orders()
+    return strategy
+
+
+@pytest.fixture
+def fixed_mode():
+    mode = get_mode()
+    set_mode(NumericMode.FIXED)
+    set_precision('BTC-USDT', 2, 8)
+    set_precision('BTCUSDT', 2, 6)
+    yield
+    set_mode(mode)
+
+
+def test_scaled_order_params_are_sent_as_strings(strategy, fixed_mode):
+    strategy.create_order('1', Exchange.OKEX, {'instId': 'BTC-USDT', 'clOrdId': '1', 'px': 4200010, 'sz': 50000000,
+                                               'slTriggerPx': '41000.5'})
+    strategy.create_order('2', Exchange.BINANCE, {'symbol': 'BTCUSDT', 'price': 4200010, 'quantity': 1000})
+    okex, binance = [each.params for each in strategy.order_manager.events]
+    assert (okex['px'], okex['sz'], okex['slTriggerPx'], okex['clOrdId']) == ('42000.10', '0.50000000', '41000.5', '1')
+    assert (binance['price'], binance['quantity']) == ('42000.10', '0.001000')
+
+
+def test_decimal_order_params_are_sent_as_strings(strategy):
+    params = {'instId': 'BTC-USDT', 'px': Decimal('42000.10'), 'sz': '0.5'}
+    strategy.create_order('1', Exchange.OKEX, params)
+    assert strategy.order_manager.events[0].params == {'instId': 'BTC-USDT', 'px': '42000.10', 'sz': '0.5'}
+    assert params['px'] == Decimal('42000.10')  # the params of the strategy are not modified